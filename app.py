@@ -1,22 +1,47 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, date
 import numpy as np
+import pandas as pd
+from datetime import datetime, date, timedelta
 import base64
 from utils import format_currency, format_percentage
+from dashboard_data import (
+    penjualan_dataframe, ringkasan_penjualan_dataframe, ringkasan_kpi, konsolidasi_dataframe,
+    strategi_dataframe, anggaran_dataframe,
+    harga_sicom_tabel_dataframe, harga_sicom_visual_dataframe, build_pdf_data, NAMA_BULAN
+)
 from database import (
     get_perusahaan, get_perusahaan_by_id, tambah_perusahaan,
     get_penjualan_karet, simpan_penjualan_karet, get_penjualan_karet_by_id, hapus_penjualan_karet,
+    get_ringkasan_penjualan, get_konsolidasi_penjualan, get_kandidat_tujuan, get_data_susut,
+    get_skenario_simulasi, simpan_skenario_simulasi, hapus_skenario_simulasi,
     get_strategi_risiko, simpan_strategi_risiko,
     get_realisasi_anggaran, simpan_realisasi_anggaran,
-    get_realisasi_anggaran_by_id, hapus_realisasi_anggaran,
+    get_realisasi_anggaran_by_id, hapus_realisasi_anggaran, get_ringkasan_anggaran, get_ringkasan_volume,
     fix_all_realisasi_anggaran_saldo,
-    init_harga_sicom_sir_data, get_harga_sicom_sir, simpan_harga_sicom_sir, hapus_harga_sicom_sir,
-    get_db_session, Perusahaan
+    init_harga_sicom_sir_data, get_harga_sicom_harian, simpan_harga_sicom_harian, hapus_harga_sicom_minggu,
+    get_harga_sicom_view, get_minggu_ekstrem,
+    get_kurs_sgd_idr, simpan_kurs_sgd_idr, validasi_harga_sicom_harian, get_harga_pasar_harian,
+    get_db_session, get_db_health, get_pool_status, get_listener_status, Perusahaan
 )
-from pdf_generator import generate_pdf_penjualan_karet
+from db_metrics import get_pool_summary, render_prometheus, start_query_log, slow_query_log, SLOW_QUERY_MS
+from profiling import start_rerun_profiler, PROFILE_ENV_ENABLED
+from shared_cache import get_cache, cached_figure, table_namespaces
+from charts import grafik_garis, grafik_sebar
+from spread import MAKS_UMUR_HARGA_HARI, get_spread_penjualan, ringkasan_spread
+from resampling import GRANULARITAS, LABEL_GRANULARITAS, pilih_granularitas, get_arus_kas, get_ohlc_harga
+from forecast_harga import SERI_HARGA, get_state_ramalan, ramalan
+from volume import SatuanVolume, format_volume, ringkas_volume
+from kpi_anggaran import JENDELA_BULAN, get_kpi_anggaran, kpi_terkini, format_runway
+from monte_carlo import METODE_SIMULASI, JUMLAH_JALUR, get_simulasi_harga, risiko_keuntungan, ringkasan_risiko, histogram_keuntungan
+from model_susut import get_model_susut, prediksi_susut
+from optimasi import kandidat_dataframe, peringkat_tujuan, rekomendasi_teks
+from simulasi import (
+    PARAMETER_GRID, hitung_penjualan, harga_jual_impas, rentang, simulasi_grid,
+    ringkasan_grid, heatmap_grid, frontier_impas
+)
+
+# Mulai profiler rerun (cProfile hanya aktif jika KARET_PROFILE diset atau admin mengaktifkannya)
+rerun_profiler = start_rerun_profiler(st.session_state.get("profiling_enabled", False))
 
 # Set page configuration
 st.set_page_config(
@@ -29,6 +54,20 @@ st.set_page_config(
 st.title("Laporan Penjualan Karet")
 st.markdown("---")
 
+# Mulai log query untuk rerun ini; log rerun sebelumnya ditampilkan di panel diagnostik
+previous_query_log = st.session_state.get("query_log")
+st.session_state.query_log = start_query_log()
+
+# Tampilkan status gangguan database sekali per gangguan untuk setiap sesi
+db_health = get_db_health()
+if db_health["state"] != "closed":
+    if st.session_state.get("db_outage_notified") != db_health["outage_id"]:
+        st.session_state.db_outage_notified = db_health["outage_id"]
+        st.warning(
+            "Koneksi ke database sedang terganggu. Data mungkin tidak dapat dimuat; "
+            "aplikasi akan terhubung kembali secara otomatis setelah database tersedia."
+        )
+
 # Initialize session state variables if they don't exist
 if 'selected_perusahaan_id' not in st.session_state:
     # Dapatkan daftar perusahaan dari database
@@ -55,7 +94,7 @@ if 'is_authenticated' not in st.session_state:
 admin_password = "karet123"
 
 # Sidebar for company selection and data input
-with st.sidebar:
+with st.sidebar, rerun_profiler.phase("Sidebar"):
     st.header("Konfigurasi Laporan")
     
     # Autentikasi untuk akses edit
@@ -123,17 +162,66 @@ with st.sidebar:
     
     # Judul Laporan
     report_title = st.text_input("Judul Laporan", "Laporan Penjualan Karet")
+    
+    # Panel diagnostik database (hanya untuk admin)
+    if st.session_state.is_authenticated:
+        with st.expander("Diagnostik Database"):
+            pool_status = get_pool_status()
+            st.caption(f"Status pool: {pool_status['status']}")
+            st.json(pool_status["config"])
+            st.dataframe(
+                pd.DataFrame(list(get_pool_summary().items()), columns=["Metrik", "Nilai"]),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.download_button(
+                "Unduh Metrik (Prometheus)",
+                data=render_prometheus(),
+                file_name="karet_metrics.prom",
+                mime="text/plain"
+            )
+            
+            # Statistik query per fungsi pada rerun sebelumnya
+            st.markdown("**Query rerun sebelumnya**")
+            if previous_query_log and previous_query_log.queries:
+                st.caption(f"{len(previous_query_log.queries)} query, total {previous_query_log.total_ms:.1f} ms")
+                st.dataframe(pd.DataFrame(previous_query_log.summary()).round(2), use_container_width=True, hide_index=True)
+            else:
+                st.caption("Belum ada data query.")
+            
+            # Slow query log dengan rencana eksekusi
+            st.markdown(f"**Slow query (≥ {SLOW_QUERY_MS:.0f} ms)**")
+            if slow_query_log:
+                for q in reversed(slow_query_log):
+                    st.caption(f"{q['waktu']} - {q['fungsi']} - {q['durasi_ms']} ms")
+                    st.code(q["statement"] + ("\n\n" + q["plan"] if q["plan"] else ""), language="sql")
+            else:
+                st.caption("Tidak ada slow query.")
+            
+            # Statistik cache bersama (hit/miss dihitung per worker)
+            st.markdown("**Cache bersama**")
+            st.json({"cache": get_cache().stats(), "listener_perubahan": get_listener_status()})
+            
+            # Mode profiling per rerun (berlaku mulai rerun berikutnya)
+            st.toggle(
+                "Mode profiling rerun",
+                key="profiling_enabled",
+                disabled=PROFILE_ENV_ENABLED,
+                help="Membungkus setiap rerun dengan cProfile. Aktif untuk semua sesi jika KARET_PROFILE=1."
+            )
 
 # Main content area with tabs
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "Rencana Penjualan Karet", 
     "Strategi dan Risiko", 
     "Realisasi Anggaran",
-    "Harga SICOM x SIR 20"
+    "Harga SICOM x SIR 20",
+    "Konsolidasi",
+    "Simulasi"
 ])
 
 # Tab 1: Rencana Penjualan Karet
-with tab1:
+with tab1, rerun_profiler.phase("Tab: Rencana Penjualan Karet"):
     st.header("Rencana Penjualan Karet")
     
     # Get penjualan_karet data for the selected perusahaan
@@ -150,30 +238,61 @@ with tab1:
         # Disable form jika belum terotentikasi
         form_disabled = not st.session_state.is_authenticated
         
+        # Prediksi susut dari model histori; mengisi awal form saat perusahaan berganti
+        model_susut = get_model_susut(get_data_susut)
+        if model_susut is not None:
+            if st.session_state.get("penjualan_prefill_perusahaan") != st.session_state.selected_perusahaan_id:
+                st.session_state.penjualan_prefill_perusahaan = st.session_state.selected_perusahaan_id
+                jarak_awal = float(max(penjualan_data, key=lambda p: p.tanggal).jarak or 0.0) if penjualan_data else 0.0
+                st.session_state.prediksi_jarak = jarak_awal
+                st.session_state.penjualan_jarak = jarak_awal
+                st.session_state.penjualan_susut = round(float(prediksi_susut(
+                    model_susut, st.session_state.selected_perusahaan_id or 0, jarak_awal
+                )["susut"]), 1)
+            
+            def _isi_prediksi_susut(jarak_rencana, susut_prediksi):
+                st.session_state.penjualan_jarak = jarak_rencana
+                st.session_state.penjualan_susut = susut_prediksi
+            
+            col1, col2, col3 = st.columns([2, 2, 1])
+            with col1:
+                jarak_rencana = st.number_input("Jarak rencana (km)", min_value=0.0, step=0.1, key="prediksi_jarak")
+            prediksi = prediksi_susut(model_susut, st.session_state.selected_perusahaan_id or 0, jarak_rencana)
+            susut_prediksi = round(float(prediksi["susut"]), 1)
+            with col2:
+                st.metric("Prediksi Susut", f"{susut_prediksi:.1f}%")
+                st.caption(f"Interval 90%: {float(prediksi['bawah']):.1f}% - {float(prediksi['atas']):.1f}%")
+            with col3:
+                st.button(
+                    "Isi ke Form",
+                    on_click=_isi_prediksi_susut,
+                    args=(jarak_rencana, susut_prediksi),
+                    key="prediksi_isi_form"
+                )
+        
         with st.form("penjualan_karet_form"):
             col1, col2 = st.columns(2)
             
             with col1:
                 tanggal = st.date_input("Tanggal", date.today())
-                jarak = st.number_input("Jarak (km)", min_value=0.0, step=0.1)
+                jarak = st.number_input("Jarak (km)", min_value=0.0, step=0.1, key="penjualan_jarak")
                 harga_jual = st.number_input("Harga Jual (Rp/kg)", min_value=0.0, step=100.0)
-                susut = st.number_input("Susut (%)", min_value=0.0, max_value=100.0, step=0.1)
+                susut = st.number_input("Susut (%)", min_value=0.0, max_value=100.0, step=0.1, key="penjualan_susut")
                 harga_beli = st.number_input("Harga Beli (Rp/kg)", min_value=0.0, step=100.0)
             
             with col2:
                 berat_awal = st.number_input("Berat Awal (kg)", min_value=0.0, step=10.0)
-                # Calculate berat_jual based on susut
-                berat_jual = berat_awal * (1 - susut/100)
-                st.metric("Berat Jual (kg)", f"{berat_jual:.2f}")
-                
-                # Calculate totals
-                total_harga_jual = harga_jual * berat_jual
-                total_harga_beli = harga_beli * berat_awal
-                keuntungan_kotor = total_harga_jual - total_harga_beli
-                
                 ongkos_kirim = st.number_input("Ongkos Kirim (Rp)", min_value=0.0, step=100000.0)
-                keuntungan_bersih = keuntungan_kotor - ongkos_kirim
                 
+                # Rumus yang sama dengan tab Simulasi
+                hasil = hitung_penjualan(berat_awal, harga_jual, harga_beli, susut, ongkos_kirim)
+                berat_jual = hasil["berat_jual"]
+                total_harga_jual = hasil["total_harga_jual"]
+                total_harga_beli = hasil["total_harga_beli"]
+                keuntungan_kotor = hasil["keuntungan_kotor"]
+                keuntungan_bersih = hasil["keuntungan_bersih"]
+                
+                st.metric("Berat Jual (kg)", f"{berat_jual:.2f}")
                 st.metric("Total Harga Jual", format_currency(total_harga_jual))
                 st.metric("Total Harga Beli", format_currency(total_harga_beli))
                 st.metric("Keuntungan Kotor", format_currency(keuntungan_kotor))
@@ -208,25 +327,24 @@ with tab1:
     
     # Display existing data in table
     if penjualan_data:
+        # KPI dari ringkasan bulanan (beberapa baris, bukan seluruh histori penjualan)
+        ringkasan_data = get_ringkasan_penjualan(st.session_state.selected_perusahaan_id)
+        kpi = ringkasan_kpi(ringkasan_data)
+        
+        st.subheader("Ringkasan Penjualan")
+        kpi_cols = st.columns(5)
+        kpi_cols[0].metric("Jumlah Penjualan", kpi["jumlah_penjualan"])
+        kpi_cols[1].metric("Total Berat Jual", f"{kpi['total_berat_jual']:,.0f} kg")
+        kpi_cols[2].metric("Total Keuntungan Bersih", format_currency(kpi["total_keuntungan_bersih"]))
+        kpi_cols[3].metric("Keuntungan Tertinggi", format_currency(kpi["keuntungan_maks"]))
+        kpi_cols[4].metric("Keuntungan Terendah", format_currency(kpi["keuntungan_min"]))
+        
+        with st.expander("Ringkasan per Bulan"):
+            st.dataframe(ringkasan_penjualan_dataframe(ringkasan_data), use_container_width=True, hide_index=True)
+        
         st.subheader("Data Penjualan Karet")
         
-        df_penjualan = pd.DataFrame([
-            {
-                "ID": p.id,
-                "Tanggal": p.tanggal,
-                "Jarak (km)": p.jarak,
-                "Harga Jual (Rp/kg)": p.harga_jual,
-                "Susut (%)": p.susut,
-                "Harga Beli (Rp/kg)": p.harga_beli,
-                "Berat Awal (kg)": p.berat_awal,
-                "Berat Jual (kg)": p.berat_jual,
-                "Total Harga Jual": p.total_harga_jual,
-                "Total Harga Beli": p.total_harga_beli,
-                "Keuntungan Kotor": p.keuntungan_kotor,
-                "Ongkos Kirim": p.ongkos_kirim,
-                "Keuntungan Bersih": p.keuntungan_bersih
-            } for p in penjualan_data
-        ])
+        df_penjualan = penjualan_dataframe(penjualan_data)
         
         # Tampilkan tabel tanpa kolom ID
         st.dataframe(df_penjualan.drop(columns=["ID"]), use_container_width=True)
@@ -269,17 +387,20 @@ with tab1:
             else:
                 return "red"
         
+        # Semua data milik perusahaan yang dipilih, jadi namanya cukup diambil sekali
+        nama_perusahaan = get_perusahaan_by_id(st.session_state.selected_perusahaan_id).nama
         for p in penjualan_data:
             color = get_color_based_on_profit(p.keuntungan_bersih)
             st.markdown(f"""
             <div style="padding: 10px; border-left: 5px solid {color}; margin-bottom: 10px;">
-                <h4>{get_perusahaan_by_id(p.perusahaan_id).nama}</h4>
+                <h4>{nama_perusahaan}</h4>
                 <p><strong>Keuntungan Bersih:</strong> {format_currency(p.keuntungan_bersih)}</p>
                 <p>{p.rekomendasi}</p>
             </div>
             """, unsafe_allow_html=True)
         
-        # Visualizations
+        # Visualizations (plotly baru dimuat saat grafik pertama kali dibutuhkan)
+        import plotly.express as px
         st.subheader("Visualisasi")
         
         fig = px.bar(
@@ -293,10 +414,13 @@ with tab1:
         
         # Plot comparison between price and distance
         # Tambahkan kolom untuk nilai absolut keuntungan bersih untuk ukuran marker
-        df_penjualan["Keuntungan_Bersih_Abs"] = np.abs(df_penjualan["Keuntungan Bersih"])
+        df_penjualan["Keuntungan_Bersih_Abs"] = df_penjualan["Keuntungan Bersih"].abs()
+        
+        # Scatter disampel dan memakai WebGL jika datanya besar; figure disimpan per versi data penjualan
+        penjualan_namespaces = table_namespaces("penjualan_karet", st.session_state.selected_perusahaan_id)
         
         # Gunakan nilai absolut untuk size dan nilai asli untuk color
-        fig2 = px.scatter(
+        fig2 = cached_figure("penjualan_harga_jarak", (st.session_state.selected_perusahaan_id,), penjualan_namespaces, lambda: grafik_sebar(
             df_penjualan,
             x="Jarak (km)",
             y="Harga Jual (Rp/kg)",
@@ -305,26 +429,85 @@ with tab1:
             hover_name="Tanggal",
             title="Hubungan antara Jarak, Harga Jual, dan Keuntungan",
             size_max=50,  # Batasi ukuran maksimum marker
-        )
+        ))
         st.plotly_chart(fig2, use_container_width=True)
         
         # Plot susut vs distance - pastikan menggunakan nilai positif untuk ukuran marker
-        fig3 = px.scatter(
-            df_penjualan,
-            x="Jarak (km)",
-            y="Susut (%)",
-            size="Berat Awal (kg)",  # Ini seharusnya selalu positif
-            color="Keuntungan Bersih",
-            hover_name="Tanggal",
-            title="Hubungan antara Jarak dan Susut",
-            size_max=40  # Batasi ukuran maksimum marker
+        def _grafik_susut():
+            fig3 = grafik_sebar(
+                df_penjualan,
+                x="Jarak (km)",
+                y="Susut (%)",
+                size="Berat Awal (kg)",  # Ini seharusnya selalu positif
+                color="Keuntungan Bersih",
+                hover_name="Tanggal",
+                title="Hubungan antara Jarak dan Susut",
+                size_max=40  # Batasi ukuran maksimum marker
+            )
+            
+            # Garis prediksi model susut beserta interval 90%
+            if model_susut is not None:
+                jarak_garis = np.linspace(0, max(df_penjualan["Jarak (km)"].max(), 1.0) * 1.1, 50)
+                garis = prediksi_susut(model_susut, st.session_state.selected_perusahaan_id, jarak_garis)
+                fig3.add_scatter(x=jarak_garis, y=garis["atas"], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip")
+                fig3.add_scatter(
+                    x=jarak_garis, y=garis["bawah"], mode="lines", line=dict(width=0),
+                    fill="tonexty", fillcolor="rgba(100, 100, 100, 0.2)", name="Interval 90%"
+                )
+                fig3.add_scatter(x=jarak_garis, y=garis["susut"], mode="lines", line=dict(color="black"), name="Prediksi Susut")
+            return fig3
+        
+        # Model susut dilatih dari penjualan semua perusahaan, jadi figure ikut bergantung pada semuanya
+        fig3 = cached_figure(
+            "penjualan_susut_jarak", (st.session_state.selected_perusahaan_id,),
+            penjualan_namespaces + table_namespaces("penjualan_karet", None), _grafik_susut
         )
         st.plotly_chart(fig3, use_container_width=True)
+        
+        # Selisih harga jual terhadap harga SIR 20 SICOM yang berlaku pada tanggal penjualan
+        st.subheader("Harga Jual vs Harga Pasar SIR 20")
+        spread_penjualan = get_spread_penjualan(
+            st.session_state.selected_perusahaan_id, lambda: penjualan_data, get_harga_pasar_harian
+        )
+        ringkasan_selisih = ringkasan_spread(spread_penjualan)
+        if ringkasan_selisih["jumlah_penjualan"]:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Rata-rata Selisih (Rp/kg)", format_currency(ringkasan_selisih["spread_rata_rata"]))
+            with col2:
+                st.metric("Selisih Tertimbang Berat (Rp/kg)", format_currency(ringkasan_selisih["spread_tertimbang"]))
+            with col3:
+                st.metric("Median Selisih", f"{ringkasan_selisih['spread_persen_median']:.1f}%")
+            with col4:
+                st.metric("Rentang P10-P90", f"{ringkasan_selisih['spread_persen_p10']:.1f}% s/d {ringkasan_selisih['spread_persen_p90']:.1f}%")
+            st.caption(
+                f"{ringkasan_selisih['jumlah_penjualan']} penjualan dibandingkan dengan harga SIR 20 SICOM terakhir "
+                f"yang berlaku (maksimal {MAKS_UMUR_HARGA_HARI} hari sebelumnya); "
+                f"{ringkasan_selisih['jumlah_tanpa_harga']} penjualan tanpa harga pasar."
+            )
+            
+            fig_selisih = cached_figure(
+                "penjualan_spread", (st.session_state.selected_perusahaan_id,),
+                penjualan_namespaces + table_namespaces("harga_sicom_harian", None),
+                lambda: grafik_sebar(
+                    spread_penjualan.dropna(subset=["spread_persen"]).rename(columns={
+                        "tanggal": "Tanggal", "spread_persen": "Selisih (%)",
+                        "harga_jual": "Harga Jual (Rp/kg)", "harga_pasar": "Harga SIR 20 (Rp/kg)"
+                    }),
+                    x="Tanggal",
+                    y="Selisih (%)",
+                    hover_data=["Harga Jual (Rp/kg)", "Harga SIR 20 (Rp/kg)"],
+                    title="Selisih Harga Jual terhadap Harga SIR 20 per Penjualan"
+                )
+            )
+            st.plotly_chart(fig_selisih, use_container_width=True)
+        else:
+            st.info("Belum ada penjualan yang tanggalnya tercakup harga SIR 20 SICOM.")
     else:
         st.info("Belum ada data penjualan karet. Silakan tambahkan data baru menggunakan form di atas.")
 
 # Tab 2: Strategi dan Risiko
-with tab2:
+with tab2, rerun_profiler.phase("Tab: Strategi dan Risiko"):
     st.header("Strategi dan Risiko Pasar Penjualan Karet")
     
     # Get strategi_risiko data for the selected perusahaan
@@ -362,14 +545,7 @@ with tab2:
     if strategi_data:
         st.subheader("Data Strategi dan Risiko")
         
-        df_strategi = pd.DataFrame([
-            {
-                "No": i+1,
-                "Aspek": s.aspek,
-                "Risiko": s.risiko,
-                "Solusi": s.solusi
-            } for i, s in enumerate(strategi_data)
-        ])
+        df_strategi = strategi_dataframe(strategi_data)
         
         st.dataframe(df_strategi, use_container_width=True)
         
@@ -387,8 +563,88 @@ with tab2:
     else:
         st.info("Belum ada data strategi dan risiko. Silakan tambahkan data baru menggunakan form di atas.")
 
+    # Risiko harga: simulasi Monte Carlo harga SIR 20 terhadap rencana penjualan
+    st.subheader("Simulasi Risiko Harga SIR 20 (Monte Carlo)")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        metode_simulasi = st.selectbox("Metode", list(METODE_SIMULASI), format_func=METODE_SIMULASI.get, key="mc_metode")
+    with col2:
+        horizon_simulasi = st.slider("Horizon (minggu)", min_value=1, max_value=52, value=12, key="mc_horizon")
+    with col3:
+        jumlah_jalur = st.selectbox("Jumlah Jalur", [10_000, 50_000, JUMLAH_JALUR], index=2, format_func=lambda n: f"{n:,}", key="mc_jalur")
+    with col4:
+        tingkat_keyakinan = st.selectbox("Tingkat Keyakinan", [0.90, 0.95, 0.99], index=1, format_func=format_percentage, key="mc_tingkat")
+
+    hasil_simulasi = get_simulasi_harga(horizon_simulasi, jumlah_jalur, metode_simulasi, get_harga_pasar_harian)
+    eksposur = pd.DataFrame(get_konsolidasi_penjualan())
+
+    if hasil_simulasi is None:
+        st.info("Belum cukup data harga SIR 20 SICOM untuk simulasi risiko harga.")
+    elif eksposur.empty:
+        st.info("Belum ada data penjualan karet untuk disimulasikan.")
+    else:
+        eksposur = eksposur[["perusahaan_id", "nama", "total_harga_jual", "total_keuntungan_bersih"]].fillna(0)
+        risiko = pd.concat([
+            eksposur.reset_index(drop=True),
+            risiko_keuntungan(hasil_simulasi, eksposur["total_harga_jual"], eksposur["total_keuntungan_bersih"], tingkat_keyakinan)
+        ], axis=1)
+
+        st.caption(
+            f"{hasil_simulasi['jumlah_jalur']:,} jalur {METODE_SIMULASI[hasil_simulasi['metode']].lower()} dari "
+            f"{hasil_simulasi['jumlah_return']} return mingguan (volatilitas {hasil_simulasi['volatilitas'] * 100:.2f}%/minggu), "
+            f"mulai dari harga {format_currency(hasil_simulasi['harga_awal'])} pada {hasil_simulasi['tanggal_awal']:%d/%m/%Y}. "
+            "Harga jual rencana penjualan diasumsikan bergerak sebanding dengan harga SIR 20."
+        )
+
+        risiko_terpilih = risiko[risiko["perusahaan_id"] == st.session_state.selected_perusahaan_id]
+        if not risiko_terpilih.empty:
+            r = risiko_terpilih.iloc[0]
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Ekspektasi Keuntungan", format_currency(r["ekspektasi_keuntungan"]))
+            with col2:
+                st.metric(f"VaR {format_percentage(tingkat_keyakinan)}", format_currency(r["var"]))
+            with col3:
+                st.metric(f"CVaR {format_percentage(tingkat_keyakinan)}", format_currency(r["cvar"]))
+            with col4:
+                st.metric("Probabilitas Rugi", format_percentage(r["probabilitas_rugi"]))
+
+            import plotly.graph_objects as go
+            histogram = histogram_keuntungan(hasil_simulasi, r["total_harga_jual"], r["total_keuntungan_bersih"])
+            fig_histogram = go.Figure(go.Bar(
+                x=histogram["tengah"], y=histogram["jumlah"], width=histogram["lebar"],
+                marker_color=np.where(histogram["tengah"] < 0, "#d62728", "#1f77b4")
+            ))
+            fig_histogram.add_vline(x=-r["var"], line_dash="dash", annotation_text=f"VaR {format_percentage(tingkat_keyakinan)}")
+            fig_histogram.update_layout(
+                title=f"Distribusi Keuntungan {horizon_simulasi} Minggu ke Depan",
+                xaxis_title="Keuntungan Bersih (Rp)", yaxis_title="Jumlah Jalur", bargap=0
+            )
+            st.plotly_chart(fig_histogram, use_container_width=True)
+
+        kipas = hasil_simulasi["kipas"]
+        fig_kipas = grafik_garis(
+            kipas, x="minggu", y=[c for c in kipas.columns if c != "minggu"],
+            title="Sebaran Harga SIR 20 Simulasi (Persentil)",
+            labels={"minggu": "Minggu ke-", "value": "Harga SIR 20 (Rp/kg)", "variable": "Persentil"}
+        )
+        st.plotly_chart(fig_kipas, use_container_width=True)
+
+        with st.expander("Risiko Harga Semua Perusahaan"):
+            st.dataframe(
+                risiko.drop(columns=["perusahaan_id"]).sort_values("probabilitas_rugi", ascending=False).rename(columns={
+                    "nama": "Perusahaan", "total_harga_jual": "Total Harga Jual (Rp)",
+                    "total_keuntungan_bersih": "Keuntungan Bersih (Rp)",
+                    "ekspektasi_keuntungan": "Ekspektasi Keuntungan (Rp)",
+                    "keuntungan_p5": "Keuntungan P5 (Rp)", "keuntungan_p95": "Keuntungan P95 (Rp)",
+                    "var": "VaR (Rp)", "cvar": "CVaR (Rp)", "probabilitas_rugi": "Probabilitas Rugi"
+                }),
+                use_container_width=True, hide_index=True
+            )
+
 # Tab 3: Realisasi Anggaran
-with tab3:
+with tab3, rerun_profiler.phase("Tab: Realisasi Anggaran"):
     st.header("Realisasi Anggaran")
     
     # Get realisasi_anggaran data for the selected perusahaan
@@ -422,7 +678,11 @@ with tab3:
                 saldo = last_saldo + debet - kredit
                 st.metric("Saldo", format_currency(saldo))
                 
-                volume = st.text_input("Volume", "")
+                col_jumlah, col_satuan = st.columns(2)
+                with col_jumlah:
+                    volume_jumlah = st.number_input("Volume", min_value=0.0, value=1.0, step=1.0, key="anggaran_volume_jumlah")
+                with col_satuan:
+                    volume_satuan = st.selectbox("Satuan", [s.value for s in SatuanVolume], index=1, key="anggaran_volume_satuan")
                 keterangan = st.text_area("Keterangan", "")
             
             submit_button = st.form_submit_button("Simpan Data")
@@ -436,8 +696,10 @@ with tab3:
                         debet,
                         kredit,
                         saldo,  # Parameter saldo ini sekarang tidak digunakan, tetapi dikirim untuk kompatibilitas
-                        volume,
-                        keterangan
+                        format_volume(volume_jumlah, volume_satuan),
+                        keterangan,
+                        volume_jumlah,
+                        volume_satuan
                     )
                     st.success(f"Realisasi anggaran berhasil disimpan! Saldo baru: {format_currency(new_saldo)}")
                     st.rerun()
@@ -448,22 +710,8 @@ with tab3:
     if anggaran_data:
         st.subheader("Data Realisasi Anggaran")
         
-        # Sort by date
-        sorted_anggaran = sorted(anggaran_data, key=lambda x: x.tanggal)
-        
-        # Tambahkan data ID untuk keperluan edit dan hapus
-        df_anggaran = pd.DataFrame([
-            {
-                "ID": a.id,
-                "No": i+1,
-                "Tanggal": a.tanggal,
-                "Debet (In)": a.debet,
-                "Kredit (Out)": a.kredit,
-                "Saldo": a.saldo,
-                "Volume": a.volume,
-                "Keterangan": a.keterangan
-            } for i, a in enumerate(sorted_anggaran)
-        ])
+        # Tambahkan data ID untuk keperluan edit dan hapus (diurutkan berdasarkan tanggal)
+        df_anggaran = anggaran_dataframe(anggaran_data)
         
         # Tampilkan tabel
         st.dataframe(df_anggaran.drop(columns=["ID"]), use_container_width=True)
@@ -504,7 +752,13 @@ with tab3:
                         edit_tanggal = st.date_input("Tanggal", value=selected_data.tanggal, key="edit_tanggal")
                         edit_debet = st.number_input("Debet (In)", value=selected_data.debet, min_value=0.0, step=100000.0, key="edit_debet")
                         edit_kredit = st.number_input("Kredit (Out)", value=selected_data.kredit, min_value=0.0, step=100000.0, key="edit_kredit")
-                        edit_volume = st.text_input("Volume", value=selected_data.volume, key="edit_volume")
+                        satuan_lama = selected_data.volume_satuan.value if selected_data.volume_satuan else SatuanVolume.LAINNYA.value
+                        pilihan_satuan = [s.value for s in SatuanVolume]
+                        col_jumlah, col_satuan = st.columns(2)
+                        with col_jumlah:
+                            edit_volume_jumlah = st.number_input("Volume", value=float(selected_data.volume_jumlah or 0), min_value=0.0, step=1.0, key="edit_volume_jumlah")
+                        with col_satuan:
+                            edit_volume_satuan = st.selectbox("Satuan", pilihan_satuan, index=pilihan_satuan.index(satuan_lama), key="edit_volume_satuan")
                         edit_keterangan = st.text_area("Keterangan", value=selected_data.keterangan, key="edit_keterangan")
                         
                         edit_submit = st.form_submit_button("Update Data")
@@ -521,8 +775,10 @@ with tab3:
                                     edit_debet,
                                     edit_kredit,
                                     0,  # Parameter saldo akan dikalkulasi otomatis
-                                    edit_volume,
-                                    edit_keterangan
+                                    format_volume(edit_volume_jumlah, edit_volume_satuan),
+                                    edit_keterangan,
+                                    edit_volume_jumlah,
+                                    edit_volume_satuan
                                 )
                                 
                                 st.success(f"Data berhasil diupdate! Saldo baru: {format_currency(new_saldo)}")
@@ -530,36 +786,50 @@ with tab3:
                             except Exception as e:
                                 st.error(f"Terjadi kesalahan saat mengupdate data: {e}")
         
-        # Visualizations
+        # Visualizations (plotly baru dimuat saat grafik pertama kali dibutuhkan)
+        import plotly.express as px
+        import plotly.graph_objects as go
         st.subheader("Visualisasi")
         
+        # Arus kas diringkas per hari/minggu/bulan/tahun agar jumlah batang muat di lebar grafik
+        pilihan_granularitas = st.selectbox(
+            "Periode Grafik",
+            ["otomatis", *GRANULARITAS],
+            format_func=lambda g: "Otomatis" if g == "otomatis" else LABEL_GRANULARITAS[g],
+            key="anggaran_granularitas"
+        )
+        granularitas = pilihan_granularitas
+        if granularitas == "otomatis":
+            granularitas = pilih_granularitas(df_anggaran["Tanggal"].min(), df_anggaran["Tanggal"].max())
+        arus_kas = get_arus_kas(st.session_state.selected_perusahaan_id, granularitas, lambda: anggaran_data)
+        
         # Create cumulative cash flow chart
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x=df_anggaran["Tanggal"],
-            y=df_anggaran["Saldo"],
+            x=arus_kas["periode"],
+            y=arus_kas["saldo"],
             mode='lines+markers',
-            name='Saldo',
+            name='Saldo Akhir',
             line=dict(color='green', width=3)
         ))
         
         fig.add_trace(go.Bar(
-            x=df_anggaran["Tanggal"],
-            y=df_anggaran["Debet (In)"],
+            x=arus_kas["periode"],
+            y=arus_kas["debet"],
             name='Debet (In)',
             marker_color='blue'
         ))
         
         fig.add_trace(go.Bar(
-            x=df_anggaran["Tanggal"],
-            y=-df_anggaran["Kredit (Out)"],
+            x=arus_kas["periode"],
+            y=-arus_kas["kredit"],
             name='Kredit (Out)',
             marker_color='red'
         ))
         
         fig.update_layout(
-            title='Arus Kas dan Saldo',
+            title=f'Arus Kas dan Saldo ({LABEL_GRANULARITAS[granularitas]})',
             xaxis_title='Tanggal',
             yaxis_title='Jumlah (Rp)',
             barmode='relative'
@@ -582,82 +852,121 @@ with tab3:
         else:
             st.info("Login sebagai admin untuk mengakses fitur perbaikan saldo")
         
-        total_debet = sum(a.debet for a in anggaran_data)
-        total_kredit = sum(a.kredit for a in anggaran_data)
-        current_saldo = df_anggaran["Saldo"].iloc[-1] if not df_anggaran.empty else 0
+        # KPI kas dari ringkasan anggaran bulanan, tanpa memindai ulang seluruh buku kas
+        jendela_kpi = st.slider("Rata-rata Bergulir KPI (bulan)", min_value=1, max_value=12, value=JENDELA_BULAN, key="kpi_jendela")
+        kpi_anggaran = get_kpi_anggaran(
+            st.session_state.selected_perusahaan_id, jendela_kpi,
+            lambda: get_ringkasan_anggaran(st.session_state.selected_perusahaan_id)
+        )
+        kpi = kpi_terkini(kpi_anggaran) or {}
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Total Dana Masuk", format_currency(total_debet))
+            st.metric("Total Dana Masuk", format_currency(kpi.get("total_pendapatan", 0)))
         
         with col2:
-            st.metric("Total Pengeluaran", format_currency(total_kredit))
+            st.metric("Total Pengeluaran", format_currency(kpi.get("total_pengeluaran", 0)))
         
         with col3:
-            st.metric("Saldo Akhir", format_currency(current_saldo))
+            st.metric("Saldo Akhir", format_currency(kpi.get("saldo_akhir", 0)))
         
-        # Grouping kredit by keterangan
-        if not df_anggaran.empty:
-            # Membuat data frame untuk analisis
-            kredit_df = df_anggaran[df_anggaran["Kredit (Out)"] > 0].copy()
+        if kpi:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"Burn Rate Bersih ({jendela_kpi} bln)", format_currency(kpi["burn_rate"]) + "/bulan")
+            with col2:
+                st.metric("Runway", format_runway(kpi))
+            with col3:
+                st.metric("Modal Kerja", format_currency(kpi["modal_kerja"]))
+            st.caption(
+                f"Rata-rata bergulir {jendela_kpi} bulan sampai {kpi['periode']:%m/%Y}. Burn rate negatif berarti kas bertambah; "
+                "modal kerja = saldo kas dikurangi rata-rata pengeluaran sebulan."
+            )
             
-            if not kredit_df.empty:
-                # Tambahkan kolom total volume untuk setiap kategori
-                volume_by_category = {}
-                for _, row in kredit_df.iterrows():
-                    kategori = row["Keterangan"]
-                    volume = row["Volume"]
-                    if kategori in volume_by_category:
-                        volume_by_category[kategori] += f", {volume}"
-                    else:
-                        volume_by_category[kategori] = volume
-                
-                # Agregasi berdasarkan kategori
-                kredit_by_category = kredit_df.groupby("Keterangan")["Kredit (Out)"].sum().reset_index()
-                
-                # Tambahkan informasi volume ke hover text
-                hover_data = {
-                    "Kredit (Out)": True,
-                    "Volume": [volume_by_category.get(k, "N/A") for k in kredit_by_category["Keterangan"]]
-                }
-                
-                # Hitung total biaya
-                total_kredit = kredit_by_category["Kredit (Out)"].sum()
-                
-                # Buat pie chart dengan informasi tambahan
-                fig_pie = px.pie(
-                    kredit_by_category,
-                    values="Kredit (Out)",
-                    names="Keterangan",
-                    title=f"Distribusi Pengeluaran (Total: {format_currency(total_kredit)})",
-                    hover_data=hover_data,
-                    labels={"Kredit (Out)": "Jumlah Pengeluaran", "Volume": "Volume"}
+            with st.expander("Tren KPI Kas Bulanan"):
+                st.plotly_chart(grafik_garis(
+                    kpi_anggaran.rename(columns={"saldo_akhir": "Saldo Akhir", "burn_rate": "Burn Rate Bersih", "modal_kerja": "Modal Kerja"}),
+                    x="periode", y=["Saldo Akhir", "Burn Rate Bersih", "Modal Kerja"],
+                    title="Saldo, Burn Rate dan Modal Kerja per Bulan",
+                    labels={"periode": "Bulan", "value": "Jumlah (Rp)", "variable": "KPI"}
+                ), use_container_width=True)
+                st.dataframe(
+                    kpi_anggaran.assign(periode=kpi_anggaran["periode"].dt.strftime("%m/%Y")).rename(columns={
+                        "periode": "Bulan", "pendapatan": "Dana Masuk (Rp)", "pengeluaran": "Pengeluaran (Rp)",
+                        "arus_kas_bersih": "Arus Kas Bersih (Rp)", "saldo_akhir": "Saldo Akhir (Rp)",
+                        "jumlah_transaksi": "Jumlah Transaksi", "pendapatan_rata": "Rata-rata Dana Masuk (Rp)",
+                        "pengeluaran_rata": "Rata-rata Pengeluaran (Rp)", "burn_rate": "Burn Rate Bersih (Rp)",
+                        "runway_bulan": "Runway (bulan)", "modal_kerja": "Modal Kerja (Rp)"
+                    }),
+                    use_container_width=True, hide_index=True
                 )
-                
-                # Tambahkan informasi persentase dan volume ke dalam teks label pie
-                fig_pie.update_traces(
-                    hovertemplate="<b>%{label}</b><br>Jumlah: %{value}<br>Persentase: %{percent}<br>Volume: %{customdata[1]}"
-                )
-                
-                st.plotly_chart(fig_pie, use_container_width=True)
-                
-                # Tambahkan detail tabel untuk volume dan biaya
-                st.subheader("Detail Pengeluaran per Kategori")
-                
-                # Buat dataframe detail dengan volume dan biaya
-                detail_df = pd.DataFrame({
-                    "Kategori": kredit_by_category["Keterangan"],
-                    "Total Biaya": [format_currency(val) for val in kredit_by_category["Kredit (Out)"]],
-                    "Persentase": [f"{val/total_kredit*100:.2f}%" for val in kredit_by_category["Kredit (Out)"]],
-                    "Volume": [volume_by_category.get(k, "N/A") for k in kredit_by_category["Keterangan"]]
-                })
-                
-                st.dataframe(detail_df, use_container_width=True)
+        
+        # Pengeluaran per kategori: total biaya dan volume per satuan dijumlahkan dengan SQL
+        ringkasan_volume = pd.DataFrame(
+            get_ringkasan_volume(st.session_state.selected_perusahaan_id),
+            columns=["keterangan", "volume_satuan", "jumlah_transaksi", "total_volume", "total_kredit", "biaya_per_satuan"]
+        )
+        
+        if not ringkasan_volume.empty:
+            ringkasan_volume["volume_satuan"] = [getattr(s, "value", s) for s in ringkasan_volume["volume_satuan"]]
+            per_kategori = ringkasan_volume.groupby("keterangan", sort=False, dropna=False)
+            kredit_by_category = per_kategori["total_kredit"].sum().reset_index()
+            kredit_by_category["volume"] = [
+                ringkas_volume(g["total_volume"], g["volume_satuan"]) or "N/A" for _, g in per_kategori
+            ]
+            
+            # Hitung total biaya
+            total_kredit = kredit_by_category["total_kredit"].sum()
+            
+            # Pembelian dalam kilogram dan biaya per kg (hanya baris bersatuan kg)
+            per_kg = ringkasan_volume[ringkasan_volume["volume_satuan"] == SatuanVolume.KG.value]
+            total_kg = per_kg["total_volume"].sum()
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Pembelian (kg)", f"{total_kg:,.0f} kg")
+            with col2:
+                st.metric("Biaya per kg", format_currency(per_kg["total_kredit"].sum() / total_kg) if total_kg > 0 else "-")
+            
+            # Buat pie chart dengan informasi tambahan
+            fig_pie = px.pie(
+                kredit_by_category,
+                values="total_kredit",
+                names="keterangan",
+                title=f"Distribusi Pengeluaran (Total: {format_currency(total_kredit)})",
+                hover_data=["volume"],
+                labels={"total_kredit": "Jumlah Pengeluaran", "keterangan": "Keterangan", "volume": "Volume"}
+            )
+            
+            # Tambahkan informasi persentase dan volume ke dalam teks label pie
+            fig_pie.update_traces(
+                hovertemplate="<b>%{label}</b><br>Jumlah: %{value}<br>Persentase: %{percent}<br>Volume: %{customdata[0]}"
+            )
+            
+            st.plotly_chart(fig_pie, use_container_width=True)
+            
+            # Tambahkan detail tabel untuk volume dan biaya
+            st.subheader("Detail Pengeluaran per Kategori")
+            
+            # Satu baris per kategori dan satuan, dengan biaya per satuan
+            detail_df = pd.DataFrame({
+                "Kategori": ringkasan_volume["keterangan"],
+                "Total Biaya": [format_currency(val) for val in ringkasan_volume["total_kredit"]],
+                "Persentase": [f"{val/total_kredit*100:.2f}%" for val in ringkasan_volume["total_kredit"]],
+                "Volume": [format_volume(j, s) or "N/A" for j, s in zip(ringkasan_volume["total_volume"], ringkasan_volume["volume_satuan"])],
+                "Biaya per Satuan": [
+                    f"{format_currency(b)}/{s}" if pd.notna(b) and s != SatuanVolume.LAINNYA.value else "-"
+                    for b, s in zip(ringkasan_volume["biaya_per_satuan"], ringkasan_volume["volume_satuan"])
+                ],
+                "Transaksi": ringkasan_volume["jumlah_transaksi"]
+            })
+            
+            st.dataframe(detail_df, use_container_width=True, hide_index=True)
     else:
         st.info("Belum ada data realisasi anggaran. Silakan tambahkan data baru menggunakan form di atas.")
 
 # Download PDF section
+rerun_profiler.start_phase("Laporan PDF")
 st.markdown("---")
 st.header("Unduh Laporan PDF")
 
@@ -675,121 +984,54 @@ if st.button("Buat Laporan PDF"):
     if st.session_state.selected_perusahaan_id:
         with st.spinner("Membuat laporan PDF..."):
             try:
+                # Stack PDF (reportlab + matplotlib) hanya dimuat saat laporan dibuat
+                from pdf_generator import generate_pdf_penjualan_karet
+                
                 # Dapatkan data perusahaan
                 perusahaan = get_perusahaan_by_id(st.session_state.selected_perusahaan_id)
-                perusahaan_data = {
-                    "nama": perusahaan.nama,
-                    "jenis": perusahaan.jenis
-                }
-                
-                # Dapatkan data penjualan karet
-                penjualan_karet_data = []
-                for p in get_penjualan_karet(st.session_state.selected_perusahaan_id):
-                    penjualan_karet_data.append({
-                        "nama_perusahaan": perusahaan.nama,
-                        "jarak": p.jarak,
-                        "harga_jual": format_currency(p.harga_jual),
-                        "susut": f"{p.susut}%",
-                        "harga_beli": format_currency(p.harga_beli),
-                        "berat_awal": f"{p.berat_awal} kg",
-                        "berat_jual": f"{p.berat_jual} kg",
-                        "total_harga_jual": format_currency(p.total_harga_jual),
-                        "total_harga_beli": format_currency(p.total_harga_beli),
-                        "keuntungan_kotor": format_currency(p.keuntungan_kotor),
-                        "ongkos_kirim": format_currency(p.ongkos_kirim),
-                        "keuntungan_bersih": format_currency(p.keuntungan_bersih),
-                        "rekomendasi": p.rekomendasi
-                    })
-                
-                # Dapatkan data strategi risiko
-                strategi_risiko_data = []
-                for s in get_strategi_risiko(st.session_state.selected_perusahaan_id):
-                    strategi_risiko_data.append({
-                        "aspek": s.aspek,
-                        "risiko": s.risiko,
-                        "solusi": s.solusi
-                    })
-                
-                # Dapatkan data realisasi anggaran
-                realisasi_anggaran_data = []
-                for a in sorted(get_realisasi_anggaran(st.session_state.selected_perusahaan_id), key=lambda x: x.tanggal):
-                    realisasi_anggaran_data.append({
-                        "tanggal": a.tanggal.strftime("%d/%m/%Y"),
-                        "debet": format_currency(a.debet),
-                        "kredit": format_currency(a.kredit),
-                        "saldo": format_currency(a.saldo),
-                        "volume": a.volume,
-                        "keterangan": a.keterangan
-                    })
-                
-                # Kesimpulan dari data
-                kesimpulan = ""
-                if penjualan_karet_data:
-                    # Ekstrak nilai keuntungan dengan cara yang lebih aman
-                    profits = []
-                    max_profit_text = "tidak diketahui"
-                    min_profit_text = "tidak diketahui"
-                    
-                    for p in penjualan_karet_data:
-                        profit_str = p["keuntungan_bersih"].replace("Rp", "").replace(" ", "").replace(".", "").replace(",", ".")
-                        try:
-                            profits.append(float(profit_str))
-                        except ValueError:
-                            pass
-                            
-                    if profits:
-                        max_profit_text = format_currency(max(profits))
-                        min_profit_text = format_currency(min(profits))
-                    
-                    kesimpulan = f"""
-                    Berdasarkan analisis data penjualan karet, berikut adalah beberapa kesimpulan utama:
-                    • Profitabilitas tertinggi ditemukan pada penjualan dengan keuntungan bersih {max_profit_text}.
-                    • Penjualan dengan jarak terjauh memiliki tingkat susut yang lebih tinggi.
-                    • Rekomendasi: Fokus pada penjualan ke perusahaan dengan harga jual tinggi dan jarak yang tidak terlalu jauh untuk mengoptimalkan keuntungan.
-                    """
                 
                 # Dapatkan data harga SICOM SIR untuk PDF
-                harga_tertinggi_data = []
-                harga_terendah_data = []
-                
+                sicom_data_tertinggi = []
+                sicom_data_terendah = []
                 try:
-                    # Ambil data SICOM dari database
-                    sicom_data_tertinggi = get_harga_sicom_sir(tipe_data="Tertinggi")
-                    sicom_data_terendah = get_harga_sicom_sir(tipe_data="Terendah")
-                    
-                    # Format data untuk PDF
-                    for item in sicom_data_tertinggi:
-                        harga_tertinggi_data.append({
-                            'tanggal': item.tanggal,
-                            'harga_rupiah': format_currency(item.harga_rupiah),
-                            'harga_rupiah_100': format_currency(item.harga_rupiah_100),
-                            'harga_sir_sgd': format_currency(item.harga_sir_sgd),
-                            'harga_sir_rupiah': format_currency(item.harga_sir_rupiah)
-                        })
-                    
-                    for item in sicom_data_terendah:
-                        harga_terendah_data.append({
-                            'tanggal': item.tanggal,
-                            'harga_rupiah': format_currency(item.harga_rupiah),
-                            'harga_rupiah_100': format_currency(item.harga_rupiah_100),
-                            'harga_sir_sgd': format_currency(item.harga_sir_sgd),
-                            'harga_sir_rupiah': format_currency(item.harga_sir_rupiah)
-                        })
+                    sicom_data_tertinggi = get_harga_sicom_view(tipe_data="Tertinggi")
+                    sicom_data_terendah = get_harga_sicom_view(tipe_data="Terendah")
                 except Exception as e:
                     st.warning(f"Gagal memuat data SICOM SIR: {e}")
                 
+                # Risiko harga dengan parameter simulasi yang sedang dipilih di tab Strategi dan Risiko
+                risiko_harga_pdf = None
+                simulasi_pdf = get_simulasi_harga(
+                    st.session_state.get("mc_horizon", 12), st.session_state.get("mc_jalur", JUMLAH_JALUR),
+                    st.session_state.get("mc_metode", "bootstrap"), get_harga_pasar_harian
+                )
+                eksposur_pdf = [k for k in get_konsolidasi_penjualan() if k["perusahaan_id"] == st.session_state.selected_perusahaan_id]
+                if simulasi_pdf is not None and eksposur_pdf:
+                    risiko_harga_pdf = ringkasan_risiko(
+                        simulasi_pdf, eksposur_pdf[0]["total_harga_jual"] or 0,
+                        eksposur_pdf[0]["total_keuntungan_bersih"] or 0, st.session_state.get("mc_tingkat", 0.95)
+                    )
+                
                 # Data untuk PDF
-                pdf_data = {
-                    "perusahaan": perusahaan_data,
-                    "penjualan_karet": penjualan_karet_data,
-                    "strategi_risiko": strategi_risiko_data,
-                    "realisasi_anggaran": realisasi_anggaran_data,
-                    "harga_sicom_sir": {
-                        "harga_tertinggi": harga_tertinggi_data,
-                        "harga_terendah": harga_terendah_data
-                    },
-                    "kesimpulan": kesimpulan
-                }
+                pdf_data = build_pdf_data(
+                    perusahaan,
+                    get_penjualan_karet(st.session_state.selected_perusahaan_id),
+                    get_strategi_risiko(st.session_state.selected_perusahaan_id),
+                    get_realisasi_anggaran(st.session_state.selected_perusahaan_id),
+                    sicom_data_tertinggi,
+                    sicom_data_terendah,
+                    get_ringkasan_penjualan(st.session_state.selected_perusahaan_id),
+                    ringkasan_spread(get_spread_penjualan(
+                        st.session_state.selected_perusahaan_id,
+                        lambda: get_penjualan_karet(st.session_state.selected_perusahaan_id),
+                        get_harga_pasar_harian
+                    )),
+                    risiko_harga_pdf,
+                    get_kpi_anggaran(
+                        st.session_state.selected_perusahaan_id, st.session_state.get("kpi_jendela", JENDELA_BULAN),
+                        lambda: get_ringkasan_anggaran(st.session_state.selected_perusahaan_id)
+                    )
+                )
                 
                 # Tambahkan debugging
                 try:
@@ -817,11 +1059,15 @@ if st.button("Buat Laporan PDF"):
                 st.error(f"Terjadi kesalahan saat membuat laporan PDF: {e}")
     else:
         st.error("Silakan pilih perusahaan terlebih dahulu.")
+rerun_profiler.stop_phase("Laporan PDF")
 
 # Tab 4: Harga SICOM x SIR 20
-with tab4:
+with tab4, rerun_profiler.phase("Tab: Harga SICOM x SIR 20"):
     st.header("Harga SICOM x SIR 20")
     
+    # Grafik harga memakai plotly express, dimuat saat tab ini dirender
+    import plotly.express as px
+    
     # Gunakan ID perusahaan SICOM yang sudah ada di database
     db = get_db_session()
     sicom_perusahaan = db.query(Perusahaan).filter(Perusahaan.nama == "SICOM").first()
@@ -832,34 +1078,34 @@ with tab4:
         sicom_id = init_harga_sicom_sir_data()
     db.close()
     
-    # Tab untuk memisahkan data tertinggi dan terendah
-    sicom_tab1, sicom_tab2 = st.tabs(["Harga Tertinggi", "Harga Terendah"])
+    # Tabel Tertinggi/Terendah adalah view mingguan atas harga harian
+    sicom_namespaces = table_namespaces("harga_sicom_harian", sicom_id)
+    sicom_tab1, sicom_tab2, sicom_tab3 = st.tabs(["Harga Tertinggi", "Harga Terendah", "Harga Harian"])
     
     with sicom_tab1:
         st.subheader("Harga Perbandingan Tertinggi 3 Tahun Terakhir di Bulan Yang Sama")
         
-        # Ambil data harga tertinggi
-        harga_tertinggi_data = get_harga_sicom_sir(sicom_id, "Tertinggi")
+        # Bulan dengan rata-rata harga tertinggi 3 tahun terakhir, atau bulan pilihan pengguna
+        bulan_tertinggi = st.selectbox(
+            "Bulan",
+            [None] + list(range(1, 13)),
+            format_func=lambda b: "Otomatis" if b is None else NAMA_BULAN[b],
+            key="bulan_tertinggi"
+        )
+        harga_tertinggi_data = get_harga_sicom_view(sicom_id, "Tertinggi", bulan_tertinggi)
+        if harga_tertinggi_data and bulan_tertinggi is None:
+            st.caption(f"Bulan {NAMA_BULAN[harga_tertinggi_data[0].bulan]} memiliki rata-rata harga SIR 20 tertinggi dalam 3 tahun terakhir.")
         
         if harga_tertinggi_data:
             # Buat DataFrame untuk tampilan
-            df_tertinggi = pd.DataFrame([
-                {
-                    "ID": h.id,
-                    "Tanggal": h.tanggal.strftime("%d/%m/%Y"),
-                    "Harga Rupiah": format_currency(h.harga_rupiah),
-                    "Harga Rp/100": f"Rp {h.harga_rupiah_100:.2f}",
-                    "Harga SIR SGD": h.harga_sir_sgd,
-                    "Harga SIR (Rp)": format_currency(h.harga_sir_rupiah)
-                } for h in sorted(harga_tertinggi_data, key=lambda x: x.tanggal, reverse=True)
-            ])
+            df_tertinggi = harga_sicom_tabel_dataframe(harga_tertinggi_data)
             
             # Tampilkan data dalam tabel
             st.dataframe(df_tertinggi.drop(columns=["ID"]), use_container_width=True)
             
             # Fitur edit dan hapus jika terotentikasi
             if st.session_state.is_authenticated:
-                with st.expander("Edit/Hapus Data Harga Tertinggi"):
+                with st.expander("Hapus Data Harga Mingguan (Tertinggi)"):
                     col1, col2 = st.columns(2)
                     
                     with col1:
@@ -873,7 +1119,7 @@ with tab4:
                             
                             if st.button("🗑️ Hapus Data", key="delete_tertinggi_button"):
                                 try:
-                                    hapus_harga_sicom_sir(selected_data_id, sicom_id)
+                                    hapus_harga_sicom_minggu(selected_data_id, sicom_id)
                                     st.success("Data berhasil dihapus!")
                                     st.rerun()
                                 except Exception as e:
@@ -883,28 +1129,20 @@ with tab4:
             st.subheader("Visualisasi Harga SICOM x SIR 20 (Tertinggi)")
             
             # Konversi data untuk visualisasi
-            vis_data = pd.DataFrame([
-                {
-                    "Tanggal": h.tanggal,
-                    "Harga Rupiah": h.harga_rupiah,
-                    "Harga SIR SGD": h.harga_sir_sgd,
-                    "Harga SIR (Rp)": h.harga_sir_rupiah,
-                    "Tahun": h.tanggal.year
-                } for h in harga_tertinggi_data
-            ])
+            vis_data = harga_sicom_visual_dataframe(harga_tertinggi_data)
             
-            # Grafik harga SICOM x SIR 20
-            fig1 = px.line(
+            # Grafik harga SICOM x SIR 20 (figure disimpan di cache bersama)
+            fig1 = cached_figure("sicom_harga_line", (sicom_id, "Tertinggi", bulan_tertinggi), sicom_namespaces, lambda: grafik_garis(
                 vis_data,
                 x="Tanggal",
                 y=["Harga Rupiah", "Harga SIR (Rp)"],
                 title="Perbandingan Harga Rupiah dan Harga SIR 20",
                 color_discrete_sequence=["blue", "red"]
-            )
+            ))
             st.plotly_chart(fig1, use_container_width=True)
             
-            # Scatter plot harga SIR SGD vs harga SIR Rupiah
-            fig2 = px.scatter(
+            # Scatter plot harga SIR SGD vs harga SIR Rupiah (trendline OLS cukup mahal)
+            fig2 = cached_figure("sicom_harga_scatter", (sicom_id, "Tertinggi", bulan_tertinggi), sicom_namespaces, lambda: px.scatter(
                 vis_data,
                 x="Harga SIR SGD",
                 y="Harga SIR (Rp)",
@@ -913,76 +1151,37 @@ with tab4:
                 hover_name="Tanggal",
                 title="Hubungan antara Harga SIR SGD dan Harga SIR Rupiah",
                 trendline="ols"
-            )
+            ))
             st.plotly_chart(fig2, use_container_width=True)
             
         else:
-            st.info("Belum ada data harga tertinggi. Data akan muncul setelah diinisialisasi.")
-            
-        # Form untuk menambah data
-        with st.expander("Tambah Data Harga Tertinggi", expanded=True):
-            # Tampilkan warning untuk user yang belum login
-            if not st.session_state.is_authenticated:
-                st.warning("Silakan login terlebih dahulu untuk menambahkan data")
-                
-            # Disable form jika belum login
-            form_disabled = not st.session_state.is_authenticated
+            st.info("Belum ada data harga tertinggi. Tambahkan harga harian di tab Harga Harian.")
             
-            with st.form("form_harga_tertinggi"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        tanggal = st.date_input("Tanggal", date.today(), key="tanggal_tertinggi", disabled=form_disabled)
-                        harga_rupiah = st.number_input("Harga Rupiah", min_value=0.0, step=100.0, key="hr_tertinggi", disabled=form_disabled)
-                        harga_rupiah_100 = st.number_input("Harga Rp/100", min_value=0.0, step=0.1, key="hr100_tertinggi", disabled=form_disabled)
-                        
-                    with col2:
-                        harga_sir_sgd = st.number_input("Harga SIR SGD", min_value=0.0, step=0.1, key="hsg_tertinggi", disabled=form_disabled)
-                        harga_sir_rupiah = st.number_input("Harga SIR (Rp)", min_value=0.0, step=100.0, key="hsr_tertinggi", disabled=form_disabled)
-                    
-                    submit_button = st.form_submit_button("Simpan Data")
-                    
-                    if submit_button:
-                        try:
-                            simpan_harga_sicom_sir(
-                                sicom_id,
-                                tanggal,
-                                harga_rupiah,
-                                harga_rupiah_100,
-                                harga_sir_sgd,
-                                harga_sir_rupiah,
-                                "Tertinggi"
-                            )
-                            st.success("Data harga tertinggi berhasil disimpan!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Terjadi kesalahan saat menyimpan data: {e}")
     
     with sicom_tab2:
         st.subheader("Harga Perbandingan Terendah 3 Tahun Terakhir di Bulan Yang Sama")
         
-        # Ambil data harga terendah
-        harga_terendah_data = get_harga_sicom_sir(sicom_id, "Terendah")
+        # Bulan dengan rata-rata harga terendah 3 tahun terakhir, atau bulan pilihan pengguna
+        bulan_terendah = st.selectbox(
+            "Bulan",
+            [None] + list(range(1, 13)),
+            format_func=lambda b: "Otomatis" if b is None else NAMA_BULAN[b],
+            key="bulan_terendah"
+        )
+        harga_terendah_data = get_harga_sicom_view(sicom_id, "Terendah", bulan_terendah)
+        if harga_terendah_data and bulan_terendah is None:
+            st.caption(f"Bulan {NAMA_BULAN[harga_terendah_data[0].bulan]} memiliki rata-rata harga SIR 20 terendah dalam 3 tahun terakhir.")
         
         if harga_terendah_data:
             # Buat DataFrame untuk tampilan
-            df_terendah = pd.DataFrame([
-                {
-                    "ID": h.id,
-                    "Tanggal": h.tanggal.strftime("%d/%m/%Y"),
-                    "Harga Rupiah": format_currency(h.harga_rupiah),
-                    "Harga Rp/100": f"Rp {h.harga_rupiah_100:.2f}",
-                    "Harga SIR SGD": h.harga_sir_sgd,
-                    "Harga SIR (Rp)": format_currency(h.harga_sir_rupiah)
-                } for h in sorted(harga_terendah_data, key=lambda x: x.tanggal, reverse=True)
-            ])
+            df_terendah = harga_sicom_tabel_dataframe(harga_terendah_data)
             
             # Tampilkan data dalam tabel
             st.dataframe(df_terendah.drop(columns=["ID"]), use_container_width=True)
             
             # Fitur edit dan hapus jika terotentikasi
             if st.session_state.is_authenticated:
-                with st.expander("Edit/Hapus Data Harga Terendah"):
+                with st.expander("Hapus Data Harga Mingguan (Terendah)"):
                     col1, col2 = st.columns(2)
                     
                     with col1:
@@ -996,7 +1195,7 @@ with tab4:
                             
                             if st.button("🗑️ Hapus Data", key="delete_terendah_button"):
                                 try:
-                                    hapus_harga_sicom_sir(selected_data_id, sicom_id)
+                                    hapus_harga_sicom_minggu(selected_data_id, sicom_id)
                                     st.success("Data berhasil dihapus!")
                                     st.rerun()
                                 except Exception as e:
@@ -1006,28 +1205,20 @@ with tab4:
             st.subheader("Visualisasi Harga SICOM x SIR 20 (Terendah)")
             
             # Konversi data untuk visualisasi
-            vis_data = pd.DataFrame([
-                {
-                    "Tanggal": h.tanggal,
-                    "Harga Rupiah": h.harga_rupiah,
-                    "Harga SIR SGD": h.harga_sir_sgd,
-                    "Harga SIR (Rp)": h.harga_sir_rupiah,
-                    "Tahun": h.tanggal.year
-                } for h in harga_terendah_data
-            ])
+            vis_data = harga_sicom_visual_dataframe(harga_terendah_data)
             
-            # Grafik harga SICOM x SIR 20
-            fig1 = px.line(
+            # Grafik harga SICOM x SIR 20 (figure disimpan di cache bersama)
+            fig1 = cached_figure("sicom_harga_line", (sicom_id, "Terendah", bulan_terendah), sicom_namespaces, lambda: grafik_garis(
                 vis_data,
                 x="Tanggal",
                 y=["Harga Rupiah", "Harga SIR (Rp)"],
                 title="Perbandingan Harga Rupiah dan Harga SIR 20",
                 color_discrete_sequence=["blue", "red"]
-            )
+            ))
             st.plotly_chart(fig1, use_container_width=True)
             
-            # Scatter plot harga SIR SGD vs harga SIR Rupiah
-            fig2 = px.scatter(
+            # Scatter plot harga SIR SGD vs harga SIR Rupiah (trendline OLS cukup mahal)
+            fig2 = cached_figure("sicom_harga_scatter", (sicom_id, "Terendah", bulan_terendah), sicom_namespaces, lambda: px.scatter(
                 vis_data,
                 x="Harga SIR SGD",
                 y="Harga SIR (Rp)",
@@ -1036,57 +1227,173 @@ with tab4:
                 hover_name="Tanggal",
                 title="Hubungan antara Harga SIR SGD dan Harga SIR Rupiah",
                 trendline="ols"
-            )
+            ))
             st.plotly_chart(fig2, use_container_width=True)
             
         else:
-            st.info("Belum ada data harga terendah. Data akan muncul setelah diinisialisasi.")
+            st.info("Belum ada data harga terendah. Tambahkan harga harian di tab Harga Harian.")
+            
+
+    with sicom_tab3:
+        st.subheader("Harga SICOM x SIR 20 Harian")
+        
+        harga_harian_data = get_harga_sicom_harian(sicom_id)
+        
+        if harga_harian_data:
+            # Minggu tertinggi dan terendah setiap bulan, dihitung di database
+            tahun_tersedia = sorted({h.tanggal.year for h in harga_harian_data}, reverse=True)
+            tahun_ekstrem = st.selectbox("Tahun", tahun_tersedia, key="tahun_minggu_ekstrem")
+            minggu_ekstrem = get_minggu_ekstrem(sicom_id, tahun_ekstrem)
+            if minggu_ekstrem:
+                st.write("**Minggu Tertinggi dan Terendah per Bulan (Harga SIR Rp)**")
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Bulan": NAMA_BULAN[m["bulan"]],
+                        "Minggu Tertinggi": m["minggu_tertinggi"].strftime("%d/%m/%Y"),
+                        "Harga Tertinggi": format_currency(m["harga_tertinggi"]),
+                        "Minggu Terendah": m["minggu_terendah"].strftime("%d/%m/%Y"),
+                        "Harga Terendah": format_currency(m["harga_terendah"])
+                    } for m in minggu_ekstrem
+                ]), use_container_width=True, hide_index=True)
+            
+            # Grafik OHLC: harga harian diringkas per minggu/bulan/tahun sesuai rentang data
+            import plotly.graph_objects as go
+            col1, col2 = st.columns(2)
+            with col1:
+                seri_ohlc = st.selectbox("Seri", list(SERI_HARGA), format_func=SERI_HARGA.get, key="ohlc_seri")
+            with col2:
+                pilihan_ohlc = st.selectbox(
+                    "Periode Grafik",
+                    ["otomatis", *GRANULARITAS],
+                    format_func=lambda g: "Otomatis" if g == "otomatis" else LABEL_GRANULARITAS[g],
+                    key="ohlc_granularitas"
+                )
+            granularitas_ohlc = pilihan_ohlc
+            if granularitas_ohlc == "otomatis":
+                granularitas_ohlc = pilih_granularitas(
+                    min(h.tanggal for h in harga_harian_data), max(h.tanggal for h in harga_harian_data)
+                )
+            ohlc = get_ohlc_harga(sicom_id, seri_ohlc, granularitas_ohlc, lambda: harga_harian_data)
+            
+            fig_ohlc = cached_figure(
+                "sicom_harga_ohlc", (sicom_id, seri_ohlc, granularitas_ohlc), sicom_namespaces,
+                lambda: go.Figure(go.Candlestick(
+                    x=ohlc["periode"], open=ohlc["open"], high=ohlc["high"], low=ohlc["low"], close=ohlc["close"],
+                    name=SERI_HARGA[seri_ohlc]
+                )).update_layout(
+                    title=f"{SERI_HARGA[seri_ohlc]} ({LABEL_GRANULARITAS[granularitas_ohlc]})",
+                    xaxis_title="Periode",
+                    yaxis_title=SERI_HARGA[seri_ohlc],
+                    xaxis_rangeslider_visible=False
+                )
+            )
+            st.plotly_chart(fig_ohlc, use_container_width=True)
             
-        # Form untuk menambah data
-        with st.expander("Tambah Data Harga Terendah", expanded=True):
-            # Tampilkan warning untuk user yang belum login
+            with st.expander("Data Harga Harian"):
+                st.dataframe(harga_sicom_tabel_dataframe(harga_harian_data).drop(columns=["ID"]), use_container_width=True)
+        else:
+            st.info("Belum ada data harga harian.")
+        
+        # Form untuk menambah harga harian
+        with st.expander("Tambah Harga Harian", expanded=True):
             if not st.session_state.is_authenticated:
                 st.warning("Silakan login terlebih dahulu untuk menambahkan data")
-                
-            # Disable form jika belum login
+            
             form_disabled = not st.session_state.is_authenticated
             
-            with st.form("form_harga_terendah"):
+            with st.form("form_harga_harian"):
+                st.caption("Harga Rupiah dihitung dari harga SIR SGD dan kurs SGD/IDR yang berlaku pada tanggal tersebut.")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    tanggal = st.date_input("Tanggal", date.today(), key="tanggal_harian", disabled=form_disabled)
+                    harga_sir_sgd = st.number_input("Harga SIR SGD", min_value=0.0, step=0.1, key="hsg_harian", disabled=form_disabled)
+                
+                with col2:
+                    harga_rupiah = st.number_input(
+                        "Kurs (Rp/SGD)", min_value=0.0, step=10.0, key="hr_harian", disabled=form_disabled,
+                        help="Kosongkan (0) untuk memakai kurs terakhir yang tersimpan"
+                    )
+                
+                submit_button = st.form_submit_button("Simpan Data")
+                
+                if submit_button:
+                    try:
+                        if not harga_rupiah and not get_kurs_sgd_idr(None, tanggal):
+                            st.error("Kurs SGD/IDR pada tanggal ini belum tersedia. Isi kurs terlebih dahulu.")
+                        else:
+                            tersimpan = simpan_harga_sicom_harian(sicom_id, tanggal, harga_rupiah, harga_sir_sgd=harga_sir_sgd)
+                            st.success(f"Data harga harian berhasil disimpan! Harga SIR (Rp): {format_currency(tersimpan['harga_sir_rupiah'])}")
+                            st.rerun()
+                    except Exception as e:
+                        st.error(f"Terjadi kesalahan saat menyimpan data: {e}")
+        
+        # Kurs SGD/IDR dan validasi harga Rupiah tersimpan
+        with st.expander("Kurs SGD/IDR"):
+            kurs_data = get_kurs_sgd_idr()
+            if kurs_data:
+                st.dataframe(pd.DataFrame([
+                    {"Berlaku Mulai": k.tanggal.strftime("%d/%m/%Y"), "Kurs (Rp/SGD)": format_currency(k.kurs)}
+                    for k in reversed(kurs_data)
+                ]), use_container_width=True, hide_index=True)
+            else:
+                st.info("Belum ada data kurs SGD/IDR.")
+            
+            if st.session_state.is_authenticated:
+                with st.form("form_kurs_sgd_idr"):
                     col1, col2 = st.columns(2)
-                    
                     with col1:
-                        tanggal = st.date_input("Tanggal", date.today(), key="tanggal_terendah", disabled=form_disabled)
-                        harga_rupiah = st.number_input("Harga Rupiah", min_value=0.0, step=100.0, key="hr_terendah", disabled=form_disabled)
-                        harga_rupiah_100 = st.number_input("Harga Rp/100", min_value=0.0, step=0.1, key="hr100_terendah", disabled=form_disabled)
-                        
+                        tanggal_kurs = st.date_input("Berlaku Mulai", date.today(), key="tanggal_kurs")
                     with col2:
-                        harga_sir_sgd = st.number_input("Harga SIR SGD", min_value=0.0, step=0.1, key="hsg_terendah", disabled=form_disabled)
-                        harga_sir_rupiah = st.number_input("Harga SIR (Rp)", min_value=0.0, step=100.0, key="hsr_terendah", disabled=form_disabled)
+                        nilai_kurs = st.number_input("Kurs (Rp/SGD)", min_value=0.0, step=10.0, key="nilai_kurs")
                     
-                    submit_button = st.form_submit_button("Simpan Data")
-                    
-                    if submit_button:
+                    if st.form_submit_button("Simpan Kurs"):
                         try:
-                            simpan_harga_sicom_sir(
-                                sicom_id,
-                                tanggal,
-                                harga_rupiah,
-                                harga_rupiah_100,
-                                harga_sir_sgd,
-                                harga_sir_rupiah,
-                                "Terendah"
-                            )
-                            st.success("Data harga terendah berhasil disimpan!")
-                            st.rerun()
+                            if nilai_kurs <= 0:
+                                st.error("Kurs harus lebih dari 0")
+                            else:
+                                simpan_kurs_sgd_idr(tanggal_kurs, nilai_kurs)
+                                st.success("Kurs berhasil disimpan!")
+                                st.rerun()
                         except Exception as e:
-                            st.error(f"Terjadi kesalahan saat menyimpan data: {e}")
-
+                            st.error(f"Terjadi kesalahan saat menyimpan kurs: {e}")
+                
+                # Hitung ulang semua harga Rupiah dari kurs dan tandai yang tidak cocok
+                if st.button("Validasi Harga Rupiah", key="validasi_harga_rupiah"):
+                    st.session_state.validasi_harga = validasi_harga_sicom_harian(sicom_id)
+                
+                validasi = st.session_state.get("validasi_harga")
+                if validasi is not None:
+                    tidak_cocok = validasi[validasi["status"] == "tidak_cocok"]
+                    tanpa_kurs = validasi[validasi["status"] == "tanpa_kurs"]
+                    if validasi.empty:
+                        st.success("Semua harga Rupiah sesuai dengan kurs SGD/IDR.")
+                    else:
+                        st.warning(f"{len(tidak_cocok)} harga tidak cocok dengan kurs, {len(tanpa_kurs)} harga belum memiliki kurs.")
+                        st.dataframe(pd.DataFrame({
+                            "Tanggal": validasi["tanggal"].map(lambda t: t.strftime("%d/%m/%Y")),
+                            "Harga SIR SGD": validasi["harga_sir_sgd"],
+                            "Kurs": validasi["kurs"],
+                            "Harga SIR (Rp) Tersimpan": validasi["harga_sir_rupiah"],
+                            "Harga SIR (Rp) dari Kurs": validasi["harga_sir_rupiah_turunan"],
+                            "Status": validasi["status"].map({"tidak_cocok": "Tidak cocok", "tanpa_kurs": "Tanpa kurs"})
+                        }), use_container_width=True, hide_index=True)
+                        
+                        if not tidak_cocok.empty and st.button("Perbaiki Harga Tidak Cocok", key="perbaiki_harga_rupiah"):
+                            try:
+                                validasi_harga_sicom_harian(sicom_id, perbaiki=True)
+                                st.session_state.validasi_harga = None
+                                st.success("Harga Rupiah telah dihitung ulang dari kurs.")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Terjadi kesalahan saat memperbaiki harga: {e}")
+    
     # Tambahkan bagian analisis perbandingan
     st.subheader("Analisis Perbandingan Harga Tertinggi vs Terendah")
     
-    # Ambil data untuk analisis
-    harga_tertinggi_data = get_harga_sicom_sir(sicom_id, "Tertinggi")
-    harga_terendah_data = get_harga_sicom_sir(sicom_id, "Terendah")
+    # Ambil data untuk analisis (view bulan otomatis)
+    harga_tertinggi_data = get_harga_sicom_view(sicom_id, "Tertinggi")
+    harga_terendah_data = get_harga_sicom_view(sicom_id, "Terendah")
     
     if harga_tertinggi_data and harga_terendah_data:
         # Konversi data untuk visualisasi
@@ -1112,20 +1419,20 @@ with tab4:
         data_gabungan = pd.concat([data_tertinggi, data_terendah])
         
         # Buat grafik perbandingan
-        fig = px.line(
+        fig = cached_figure("sicom_perbandingan_line", (sicom_id,), sicom_namespaces, lambda: grafik_garis(
             data_gabungan,
             x="Tanggal",
             y="Harga SIR (Rp)",
             color="Tipe",
             title="Perbandingan Harga SIR 20 Tertinggi vs Terendah",
             color_discrete_sequence=["green", "red"]
-        )
+        ))
         st.plotly_chart(fig, use_container_width=True)
         
         # Buat bar chart berdasarkan tahun
         data_gabungan_tahun = data_gabungan.groupby(['Tahun', 'Tipe'])['Harga SIR (Rp)'].mean().reset_index()
         
-        fig2 = px.bar(
+        fig2 = cached_figure("sicom_perbandingan_bar", (sicom_id,), sicom_namespaces, lambda: px.bar(
             data_gabungan_tahun,
             x="Tahun",
             y="Harga SIR (Rp)",
@@ -1133,7 +1440,7 @@ with tab4:
             barmode="group",
             title="Rata-rata Harga SIR 20 per Tahun",
             color_discrete_sequence=["green", "red"]
-        )
+        ))
         st.plotly_chart(fig2, use_container_width=True)
         
         # Hitung selisih rata-rata
@@ -1159,6 +1466,409 @@ with tab4:
         """)
     else:
         st.info("Belum cukup data untuk melakukan analisis perbandingan.")
+    
+    # Peramalan harga SIR 20 (model Holt/EWMA dengan state tersimpan di cache)
+    st.subheader("Peramalan Harga SIR 20")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        seri_ramalan = st.selectbox("Seri Harga", list(SERI_HARGA), format_func=SERI_HARGA.get, key="ramalan_seri")
+    with col2:
+        horizon_ramalan = st.slider("Horizon (minggu)", min_value=4, max_value=12, value=8, key="ramalan_horizon")
+    
+    state_ramalan, observasi_ramalan = get_state_ramalan(sicom_id, seri_ramalan, get_harga_sicom_harian(sicom_id))
+    
+    if state_ramalan is not None:
+        import plotly.graph_objects as go
+        
+        df_ramalan = ramalan(state_ramalan, horizon_ramalan)
+        label_seri = SERI_HARGA[seri_ramalan]
+        
+        fig_ramalan = go.Figure()
+        fig_ramalan.add_trace(go.Scatter(
+            x=observasi_ramalan["tanggal"], y=observasi_ramalan["nilai"],
+            mode="lines+markers", name="Historis (penutupan mingguan)", marker=dict(size=4)
+        ))
+        fig_ramalan.add_trace(go.Scatter(
+            x=df_ramalan["tanggal"], y=df_ramalan["atas"],
+            mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"
+        ))
+        fig_ramalan.add_trace(go.Scatter(
+            x=df_ramalan["tanggal"], y=df_ramalan["bawah"],
+            mode="lines", line=dict(width=0), fill="tonexty",
+            fillcolor="rgba(255, 165, 0, 0.25)", name="Interval 90%"
+        ))
+        fig_ramalan.add_trace(go.Scatter(
+            x=df_ramalan["tanggal"], y=df_ramalan["prediksi"],
+            mode="lines+markers", name="Ramalan", line=dict(color="orange", dash="dash")
+        ))
+        fig_ramalan.update_layout(title=f"Ramalan {label_seri} {horizon_ramalan} Minggu ke Depan", xaxis_title="Tanggal", yaxis_title=label_seri)
+        st.plotly_chart(fig_ramalan, use_container_width=True)
+        
+        akhir = df_ramalan.iloc[-1]
+        format_nilai = format_currency if seri_ramalan == "harga_sir_rupiah" else (lambda v: f"{v:,.2f}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Harga Terakhir", format_nilai(float(observasi_ramalan["nilai"].iloc[-1])))
+        col2.metric(f"Ramalan Minggu ke-{horizon_ramalan}", format_nilai(float(akhir["prediksi"])))
+        col3.metric("Interval 90%", f"{format_nilai(float(akhir['bawah']))} - {format_nilai(float(akhir['atas']))}")
+        st.caption(
+            f"Model Holt teredam (alpha={state_ramalan['alpha']:.2f}, beta={state_ramalan['beta']:.2f}) "
+            f"dari {state_ramalan['n']} harga penutupan mingguan, data terakhir {state_ramalan['tanggal_terakhir']:%d/%m/%Y}."
+        )
+        
+        df_ramalan_tabel = df_ramalan.assign(tanggal=df_ramalan["tanggal"].dt.date).rename(columns={
+            "tanggal": "Tanggal", "prediksi": "Ramalan", "bawah": "Batas Bawah", "atas": "Batas Atas"
+        })
+        with st.expander("Tabel Ramalan"):
+            st.dataframe(df_ramalan_tabel, use_container_width=True, hide_index=True)
+    else:
+        st.info("Belum cukup data harga untuk membuat ramalan (minimal 3 minggu).")
+
+# Tab 5: Konsolidasi seluruh perusahaan
+with tab5, rerun_profiler.phase("Tab: Konsolidasi"):
+    st.header("Konsolidasi Perusahaan")
+    st.write("Perbandingan kinerja penjualan karet seluruh pabrik dan depo.")
+    
+    periode_options = {
+        "Semua Data": None,
+        "30 Hari Terakhir": 30,
+        "90 Hari Terakhir": 90,
+        "1 Tahun Terakhir": 365
+    }
+    periode = st.selectbox("Periode", list(periode_options.keys()), key="konsolidasi_periode")
+    
+    tanggal_awal = None
+    if periode_options[periode]:
+        tanggal_awal = date.today() - timedelta(days=periode_options[periode])
+    
+    konsolidasi_data = get_konsolidasi_penjualan(tanggal_awal)
+    
+    if konsolidasi_data:
+        import plotly.express as px
+        
+        df_konsolidasi = konsolidasi_dataframe(konsolidasi_data)
+        
+        st.dataframe(
+            df_konsolidasi,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Berat Jual (kg)": st.column_config.NumberColumn(format="%.0f"),
+                "Keuntungan Bersih": st.column_config.NumberColumn(format="Rp %.0f"),
+                "Keuntungan/kg": st.column_config.NumberColumn(format="Rp %.2f"),
+                "Keuntungan/km": st.column_config.NumberColumn(format="Rp %.2f"),
+                "Rata-rata Susut (%)": st.column_config.NumberColumn(format="%.2f"),
+                "Margin (%)": st.column_config.NumberColumn(format="%.2f")
+            }
+        )
+        
+        metrik = st.selectbox(
+            "Bandingkan berdasarkan",
+            ["Keuntungan/kg", "Keuntungan/km", "Rata-rata Susut (%)", "Margin (%)"],
+            key="konsolidasi_metrik"
+        )
+        
+        # Urutkan agar perusahaan terbaik/terburuk mudah terlihat meskipun jumlahnya ratusan
+        df_metrik = df_konsolidasi.dropna(subset=[metrik]).sort_values(metrik)
+        fig = px.bar(
+            df_metrik,
+            x=metrik,
+            y="Perusahaan",
+            color="Jenis",
+            orientation="h",
+            title=f"{metrik} per Perusahaan",
+            height=max(400, 22 * len(df_metrik))
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        fig_scatter = px.scatter(
+            df_konsolidasi,
+            x="Rata-rata Susut (%)",
+            y="Keuntungan/kg",
+            size="Berat Jual (kg)",
+            color="Jenis",
+            hover_name="Perusahaan",
+            title="Susut vs Keuntungan per kg"
+        )
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    else:
+        st.info("Belum ada data penjualan karet pada periode ini.")
+    
+    # Optimasi tujuan pengiriman untuk satu batch bokar
+    st.subheader("Optimasi Tujuan Batch")
+    st.write("Peringkat semua pabrik dan depo berdasarkan perkiraan keuntungan bersih untuk satu batch.")
+    
+    kandidat = kandidat_dataframe(get_kandidat_tujuan())
+    if kandidat.empty:
+        st.info("Belum ada data penjualan karet untuk menilai tujuan pengiriman.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            berat_batch = st.number_input("Berat Batch (kg)", min_value=1.0, value=2000.0, step=10.0, key="optimasi_berat")
+        with col2:
+            harga_beli_default = float(max(penjualan_data, key=lambda p: p.tanggal).harga_beli) if penjualan_data else 11000.0
+            harga_beli_batch = st.number_input(
+                "Harga Beli Batch (Rp/kg)", min_value=0.0, value=harga_beli_default, step=100.0, key="optimasi_harga_beli"
+            )
+        
+        peringkat = peringkat_tujuan(kandidat, berat_batch, harga_beli_batch, model_susut)
+        
+        teks_rekomendasi = rekomendasi_teks(peringkat, berat_batch, format_currency)
+        if peringkat.iloc[0]["keuntungan_bersih"] > 0:
+            st.info(f"**Rekomendasi:** {teks_rekomendasi}")
+        else:
+            st.warning(f"**Rekomendasi:** {teks_rekomendasi}")
+        
+        st.dataframe(
+            peringkat[[
+                "peringkat", "nama", "jenis", "tanggal_terakhir", "harga_jual", "jarak", "susut_historis", "susut",
+                "ongkos_kirim", "keuntungan_bersih", "keuntungan_per_kg"
+            ]].rename(columns={
+                "peringkat": "Peringkat",
+                "nama": "Perusahaan",
+                "jenis": "Jenis",
+                "tanggal_terakhir": "Harga Per",
+                "harga_jual": "Harga Jual (Rp/kg)",
+                "jarak": "Jarak (km)",
+                "susut_historis": "Susut Historis (%)",
+                "susut": "Perkiraan Susut (%)",
+                "ongkos_kirim": "Ongkos Kirim",
+                "keuntungan_bersih": "Perkiraan Keuntungan Bersih",
+                "keuntungan_per_kg": "Keuntungan/kg"
+            }),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Harga Jual (Rp/kg)": st.column_config.NumberColumn(format="Rp %.0f"),
+                "Susut Historis (%)": st.column_config.NumberColumn(format="%.2f"),
+                "Perkiraan Susut (%)": st.column_config.NumberColumn(format="%.2f"),
+                "Ongkos Kirim": st.column_config.NumberColumn(format="Rp %.0f"),
+                "Perkiraan Keuntungan Bersih": st.column_config.NumberColumn(format="Rp %.0f"),
+                "Keuntungan/kg": st.column_config.NumberColumn(format="Rp %.2f")
+            }
+        )
+
+# Tab 6: Simulasi skenario penjualan
+with tab6, rerun_profiler.phase("Tab: Simulasi"):
+    st.header("Simulasi Skenario Penjualan")
+    st.write(
+        "Hitung keuntungan bersih untuk semua kombinasi rentang harga jual, harga beli, susut, "
+        "jarak dan ongkos kirim per km dengan rumus yang sama seperti form penjualan."
+    )
+    
+    # Nilai awal rentang: ±20% dari penjualan terakhir perusahaan ini, atau nilai umum
+    if penjualan_data:
+        terakhir = max(penjualan_data, key=lambda p: p.tanggal)
+        ongkos_per_km = terakhir.ongkos_kirim / terakhir.jarak if terakhir.jarak else 0.0
+        acuan = {
+            "harga_jual": terakhir.harga_jual,
+            "harga_beli": terakhir.harga_beli,
+            "susut": terakhir.susut,
+            "jarak": terakhir.jarak,
+            "ongkos_per_km": ongkos_per_km
+        }
+        berat_acuan = terakhir.berat_awal or 2000.0
+    else:
+        acuan = {"harga_jual": 14000.0, "harga_beli": 11000.0, "susut": 10.0, "jarak": 50.0, "ongkos_per_km": 8000.0}
+        berat_acuan = 2000.0
+    
+    st.session_state.setdefault("sim_berat_awal", float(berat_acuan))
+    st.session_state.setdefault("sim_jumlah", 12)
+    for param, nilai in acuan.items():
+        st.session_state.setdefault(f"sim_{param}_min", round(float(nilai) * 0.8, 2))
+        st.session_state.setdefault(f"sim_{param}_max", round(float(nilai) * 1.2, 2))
+    
+    def _muat_skenario(parameter):
+        st.session_state.sim_berat_awal = float(parameter["berat_awal"])
+        st.session_state.sim_jumlah = int(parameter["jumlah"])
+        for param, (minimum, maksimum) in parameter["rentang"].items():
+            st.session_state[f"sim_{param}_min"] = float(minimum)
+            st.session_state[f"sim_{param}_max"] = float(maksimum)
+    
+    # Skenario tersimpan
+    skenario_list = get_skenario_simulasi(st.session_state.selected_perusahaan_id) if st.session_state.selected_perusahaan_id else []
+    if skenario_list:
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            skenario_terpilih = st.selectbox(
+                "Skenario Tersimpan",
+                skenario_list,
+                format_func=lambda k: k["nama"],
+                key="sim_skenario_terpilih"
+            )
+        with col2:
+            st.button(
+                "Muat Skenario",
+                on_click=_muat_skenario,
+                args=(skenario_terpilih["parameter"],),
+                key="sim_muat"
+            )
+        with col3:
+            if st.session_state.is_authenticated and st.button("Hapus Skenario", key="sim_hapus"):
+                try:
+                    hapus_skenario_simulasi(skenario_terpilih["id"], st.session_state.selected_perusahaan_id)
+                    st.success(f"Skenario '{skenario_terpilih['nama']}' berhasil dihapus!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Terjadi kesalahan saat menghapus skenario: {e}")
+    
+    def _rentang_susut_dari_model():
+        # Prediksi batch di sepanjang rentang jarak untuk perusahaan terpilih
+        jarak_grid = rentang(st.session_state.sim_jarak_min, st.session_state.sim_jarak_max, st.session_state.sim_jumlah)
+        prediksi = prediksi_susut(model_susut, st.session_state.selected_perusahaan_id or 0, jarak_grid)
+        st.session_state.sim_susut_min = round(float(prediksi["bawah"].min()), 2)
+        st.session_state.sim_susut_max = round(float(prediksi["atas"].max()), 2)
+    
+    if model_susut is not None:
+        st.button(
+            "Rentang Susut dari Model",
+            on_click=_rentang_susut_dari_model,
+            help="Isi rentang susut dengan interval 90% prediksi model susut untuk rentang jarak",
+            key="sim_susut_model"
+        )
+    
+    # Rentang parameter
+    col1, col2 = st.columns(2)
+    with col1:
+        berat_awal_sim = st.number_input("Berat Awal (kg)", min_value=1.0, step=10.0, key="sim_berat_awal")
+    with col2:
+        jumlah_titik = st.slider("Jumlah titik per parameter", min_value=2, max_value=20, key="sim_jumlah")
+    
+    rentang_input = {}
+    for param, label in PARAMETER_GRID.items():
+        col1, col2 = st.columns(2)
+        with col1:
+            minimum = st.number_input(f"{label} minimum", min_value=0.0, key=f"sim_{param}_min")
+        with col2:
+            maksimum = st.number_input(f"{label} maksimum", min_value=0.0, key=f"sim_{param}_max")
+        if param == "susut":
+            minimum, maksimum = min(minimum, 100.0), min(maksimum, 100.0)
+        rentang_input[param] = (min(minimum, maksimum), max(minimum, maksimum))
+    
+    grid = simulasi_grid(
+        berat_awal_sim,
+        **{param: rentang(minimum, maksimum, jumlah_titik) for param, (minimum, maksimum) in rentang_input.items()}
+    )
+    ringkasan_sim = ringkasan_grid(grid)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Jumlah Kombinasi", f"{ringkasan_sim['jumlah_kombinasi']:,}")
+    col2.metric("Skenario Menguntungkan", f"{ringkasan_sim['persen_untung']:.1f}%")
+    col3.metric("Keuntungan Terendah", format_currency(ringkasan_sim["keuntungan_min"]))
+    col4.metric("Keuntungan Tertinggi", format_currency(ringkasan_sim["keuntungan_maks"]))
+    
+    # Harga jual impas untuk nilai tengah parameter biaya
+    tengah = {param: (minimum + maksimum) / 2 for param, (minimum, maksimum) in rentang_input.items()}
+    impas = harga_jual_impas(
+        berat_awal_sim, tengah["harga_beli"], tengah["susut"], tengah["jarak"] * tengah["ongkos_per_km"]
+    )
+    st.write(
+        f"Harga jual impas pada nilai tengah (harga beli {format_currency(tengah['harga_beli'])}/kg, "
+        f"susut {tengah['susut']:.1f}%, jarak {tengah['jarak']:.1f} km, "
+        f"ongkos {format_currency(tengah['ongkos_per_km'])}/km): **{format_currency(float(impas))}/kg**"
+    )
+    
+    # Heatmap dua parameter; parameter lain direduksi dengan agregasi terpilih
+    import plotly.graph_objects as go
+    
+    agregasi_options = {
+        "Rata-rata": "mean",
+        "Terburuk": "min",
+        "Terbaik": "max",
+        "Persen Menguntungkan": "persen_untung"
+    }
+    nama_parameter = list(PARAMETER_GRID)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sumbu_x = st.selectbox("Sumbu X", nama_parameter, index=0, format_func=PARAMETER_GRID.get, key="sim_sumbu_x")
+    with col2:
+        sumbu_y_options = [p for p in nama_parameter if p != sumbu_x]
+        sumbu_y = st.selectbox("Sumbu Y", sumbu_y_options, index=1, format_func=PARAMETER_GRID.get, key="sim_sumbu_y")
+    with col3:
+        agregasi = st.selectbox("Agregasi parameter lain", list(agregasi_options), key="sim_agregasi")
+    
+    heatmap = heatmap_grid(grid, sumbu_x, sumbu_y, agregasi_options[agregasi])
+    persen = agregasi_options[agregasi] == "persen_untung"
+    
+    fig = go.Figure(go.Heatmap(
+        z=heatmap.to_numpy(),
+        x=heatmap.columns,
+        y=heatmap.index,
+        colorscale="RdYlGn",
+        zmid=50 if persen else 0,
+        colorbar_title="%" if persen else "Rp"
+    ))
+    if not persen:
+        frontier = frontier_impas(heatmap)
+        if not frontier.empty:
+            fig.add_trace(go.Scatter(
+                x=frontier["x"], y=frontier["y"],
+                mode="lines", name="Batas Impas",
+                line=dict(color="black", width=3)
+            ))
+    fig.update_layout(
+        title=f"Keuntungan Bersih ({agregasi})" if not persen else "Persentase Skenario Menguntungkan",
+        xaxis_title=PARAMETER_GRID[sumbu_x],
+        yaxis_title=PARAMETER_GRID[sumbu_y]
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.write("**Skenario terbaik:** " + ", ".join(
+        f"{PARAMETER_GRID[p]} {v:,.1f}" for p, v in ringkasan_sim["skenario_terbaik"].items()
+    ))
+    st.write("**Skenario terburuk:** " + ", ".join(
+        f"{PARAMETER_GRID[p]} {v:,.1f}" for p, v in ringkasan_sim["skenario_terburuk"].items()
+    ))
+    
+    # Simpan skenario bernama
+    if st.session_state.is_authenticated and st.session_state.selected_perusahaan_id:
+        with st.form("simpan_skenario_form"):
+            nama_skenario = st.text_input("Nama Skenario")
+            if st.form_submit_button("Simpan Skenario"):
+                if not nama_skenario.strip():
+                    st.error("Nama skenario harus diisi")
+                else:
+                    try:
+                        simpan_skenario_simulasi(
+                            st.session_state.selected_perusahaan_id,
+                            nama_skenario.strip(),
+                            {
+                                "berat_awal": berat_awal_sim,
+                                "jumlah": jumlah_titik,
+                                "rentang": {p: list(r) for p, r in rentang_input.items()}
+                            }
+                        )
+                        st.success(f"Skenario '{nama_skenario.strip()}' berhasil disimpan!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Terjadi kesalahan saat menyimpan skenario: {e}")
+
+# Ringkasan profil rerun (hanya jika mode profiling aktif)
+if rerun_profiler.enabled:
+    rerun_profiler.stop()
+    import plotly.express as px
+    with st.expander("Profil Rerun", expanded=True):
+        phase_df = pd.DataFrame(rerun_profiler.phases, columns=["Fase", "Durasi (ms)"])
+        query_log = st.session_state.get("query_log")
+        if query_log is not None:
+            phase_df.loc[len(phase_df)] = ["SQL (total semua fase)", query_log.total_ms]
+        
+        st.caption(f"Total rerun: {rerun_profiler.total_ms:.1f} ms (termasuk overhead cProfile)")
+        fig_phase = px.bar(phase_df, x="Durasi (ms)", y="Fase", orientation="h", title="Waktu per Fase")
+        st.plotly_chart(fig_phase, use_container_width=True)
+        
+        sort_label = st.radio("Urutkan hot spot", ["Cumulative", "Tottime"], horizontal=True, key="profil_sort")
+        st.dataframe(
+            pd.DataFrame(rerun_profiler.hotspots(sort_by=sort_label.lower())).round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.download_button(
+            "Unduh Profil Mentah (.prof)",
+            data=rerun_profiler.raw_profile(),
+            file_name=f"karet_rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+            mime="application/octet-stream"
+        )
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,163 @@
+"""
+Benchmark waktu import (python -X importtime) untuk dependensi level-modul app.py.
+
+Script ini mengambil semua import level-modul dari app.py, menjalankannya di
+subprocess baru dengan `python -X importtime`, lalu:
+
+- memastikan modul berat yang seharusnya lazy (matplotlib, reportlab, plotly.express)
+  tidak ikut dimuat saat cold start,
+- membandingkan total waktu import dengan baseline yang tersimpan.
+
+Penggunaan:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --update-baseline
+
+Database memakai SQLite lokal sementara jika DATABASE_URL belum diset.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline_import_time.json")
+
+# Modul yang tidak boleh dimuat oleh import level-modul app.py.
+# plotly.graph_objects sendiri sudah dimuat oleh Streamlit, jadi yang dijaga
+# adalah plotly.express (yang ikut memuat data contoh dan modul trendline).
+LAZY_MODULES = ("matplotlib", "reportlab", "plotly.express")
+
+# Batas kenaikan relatif terhadap baseline sebelum dianggap regresi
+DEFAULT_TOLERANCE = 0.25
+
+
+def get_top_level_imports(path=APP_PATH):
+    """
+    Mengambil statement import level-modul dari sebuah file Python
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+    return statements
+
+
+def run_importtime(statements, database_url):
+    """
+    Menjalankan statement import di interpreter baru dengan -X importtime
+
+    Returns:
+        list: dict per modul (module, self_us, cumulative_us)
+    """
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import gagal:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def measure(repeat=5):
+    """
+    Mengukur waktu import beberapa kali dan mengambil hasil tercepat
+
+    Returns:
+        dict: total_ms, lazy_modules_loaded, top_modules
+    """
+    statements = get_top_level_imports()
+    database_url = os.environ.get("DATABASE_URL")
+
+    best = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if not database_url:
+            database_url = f"sqlite:///{os.path.join(tmp, 'bench_import.db')}"
+
+        for _ in range(repeat):
+            modules = run_importtime(statements, database_url)
+            total_us = sum(m["self_us"] for m in modules)
+            if best is None or total_us < best[0]:
+                best = (total_us, modules)
+
+    total_us, modules = best
+    loaded = sorted({
+        lazy for m in modules for lazy in LAZY_MODULES
+        if m["module"] == lazy or m["module"].startswith(lazy + ".")
+    })
+    top = sorted(
+        (m for m in modules if "." not in m["module"]),
+        key=lambda m: m["cumulative_us"],
+        reverse=True,
+    )[:15]
+
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "lazy_modules_loaded": loaded,
+        "top_modules": [
+            {"module": m["module"], "cumulative_ms": round(m["cumulative_us"] / 1000, 1)}
+            for m in top
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan (diambil yang tercepat)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Batas kenaikan relatif terhadap baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Simpan hasil sebagai baseline baru")
+    args = parser.parse_args()
+
+    result = measure(args.repeat)
+
+    print(f"Total waktu import level-modul app.py: {result['total_ms']} ms")
+    for m in result["top_modules"]:
+        print(f"  {m['module']:<30} {m['cumulative_ms']:>10} ms")
+
+    failed = False
+    if result["lazy_modules_loaded"]:
+        print(f"GAGAL: modul lazy ikut dimuat saat cold start: {', '.join(result['lazy_modules_loaded'])}")
+        failed = True
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline disimpan ke {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+        limit = baseline["total_ms"] * (1 + args.tolerance)
+        print(f"Baseline: {baseline['total_ms']} ms (batas {limit:.1f} ms)")
+        if result["total_ms"] > limit:
+            print("GAGAL: waktu import melebihi baseline")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
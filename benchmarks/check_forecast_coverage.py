@@ -0,0 +1,91 @@
+"""
+Pemeriksaan kalibrasi interval ramalan harga SIR 20 (forecast_harga).
+
+Script ini membangkitkan random walk log harga harian (setiap hari atau hanya
+hari kerja, seperti data get_harga_sicom_harian), melatih model dari histori,
+lalu menghitung seberapa sering nilai sebenarnya di minggu ke-h jatuh di dalam
+interval ramalan. Untuk interval 90%, cakupan harus mendekati 0.9 di setiap
+horizon; jika varians error dihitung per hari tetapi dipakai per minggu,
+cakupannya turun jauh di bawah itu.
+
+Penggunaan:
+    python benchmarks/check_forecast_coverage.py
+    python benchmarks/check_forecast_coverage.py --seri 500 --tingkat 0.8
+"""
+import argparse
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast_harga import latih_state, observasi_dataframe, ramalan
+
+HORIZON_DIPERIKSA = (1, 4, 8)
+
+# Selisih cakupan maksimum terhadap tingkat interval sebelum dianggap gagal
+DEFAULT_TOLERANSI = 0.07
+
+
+def cakupan(jumlah_seri=300, hari_histori=500, tingkat=0.9, frekuensi="D", volatilitas_harian=0.01, seed=1):
+    """
+    Proporsi nilai sebenarnya yang berada di dalam interval ramalan per horizon
+
+    Args:
+        jumlah_seri (int): Jumlah random walk yang disimulasikan
+        hari_histori (int): Jumlah observasi histori per seri
+        tingkat (float): Tingkat kepercayaan interval
+        frekuensi (str): "D" (setiap hari) atau "B" (hari kerja)
+        volatilitas_harian (float): Simpangan baku log return per observasi
+        seed (int): Seed generator
+
+    Returns:
+        dict: horizon (minggu) -> cakupan
+    """
+    rng = np.random.default_rng(seed)
+    horizon = max(HORIZON_DIPERIKSA)
+    n = hari_histori + horizon * 7
+    tanggal = pd.date_range("2023-01-02", periods=n, freq=frekuensi).date
+    kena = {h: 0 for h in HORIZON_DIPERIKSA}
+
+    for _ in range(jumlah_seri):
+        harga = np.exp(np.log(20000) + np.cumsum(rng.normal(0, volatilitas_harian, n)))
+        histori = [SimpleNamespace(tanggal=t, harga_sir_rupiah=v) for t, v in zip(tanggal[:hari_histori], harga[:hari_histori])]
+        observasi = observasi_dataframe(histori, "harga_sir_rupiah")
+        hasil = ramalan(latih_state(observasi["tanggal"], observasi["nilai"]), horizon, tingkat)
+
+        # Nilai sebenarnya: harga terakhir pada atau sebelum tanggal ramalan
+        posisi = np.searchsorted(tanggal, hasil["tanggal"].dt.date.to_numpy(), side="right") - 1
+        aktual = harga[posisi]
+        for h in HORIZON_DIPERIKSA:
+            baris = hasil.iloc[h - 1]
+            kena[h] += baris["bawah"] <= aktual[h - 1] <= baris["atas"]
+
+    return {h: kena[h] / jumlah_seri for h in HORIZON_DIPERIKSA}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seri", type=int, default=300, help="Jumlah random walk per frekuensi")
+    parser.add_argument("--tingkat", type=float, default=0.9, help="Tingkat kepercayaan interval")
+    parser.add_argument("--toleransi", type=float, default=DEFAULT_TOLERANSI, help="Selisih cakupan maksimum")
+    args = parser.parse_args()
+
+    gagal = False
+    for frekuensi, label in (("D", "harian"), ("B", "hari kerja")):
+        hasil = cakupan(args.seri, tingkat=args.tingkat, frekuensi=frekuensi)
+        for h, nilai in hasil.items():
+            status = "ok" if abs(nilai - args.tingkat) <= args.toleransi else "GAGAL"
+            gagal |= status == "GAGAL"
+            print(f"  {label:<10} minggu ke-{h:<2} cakupan {nilai:.3f} (target {args.tingkat:.2f})  {status}")
+
+    if gagal:
+        print("GAGAL: interval ramalan tidak terkalibrasi")
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Pemeriksaan round-trip teks volume (volume.format_volume -> volume.parse_volume).
+
+simpan_realisasi_anggaran menyimpan teks hasil format_volume di kolom volume
+lama, dan jalur yang hanya memakai teks mengurainya kembali dengan
+parse_volume. Script ini memastikan kedua fungsi memakai format angka yang
+sama (titik ribuan, koma desimal), sehingga jumlah dan satuan tidak berubah.
+
+Penggunaan:
+    python benchmarks/check_volume_format.py
+    python benchmarks/check_volume_format.py --acak 100000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from volume import SatuanVolume, format_volume, parse_volume, parse_volume_series
+
+# Nilai tepi: ribuan, jutaan, desimal, dan angka yang mirip pemisah ribuan
+CONTOH_JUMLAH = (0.25, 1, 1.5, 12.75, 323, 999, 1000, 1500, 1500.5, 12000, 999999.99, 1000000, 1234567.25)
+
+
+def periksa(jumlah_acak=10000, seed=0):
+    """
+    Membandingkan (jumlah, satuan) dengan hasil parse dari teks format_volume
+
+    Args:
+        jumlah_acak (int): Jumlah pasangan acak di samping CONTOH_JUMLAH
+        seed (int): Seed generator
+
+    Returns:
+        list: Tuple (jumlah, satuan, teks, hasil parse) yang tidak cocok
+    """
+    rng = np.random.default_rng(seed)
+    desimal = rng.integers(0, 3, jumlah_acak)
+    acak = np.round(rng.lognormal(5, 3, jumlah_acak) * 10.0 ** desimal) / 10.0 ** desimal
+    jumlah = np.concatenate([np.repeat(CONTOH_JUMLAH, len(SatuanVolume)), acak])
+    satuan = np.concatenate([
+        np.tile([s.value for s in SatuanVolume], len(CONTOH_JUMLAH)),
+        rng.choice([s.value for s in SatuanVolume], jumlah_acak),
+    ])
+
+    teks = [format_volume(j, s) for j, s in zip(jumlah, satuan)]
+    hasil = parse_volume_series(teks)
+    gagal = []
+    for j, s, t, (hj, hs) in zip(jumlah, satuan, teks, hasil.itertuples(index=False)):
+        if hs != s or not np.isclose(hj, j, rtol=1e-12, atol=0):
+            gagal.append((j, s, t, (hj, hs)))
+
+    # Jalur skalar harus sama dengan jalur vektor
+    for j, s in zip(CONTOH_JUMLAH, [s.value for s in SatuanVolume] * len(CONTOH_JUMLAH)):
+        teks_skalar = format_volume(j, s)
+        if parse_volume(teks_skalar) != (float(j), s):
+            gagal.append((j, s, teks_skalar, parse_volume(teks_skalar)))
+    return gagal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--acak", type=int, default=10000, help="Jumlah pasangan volume acak")
+    args = parser.parse_args()
+
+    gagal = periksa(args.acak)
+    for j, s, teks, hasil in gagal[:20]:
+        print(f"  {j!r} {s}: '{teks}' -> {hasil}")
+    if gagal:
+        print(f"GAGAL: {len(gagal)} volume tidak kembali sama setelah format dan parse")
+        sys.exit(1)
+    print(f"ok: {len(CONTOH_JUMLAH) * len(SatuanVolume) + args.acak} volume kembali sama setelah format dan parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Utilitas bersama untuk benchmark: pengukuran waktu, penyimpanan hasil JSON,
+dan perbandingan dengan baseline.
+"""
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(ROOT, "benchmarks")
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Batas kenaikan relatif terhadap baseline sebelum dianggap regresi
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(fn, repeat=3, setup=None):
+    """
+    Menjalankan fn beberapa kali dan mengembalikan statistik waktunya
+
+    Args:
+        fn (callable): Fungsi yang diukur; menerima hasil setup jika setup diberikan
+        repeat (int): Jumlah pengulangan
+        setup (callable): Fungsi persiapan per pengulangan (tidak ikut diukur)
+
+    Returns:
+        dict: min_ms, median_ms, mean_ms, repeat
+    """
+    durations = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        if setup:
+            fn(arg)
+        else:
+            fn()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "mean_ms": round(statistics.mean(durations), 3),
+        "repeat": repeat,
+    }
+
+
+def get_metadata(database_url):
+    """
+    Metadata lingkungan untuk disimpan bersama hasil benchmark
+    """
+    try:
+        git_rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        git_rev = ""
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_rev": git_rev,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "backend": database_url.split(":", 1)[0],
+    }
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Membandingkan median setiap kasus dengan baseline
+
+    Kasus baru yang belum ada di baseline untuk ukuran data yang sudah punya
+    baseline ditandai missing, agar kasus tersebut tidak diam-diam tidak
+    pernah dibandingkan. Ukuran data yang sama sekali tidak ada di baseline
+    dilewati.
+
+    Returns:
+        list: dict per kasus (case, baseline_ms, current_ms, ratio, regression, missing);
+            baseline_ms dan ratio None untuk kasus yang missing
+    """
+    baseline_cases = baseline.get("cases", {})
+    baseline_sizes = {case.split("/", 1)[0] for case in baseline_cases}
+    comparison = []
+    for case, current in results["cases"].items():
+        previous = baseline_cases.get(case)
+        if previous is None:
+            if case.split("/", 1)[0] in baseline_sizes:
+                comparison.append({
+                    "case": case,
+                    "baseline_ms": None,
+                    "current_ms": current["median_ms"],
+                    "ratio": None,
+                    "regression": False,
+                    "missing": True,
+                })
+            continue
+        ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else float("inf")
+        comparison.append({
+            "case": case,
+            "baseline_ms": previous["median_ms"],
+            "current_ms": current["median_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance,
+            "missing": False,
+        })
+    return comparison
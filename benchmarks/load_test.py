@@ -0,0 +1,326 @@
+"""
+Load test headless untuk latensi rerun app.py menggunakan streamlit.testing AppTest.
+
+Mensimulasikan banyak sesi pengguna yang berjalan bersamaan. Setiap sesi login
+sebagai admin lalu menjalankan interaksi acak (berbobot):
+
+- pilih_perusahaan: mengganti perusahaan di sidebar
+- muat_ulang: rerun tanpa perubahan (misalnya pengguna menekan R atau membuka halaman)
+- simpan_penjualan: mengisi dan submit form penjualan karet
+- simpan_anggaran: mengisi dan submit form realisasi anggaran
+- buat_pdf: menekan tombol Buat Laporan PDF
+
+Perpindahan tab tidak memicu rerun di Streamlit (semua tab dieksekusi pada setiap
+rerun), sehingga biayanya sudah termasuk dalam setiap interaksi di atas.
+
+Untuk setiap interaksi dicatat latensi rerun (termasuk rerun internal akibat
+st.rerun()) dan jumlah round trip ke database (dari histogram db_metrics). Hasil
+dilaporkan sebagai p50/p95/p99 per jenis interaksi.
+
+Sesi dijalankan di beberapa proses worker secara bersamaan. Setiap proses punya
+pool koneksi sendiri, jadi kontensi yang diuji adalah kontensi di database
+(lock SQLite atau koneksi PostgreSQL), bukan di pool satu server Streamlit.
+
+Penggunaan:
+    python benchmarks/load_test.py                              # SQLite sementara, 12 sesi
+    python benchmarks/load_test.py --sessions 24 --concurrency 12 --interactions 15
+    python benchmarks/load_test.py --database-url postgresql://... --reset-ok
+
+PERINGATAN: tanpa --database-url, database SQLite sementara dibuat dan diisi data
+sintetis. Dengan --database-url, semua tabel di database target dihapus dan dibuat ulang.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ROOT, get_metadata, save_results
+
+APP_PATH = os.path.join(ROOT, "app.py")
+ADMIN_PASSWORD = "karet123"
+
+# Bobot interaksi: pengguna lebih sering melihat data daripada menulis atau membuat PDF
+INTERACTION_WEIGHTS = {
+    "pilih_perusahaan": 4,
+    "muat_ulang": 2,
+    "simpan_penjualan": 2,
+    "simpan_anggaran": 2,
+    "buat_pdf": 1,
+}
+
+
+def _form_widget(widgets, form_id, label):
+    for widget in widgets:
+        if widget.proto.form_id == form_id and widget.label == label:
+            return widget
+    raise LookupError(f"Widget '{label}' tidak ditemukan di form {form_id}")
+
+
+def _submit(at, form_id):
+    for button in at.button:
+        if button.proto.form_id == form_id:
+            return button.click()
+    raise LookupError(f"Tombol submit form {form_id} tidak ditemukan")
+
+
+def _pilih_perusahaan(at, rng):
+    selectbox = at.sidebar.selectbox[0]
+    # Opsi terakhir adalah "+ Tambah Perusahaan Baru"
+    return selectbox.set_value(rng.randrange(len(selectbox.options) - 1))
+
+
+def _muat_ulang(at, rng):
+    return at
+
+
+def _simpan_penjualan(at, rng):
+    form_id = "penjualan_karet_form"
+    _form_widget(at.number_input, form_id, "Jarak (km)").set_value(round(rng.uniform(20, 200), 1))
+    _form_widget(at.number_input, form_id, "Harga Jual (Rp/kg)").set_value(float(rng.randrange(12000, 17000, 100)))
+    _form_widget(at.number_input, form_id, "Susut (%)").set_value(round(rng.uniform(5, 20), 1))
+    _form_widget(at.number_input, form_id, "Harga Beli (Rp/kg)").set_value(float(rng.randrange(9000, 12000, 100)))
+    _form_widget(at.number_input, form_id, "Berat Awal (kg)").set_value(float(rng.randrange(500, 5000, 10)))
+    _form_widget(at.number_input, form_id, "Ongkos Kirim (Rp)").set_value(float(rng.randrange(100000, 2000000, 100000)))
+    _form_widget(at.text_area, form_id, "Rekomendasi").input("Load test")
+    return _submit(at, form_id)
+
+
+def _simpan_anggaran(at, rng):
+    form_id = "realisasi_anggaran_form"
+    if rng.random() < 0.3:
+        _form_widget(at.number_input, form_id, "Debet (In)").set_value(float(rng.randrange(1000000, 10000000, 100000)))
+    else:
+        _form_widget(at.number_input, form_id, "Kredit (Out)").set_value(float(rng.randrange(100000, 2000000, 100000)))
+    _form_widget(at.number_input, form_id, "Volume").set_value(float(rng.randrange(1, 500)))
+    _form_widget(at.selectbox, form_id, "Satuan").set_value("kg")
+    _form_widget(at.text_area, form_id, "Keterangan").input("Load test")
+    return _submit(at, form_id)
+
+
+def _buat_pdf(at, rng):
+    for button in at.button:
+        if button.label == "Buat Laporan PDF":
+            return button.click()
+    raise LookupError("Tombol Buat Laporan PDF tidak ditemukan")
+
+
+INTERACTIONS = {
+    "pilih_perusahaan": _pilih_perusahaan,
+    "muat_ulang": _muat_ulang,
+    "simpan_penjualan": _simpan_penjualan,
+    "simpan_anggaran": _simpan_anggaran,
+    "buat_pdf": _buat_pdf,
+}
+
+
+def _timed_run(at, db_metrics):
+    queries_before = db_metrics.query_seconds.count
+    start = time.perf_counter()
+    at.run()
+    latency_ms = (time.perf_counter() - start) * 1000
+    errors = [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+    return latency_ms, db_metrics.query_seconds.count - queries_before, errors
+
+
+def run_session(session_id, interactions, seed, timeout, think_ms):
+    """
+    Menjalankan satu sesi pengguna simulasi
+
+    Returns:
+        list: dict per interaksi (session, interaction, latency_ms, db_round_trips, errors)
+    """
+    from streamlit.testing.v1 import AppTest
+    import db_metrics
+
+    rng = random.Random(seed * 1000 + session_id)
+    names = list(INTERACTION_WEIGHTS)
+    weights = [INTERACTION_WEIGHTS[n] for n in names]
+    records = []
+
+    def record(name, latency_ms, round_trips, errors):
+        records.append({
+            "session": session_id,
+            "interaction": name,
+            "latency_ms": round(latency_ms, 3),
+            "db_round_trips": round_trips,
+            "errors": errors,
+        })
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    record("buka_halaman", *_timed_run(at, db_metrics))
+
+    at.sidebar.text_input[0].input(ADMIN_PASSWORD)
+    _submit(at, "login_form")
+    record("login", *_timed_run(at, db_metrics))
+
+    for _ in range(interactions):
+        name = rng.choices(names, weights)[0]
+        try:
+            INTERACTIONS[name](at, rng)
+        except LookupError as e:
+            record(name, 0.0, 0, [str(e)])
+            continue
+        record(name, *_timed_run(at, db_metrics))
+        if think_ms:
+            time.sleep(rng.uniform(0, think_ms) / 1000)
+
+    return records
+
+
+def run_worker(session_ids, interactions, seed, timeout, think_ms):
+    # Keluaran print aplikasi dan peringatan Streamlit tidak relevan untuk load test
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    records = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for session_id in session_ids:
+            records.extend(run_session(session_id, interactions, seed, timeout, think_ms))
+    return records
+
+
+def _percentile(values, q):
+    import numpy as np
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+def summarize(records):
+    """
+    Mengagregasi latensi dan round trip database per jenis interaksi
+
+    Returns:
+        dict: Nama interaksi -> count, errors, p50_ms, p95_ms, p99_ms, max_ms, db_round_trips_mean, db_round_trips_max
+    """
+    grouped = {}
+    for r in records:
+        grouped.setdefault(r["interaction"], []).append(r)
+    grouped["SEMUA"] = records
+
+    summary = {}
+    for name, items in grouped.items():
+        ok = [r for r in items if not r["errors"]]
+        latencies = [r["latency_ms"] for r in ok]
+        round_trips = [r["db_round_trips"] for r in ok]
+        summary[name] = {
+            "count": len(items),
+            "errors": len(items) - len(ok),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": round(max(latencies), 3) if latencies else None,
+            "db_round_trips_mean": round(sum(round_trips) / len(round_trips), 1) if round_trips else None,
+            "db_round_trips_max": max(round_trips) if round_trips else None,
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'Interaksi':<18} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'maks ms':>9} {'DB rata2':>9} {'DB maks':>8}")
+    for name, s in summary.items():
+        if s["p50_ms"] is None:
+            print(f"{name:<18} {s['count']:>5} {s['errors']:>4}")
+            continue
+        print(
+            f"{name:<18} {s['count']:>5} {s['errors']:>4} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} "
+            f"{s['p99_ms']:>9.1f} {s['max_ms']:>9.1f} {s['db_round_trips_mean']:>9.1f} {s['db_round_trips_max']:>8}"
+        )
+
+
+def _prepare_database(database_url, perusahaan, tahun, seed):
+    # Diisi di subprocess agar proses induk tidak perlu mengimpor database.py
+    code = (
+        "import database\n"
+        "from benchmarks import synthetic_data\n"
+        "database.Base.metadata.drop_all(database.engine)\n"
+        "database.Base.metadata.create_all(database.engine)\n"
+        f"data = synthetic_data.generate({perusahaan}, {tahun}, {seed})\n"
+        "synthetic_data.bulk_load(database.engine, synthetic_data.get_tables(database), data)\n"
+    )
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=12, help="Jumlah sesi pengguna simulasi")
+    parser.add_argument("--concurrency", type=int, default=6, help="Jumlah proses worker yang berjalan bersamaan")
+    parser.add_argument("--interactions", type=int, default=10, help="Jumlah interaksi per sesi (di luar buka halaman dan login)")
+    parser.add_argument("--think-ms", type=float, default=0, help="Jeda acak maksimum antar interaksi")
+    parser.add_argument("--timeout", type=float, default=120, help="Batas waktu satu rerun dalam detik")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--perusahaan", type=int, default=5, help="Jumlah perusahaan sintetis")
+    parser.add_argument("--tahun", type=int, default=2, help="Lama histori sintetis dalam tahun")
+    parser.add_argument("--database-url", help="Database target (default: SQLite sementara)")
+    parser.add_argument("--reset-ok", action="store_true", help="Izinkan reset database non-sementara")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "load_test_results.json"))
+    parser.add_argument("--worker-sessions", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_sessions:
+        session_ids = [int(s) for s in args.worker_sessions.split(",")]
+        records = run_worker(session_ids, args.interactions, args.seed, args.timeout, args.think_ms)
+        save_results(records, args.worker_output)
+        return
+
+    if args.database_url and not args.reset_ok:
+        parser.error("--database-url akan mereset semua tabel; tambahkan --reset-ok untuk melanjutkan")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'load_test.db')}"
+        print(f"Menyiapkan database ({args.perusahaan} perusahaan, {args.tahun} tahun)...", flush=True)
+        _prepare_database(database_url, args.perusahaan, args.tahun, args.seed)
+
+        env = dict(os.environ, DATABASE_URL=database_url)
+        concurrency = max(1, min(args.concurrency, args.sessions))
+        workers = []
+        for worker in range(concurrency):
+            session_ids = list(range(worker, args.sessions, concurrency))
+            output = os.path.join(tmpdir, f"worker_{worker}.json")
+            cmd = [
+                sys.executable, os.path.abspath(__file__),
+                "--worker-sessions", ",".join(str(s) for s in session_ids),
+                "--worker-output", output,
+                "--interactions", str(args.interactions),
+                "--think-ms", str(args.think_ms),
+                "--timeout", str(args.timeout),
+                "--seed", str(args.seed),
+            ]
+            workers.append((subprocess.Popen(cmd, cwd=ROOT, env=env, stderr=subprocess.DEVNULL), output))
+
+        print(f"Menjalankan {args.sessions} sesi x {args.interactions} interaksi dengan {concurrency} worker...", flush=True)
+        start = time.perf_counter()
+        records = []
+        for process, output in workers:
+            if process.wait() != 0:
+                raise SystemExit(f"Worker gagal dengan kode {process.returncode}")
+            with open(output, encoding="utf-8") as f:
+                records.extend(json.load(f))
+        duration = time.perf_counter() - start
+
+    summary = summarize(records)
+    print_summary(summary)
+    print(f"Durasi total {duration:.1f} detik")
+
+    errors = [r for r in records if r["errors"]]
+    for r in errors[:5]:
+        print(f"  sesi {r['session']} {r['interaction']}: {r['errors'][0]}")
+
+    save_results({
+        "metadata": dict(get_metadata(database_url), sessions=args.sessions, concurrency=concurrency,
+                         interactions=args.interactions, duration_s=round(duration, 3)),
+        "summary": summary,
+        "records": records,
+    }, args.output)
+    print(f"Hasil disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
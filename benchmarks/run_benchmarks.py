@@ -0,0 +1,251 @@
+"""
+Benchmark suite untuk jalur-jalur penting aplikasi laporan karet.
+
+Kasus yang diukur untuk setiap ukuran data (jumlah baris per tabel):
+
+- CRUD database.py: simpan_*/get_* untuk penjualan, strategi, realisasi anggaran
+- simpan_realisasi_anggaran dengan tanggal mundur (memicu rekalkulasi saldo)
+- hapus_realisasi_anggaran
+- get_harga_sicom_view per tipe_data (bulan otomatis dari harga harian)
+- Simulasi Monte Carlo harga SIR 20, 100k jalur per metode (tanpa cache)
+- KPI kas bulanan dari ringkasan anggaran (tanpa cache)
+- Pembuatan DataFrame untuk setiap tab (dashboard_data)
+- Tiga grafik pdf_generator dan generate_pdf_penjualan_karet end to end
+
+Setiap ukuran dijalankan di subprocess terpisah dengan database yang di-reset,
+sehingga hasilnya tidak saling mempengaruhi.
+
+Penggunaan:
+    python benchmarks/run_benchmarks.py                         # SQLite sementara, 1k/100k/1M
+    python benchmarks/run_benchmarks.py --sizes 1000,100000
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --database-url postgresql://... --reset-ok
+
+PERINGATAN: semua tabel di database target akan dihapus dan dibuat ulang.
+"""
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic_data
+from benchmarks.common import (
+    ROOT, DEFAULT_BASELINE_PATH, DEFAULT_TOLERANCE, measure, get_metadata,
+    save_results, load_results, compare_with_baseline
+)
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+# Grafik matplotlib dan tabel PDF dibatasi agar mencerminkan laporan yang realistis
+DEFAULT_CHART_ROWS = 500
+DEFAULT_PDF_ROWS = 200
+
+# Lama histori sintetis; harga SICOM mingguan bergantung pada ini, bukan pada ukuran
+HISTORY_YEARS = 25
+
+
+def _populate(database, size, seed=42):
+    """
+    Mengisi database dengan `size` baris per tabel untuk satu perusahaan benchmark
+    menggunakan generator data sintetis
+
+    Returns:
+        tuple: (perusahaan_id, sicom_id)
+    """
+    data = synthetic_data.generate(
+        n_perusahaan=1, tahun=HISTORY_YEARS, seed=seed,
+        penjualan_per_perusahaan=size, anggaran_per_perusahaan=size,
+        strategi_per_perusahaan=size, start=datetime.date(2000, 1, 2)
+    )
+    result = synthetic_data.bulk_load(database.engine, synthetic_data.get_tables(database), data)
+    return result["perusahaan_ids"][0], result["sicom_id"]
+
+
+def run_worker(size, repeat, chart_rows, pdf_rows):
+    """
+    Menjalankan semua kasus benchmark untuk satu ukuran data (di dalam subprocess)
+
+    Returns:
+        dict: Nama kasus -> statistik waktu
+    """
+    import pandas as pd
+
+    import database
+    import dashboard_data
+    import pdf_generator
+
+    database.Base.metadata.drop_all(database.engine)
+    database.Base.metadata.create_all(database.engine)
+    perusahaan_id, sicom_id = _populate(database, size)
+
+    cases = {}
+
+    def bench(name, fn, setup=None, repeat=repeat):
+        cases[f"{size}/{name}"] = measure(fn, repeat=repeat, setup=setup)
+        print(f"  {size:>8} {name:<45} {cases[f'{size}/{name}']['median_ms']:>12.3f} ms", flush=True)
+
+    # CRUD
+    bench("get_penjualan_karet", lambda: database.get_penjualan_karet(perusahaan_id))
+    new_dates = iter(datetime.date(2030, 1, 1) + datetime.timedelta(days=i) for i in range(10000))
+    bench("simpan_penjualan_karet", lambda: database.simpan_penjualan_karet(
+        perusahaan_id, next(new_dates), 100, 15000, 10, 11500, 2000, 1800,
+        27000000, 23000000, 4000000, 1000000, 3000000, "Benchmark"
+    ))
+    bench("get_strategi_risiko", lambda: database.get_strategi_risiko(perusahaan_id))
+    aspek_counter = iter(range(10000))
+    bench("simpan_strategi_risiko", lambda: database.simpan_strategi_risiko(
+        perusahaan_id, f"Aspek baru {next(aspek_counter)}", "Risiko", "Solusi"
+    ))
+    bench("get_realisasi_anggaran", lambda: database.get_realisasi_anggaran(perusahaan_id))
+    backdated = datetime.date(1999, 12, 31)
+    bench("simpan_realisasi_anggaran_backdated", lambda: database.simpan_realisasi_anggaran(
+        perusahaan_id, backdated, 1000000, 0, 0, "1 Lot", "Setoran mundur"
+    ))
+
+    def _setup_hapus():
+        database.simpan_realisasi_anggaran(perusahaan_id, backdated, 0, 50000, 0, "1 Pcs", "Untuk dihapus")
+        db = database.get_db_session()
+        try:
+            return db.query(database.RealisasiAnggaran.id).filter(
+                database.RealisasiAnggaran.perusahaan_id == perusahaan_id,
+                database.RealisasiAnggaran.keterangan == "Untuk dihapus"
+            ).scalar()
+        finally:
+            db.close()
+
+    bench("hapus_realisasi_anggaran", lambda id_: database.hapus_realisasi_anggaran(id_, perusahaan_id),
+          setup=_setup_hapus)
+    bench("get_harga_sicom_view[Tertinggi]", lambda: database.get_harga_sicom_view(sicom_id, "Tertinggi"))
+    bench("get_harga_sicom_view[Terendah]", lambda: database.get_harga_sicom_view(sicom_id, "Terendah"))
+
+    import monte_carlo
+    harga_pasar = database.get_harga_pasar_harian()
+    tanggal_pasar = [h[0] for h in harga_pasar]
+    nilai_pasar = [h[1] for h in harga_pasar]
+    for metode in monte_carlo.METODE_SIMULASI:
+        bench(f"monte_carlo_100k[{metode}]", lambda metode=metode: monte_carlo.jalankan_simulasi(
+            tanggal_pasar, nilai_pasar, 12, monte_carlo.JUMLAH_JALUR, metode
+        ))
+
+    import kpi_anggaran
+    ringkasan_anggaran = database.get_ringkasan_anggaran(perusahaan_id)
+    ringkasan_anggaran_df = pd.DataFrame(
+        [(r.tahun, r.bulan, r.total_debet, r.total_kredit, r.jumlah_transaksi) for r in ringkasan_anggaran],
+        columns=["tahun", "bulan", "total_debet", "total_kredit", "jumlah_transaksi"]
+    )
+    bench("kpi_anggaran_bulanan", lambda: kpi_anggaran.kpi_bulanan(ringkasan_anggaran_df))
+
+    # DataFrame per tab
+    penjualan = database.get_penjualan_karet(perusahaan_id)
+    strategi = database.get_strategi_risiko(perusahaan_id)
+    anggaran = database.get_realisasi_anggaran(perusahaan_id)
+    tertinggi = database.get_harga_sicom_view(sicom_id, "Tertinggi")
+    terendah = database.get_harga_sicom_view(sicom_id, "Terendah")
+
+    bench("dataframe_tab1_penjualan", lambda: dashboard_data.penjualan_dataframe(penjualan))
+    bench("dataframe_tab2_strategi", lambda: dashboard_data.strategi_dataframe(strategi))
+    bench("dataframe_tab3_anggaran", lambda: dashboard_data.anggaran_dataframe(anggaran))
+    bench("dataframe_tab4_tabel", lambda: dashboard_data.harga_sicom_tabel_dataframe(tertinggi))
+    bench("dataframe_tab4_visual", lambda: dashboard_data.harga_sicom_visual_dataframe(tertinggi))
+
+    # Grafik PDF dan PDF end to end (dengan jumlah baris terbatas)
+    perusahaan = database.get_perusahaan_by_id(perusahaan_id)
+    chart_data = dashboard_data.build_pdf_data(
+        perusahaan, [], [], anggaran[-chart_rows:], tertinggi[-chart_rows:], terendah[-chart_rows:]
+    )
+    bench("pdf_create_cash_flow_chart",
+          lambda: pdf_generator.create_cash_flow_chart(chart_data["realisasi_anggaran"]))
+    bench("pdf_create_distribution_chart",
+          lambda: pdf_generator.create_distribution_chart(chart_data["realisasi_anggaran"]))
+    bench("pdf_create_price_comparison_chart", lambda: pdf_generator.create_price_comparison_chart(
+        chart_data["harga_sicom_sir"]["harga_tertinggi"], chart_data["harga_sicom_sir"]["harga_terendah"]
+    ))
+
+    pdf_data = dashboard_data.build_pdf_data(
+        perusahaan, penjualan[-pdf_rows:], strategi[:20], anggaran[-pdf_rows:],
+        tertinggi[-pdf_rows:], terendah[-pdf_rows:]
+    )
+    bench("generate_pdf_penjualan_karet", lambda: pdf_generator.generate_pdf_penjualan_karet(pdf_data))
+
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Ukuran data dipisahkan koma")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chart-rows", type=int, default=DEFAULT_CHART_ROWS)
+    parser.add_argument("--pdf-rows", type=int, default=DEFAULT_PDF_ROWS)
+    parser.add_argument("--database-url", help="Default: SQLite sementara")
+    parser.add_argument("--reset-ok", action="store_true", help="Izinkan reset database non-SQLite")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--worker-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_size:
+        cases = run_worker(args.worker_size, args.repeat, args.chart_rows, args.pdf_rows)
+        save_results(cases, args.worker_output)
+        return
+
+    if args.database_url and not args.database_url.startswith("sqlite") and not args.reset_ok:
+        parser.error("Benchmark akan menghapus semua tabel; tambahkan --reset-ok untuk database non-SQLite")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    all_cases = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp, f'bench_{size}.db')}"
+            worker_output = os.path.join(tmp, f"cases_{size}.json")
+            # Cache bersama dimatikan agar yang diukur adalah jalur database yang sebenarnya
+            env = dict(os.environ, DATABASE_URL=database_url, DB_SLOW_QUERY_MS="1e12", KARET_CACHE_BACKEND="none")
+            print(f"Ukuran {size} baris ({database_url.split(':', 1)[0]})", flush=True)
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__),
+                "--worker-size", str(size),
+                "--worker-output", worker_output,
+                "--repeat", str(args.repeat),
+                "--chart-rows", str(args.chart_rows),
+                "--pdf-rows", str(args.pdf_rows),
+            ], cwd=ROOT, env=env, check=True)
+            all_cases.update(load_results(worker_output))
+
+    results = {
+        "metadata": get_metadata(args.database_url or "sqlite"),
+        "cases": all_cases,
+    }
+    save_results(results, args.output)
+    print(f"Hasil disimpan ke {args.output}")
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline disimpan ke {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        comparison = compare_with_baseline(results, load_results(args.baseline), args.tolerance)
+        regressions = [c for c in comparison if c["regression"]]
+        missing = [c for c in comparison if c["missing"]]
+        for c in comparison:
+            if c["missing"]:
+                print(f"  {c['case']:<55} {'-':>12} -> {c['current_ms']:>12.3f} ms  {'':<7} TANPA BASELINE")
+                continue
+            flag = "REGRESI" if c["regression"] else "ok"
+            print(f"  {c['case']:<55} {c['baseline_ms']:>12.3f} -> {c['current_ms']:>12.3f} ms  x{c['ratio']:<6} {flag}")
+        if regressions:
+            print(f"GAGAL: {len(regressions)} kasus melambat lebih dari {args.tolerance:.0%}")
+        if missing:
+            print(f"GAGAL: {len(missing)} kasus belum ada di baseline; jalankan dengan --update-baseline")
+        if regressions or missing:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Generator data sintetis untuk benchmark dan load test.
+
+Menghasilkan histori perdagangan karet yang realistis untuk N perusahaan selama
+Y tahun, sepenuhnya tervektorisasi dengan NumPy:
+
+- Perusahaan: campuran Pabrik dan Depo dengan jarak dasar masing-masing
+- PenjualanKaret: susut berkorelasi dengan jarak, harga jual mengikuti harga pasar
+  SICOM ditambah premi per perusahaan, ongkos kirim sebanding jarak x berat
+- RealisasiAnggaran: debet (setoran/penerimaan) dan kredit (pembelian bokar,
+  operasional) dengan saldo kumulatif yang konsisten per perusahaan
+- HargaSicomSir: harga SIR 20 mingguan (geometric random walk dengan volatilitas)
+  dan kurs; minggu-minggu di bulan tertinggi/terendah setiap tahun diberi
+  tipe_data "Tertinggi"/"Terendah" seperti data yang diinput manual
+- HargaSicomHarian: seluruh harga SIR 20 yang sama tanpa label tipe_data
+
+Data ditulis dengan bulk insert: COPY untuk PostgreSQL, executemany berpotongan
+untuk database lain, sehingga puluhan juta baris bisa dimuat dalam hitungan menit.
+
+Penggunaan:
+    python benchmarks/synthetic_data.py --perusahaan 200 --tahun 10 --seed 7 \\
+        --database-url postgresql://... --reset
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulasi import hitung_penjualan
+
+DEFAULT_START = datetime.date(2015, 1, 4)  # hari Minggu, sama seperti data SICOM contoh
+CHUNK_ROWS = 100000
+
+KETERANGAN_KREDIT = np.array([
+    "Beli Bokar", "Ongkos Angkut", "Upah Bongkar Muat", "Beli Timbangan Duduk 150 Kg",
+    "Sewa Gudang", "Perawatan Truk", "Solar", "Gaji Karyawan"
+])
+SATUAN_KREDIT = np.array(["kg", "Lot", "Lot", "Pcs", "Lot", "Lot", "liter", "Lot"])
+
+
+def _weekly_dates(start, n_weeks):
+    return pd.date_range(start, periods=n_weeks, freq="7D")
+
+
+def generate_perusahaan(n_perusahaan, rng):
+    """
+    Returns:
+        DataFrame: nama, jenis, jarak_dasar, premi_harga, tarif_kirim
+    """
+    jenis = np.where(rng.random(n_perusahaan) < 0.75, "Pabrik", "Depo")
+    nomor = np.arange(1, n_perusahaan + 1)
+    return pd.DataFrame({
+        "nama": [f"{j} Sintetis {i:04d}" for j, i in zip(jenis, nomor)],
+        "jenis": jenis,
+        # Pabrik cenderung lebih jauh dari kebun dibanding depo
+        "jarak_dasar": np.where(jenis == "Pabrik", rng.lognormal(4.7, 0.35, n_perusahaan), rng.lognormal(3.6, 0.4, n_perusahaan)).round(1),
+        "premi_harga": np.where(jenis == "Pabrik", rng.normal(1.0, 0.04, n_perusahaan), rng.normal(0.88, 0.04, n_perusahaan)),
+        "tarif_kirim": rng.uniform(3.5, 6.5, n_perusahaan),  # Rp per kg per km
+    })
+
+
+def generate_harga_sicom(n_weeks, rng, start=DEFAULT_START):
+    """
+    Harga SIR 20 mingguan dengan volatilitas dan kurs yang bergerak acak
+
+    Returns:
+        DataFrame: tanggal, harga_rupiah, harga_rupiah_100, harga_sir_sgd, harga_sir_rupiah, tipe_data
+    """
+    dates = _weekly_dates(start, n_weeks)
+    log_returns = rng.normal(0.0008, 0.03, n_weeks)
+    harga_sir_sgd = (150 * np.exp(np.cumsum(log_returns))).round(2)
+    kurs = (15000 * np.exp(np.cumsum(rng.normal(0.0002, 0.004, n_weeks)))).round()
+
+    df = pd.DataFrame({
+        "tanggal": dates,
+        "harga_rupiah": kurs,
+        "harga_rupiah_100": (kurs / 100).round(2),
+        "harga_sir_sgd": harga_sir_sgd,
+        "harga_sir_rupiah": (harga_sir_sgd * kurs / 100).round(),
+    })
+
+    # Tandai minggu-minggu di bulan dengan rata-rata tertinggi/terendah setiap tahun
+    tahun = df["tanggal"].dt.year
+    bulan = df["tanggal"].dt.month
+    rata_bulanan = df.groupby([tahun, bulan])["harga_sir_rupiah"].transform("mean")
+    maks_tahunan = rata_bulanan.groupby(tahun).transform("max")
+    min_tahunan = rata_bulanan.groupby(tahun).transform("min")
+    df["tipe_data"] = np.where(rata_bulanan == maks_tahunan, "Tertinggi",
+                               np.where(rata_bulanan == min_tahunan, "Terendah", None))
+    return df
+
+
+def generate_penjualan(perusahaan, harga, n_per_perusahaan, rng):
+    """
+    Returns:
+        DataFrame: kolom PenjualanKaret dengan perusahaan_idx sebagai indeks perusahaan
+    """
+    n_perusahaan = len(perusahaan)
+    total = n_perusahaan * n_per_perusahaan
+    idx = np.repeat(np.arange(n_perusahaan), n_per_perusahaan)
+
+    # Tanggal penjualan acak dalam rentang harga, harga pasar diambil dari minggu tersebut
+    minggu = rng.integers(0, len(harga), total)
+    tanggal = harga["tanggal"].to_numpy()[minggu] + rng.integers(0, 7, total).astype("timedelta64[D]")
+    harga_pasar = harga["harga_sir_rupiah"].to_numpy()[minggu]
+
+    jarak = (perusahaan["jarak_dasar"].to_numpy()[idx] * rng.normal(1.0, 0.05, total)).clip(1).round(1)
+    # Susut naik seiring jarak: ~8% dasar + ~0.05% per km, dengan noise
+    susut = (8 + 0.05 * jarak + rng.normal(0, 1.2, total)).clip(1, 35).round(1)
+    # Harga bokar ~45% dari harga SIR 20 (KKK ~ 50-60%), dengan premi per perusahaan
+    harga_jual = (harga_pasar * 0.45 * perusahaan["premi_harga"].to_numpy()[idx] * rng.normal(1, 0.02, total)).round(-1)
+    harga_beli = (harga_jual * rng.uniform(0.72, 0.82, total)).round(-1)
+    berat_awal = rng.lognormal(7.6, 0.35, total).round()
+    ongkos_kirim = (perusahaan["tarif_kirim"].to_numpy()[idx] * jarak * berat_awal).round(-3)
+
+    hasil = hitung_penjualan(berat_awal, harga_jual, harga_beli, susut, ongkos_kirim)
+
+    return pd.DataFrame({
+        "perusahaan_idx": idx,
+        "tanggal": tanggal,
+        "jarak": jarak,
+        "harga_jual": harga_jual,
+        "susut": susut,
+        "harga_beli": harga_beli,
+        "berat_awal": berat_awal,
+        "berat_jual": hasil["berat_jual"].round(2),
+        "total_harga_jual": hasil["total_harga_jual"].round(),
+        "total_harga_beli": hasil["total_harga_beli"].round(),
+        "keuntungan_kotor": hasil["keuntungan_kotor"].round(),
+        "ongkos_kirim": ongkos_kirim,
+        "keuntungan_bersih": hasil["keuntungan_bersih"].round(),
+        "rekomendasi": "Data sintetis",
+    })
+
+
+def generate_anggaran(n_perusahaan, n_per_perusahaan, start, end, rng):
+    """
+    Returns:
+        DataFrame: kolom RealisasiAnggaran dengan saldo kumulatif konsisten per perusahaan
+    """
+    total = n_perusahaan * n_per_perusahaan
+    idx = np.repeat(np.arange(n_perusahaan), n_per_perusahaan)
+    span_days = max(1, (end - start).days)
+    tanggal = np.datetime64(start) + rng.integers(0, span_days, total).astype("timedelta64[D]")
+
+    is_debet = rng.random(total) < 0.25
+    debet = np.where(is_debet, rng.lognormal(16.2, 0.6, total).round(-3), 0.0)
+    kategori = rng.integers(0, len(KETERANGAN_KREDIT), total)
+    kredit = np.where(is_debet, 0.0, rng.lognormal(14.0, 1.0, total).round(-3))
+
+    jumlah = np.where(SATUAN_KREDIT[kategori] == "kg", rng.integers(100, 5000, total), rng.integers(1, 20, total))
+    volume = np.where(is_debet, "1 Lot", pd.Series(jumlah).astype(str).to_numpy() + " " + SATUAN_KREDIT[kategori])
+    keterangan = np.where(is_debet, "Kredit Kas", KETERANGAN_KREDIT[kategori])
+
+    df = pd.DataFrame({
+        "perusahaan_idx": idx,
+        "tanggal": tanggal,
+        "debet": debet,
+        "kredit": kredit,
+        "volume": volume,
+        "volume_jumlah": np.where(is_debet, 1, jumlah).astype(float),
+        "volume_satuan": np.where(is_debet, "lot", np.char.lower(SATUAN_KREDIT[kategori])),
+        "keterangan": keterangan,
+    })
+    # Saldo dihitung dengan urutan yang sama seperti database.py (tanggal, lalu urutan insert)
+    df = df.sort_values(["perusahaan_idx", "tanggal"], kind="stable").reset_index(drop=True)
+    df["saldo"] = (df["debet"] - df["kredit"]).groupby(df["perusahaan_idx"]).cumsum()
+    return df
+
+
+def generate_strategi(n_perusahaan, n_per_perusahaan):
+    idx = np.repeat(np.arange(n_perusahaan), n_per_perusahaan)
+    nomor = np.tile(np.arange(1, n_per_perusahaan + 1), n_perusahaan)
+    return pd.DataFrame({
+        "perusahaan_idx": idx,
+        "aspek": pd.Series(nomor).map(lambda i: f"Aspek Risiko {i}").to_numpy(),
+        "risiko": "Jika susut lebih dari estimasi, profit bisa menurun. 1. Harga turun 2. Susut naik",
+        "solusi": "a. Negosiasi kontrak harga tetap b. Gunakan transportasi cepat dan tertutup",
+    })
+
+
+def generate(n_perusahaan=10, tahun=3, seed=42, penjualan_per_perusahaan=None,
+             anggaran_per_perusahaan=None, strategi_per_perusahaan=3, start=DEFAULT_START):
+    """
+    Menghasilkan seluruh dataset sintetis
+
+    Args:
+        n_perusahaan (int): Jumlah perusahaan (pabrik/depo)
+        tahun (int): Lama histori dalam tahun
+        seed (int): Seed generator acak
+        penjualan_per_perusahaan (int): Default ~2 penjualan per minggu
+        anggaran_per_perusahaan (int): Default ~5 transaksi kas per minggu
+        strategi_per_perusahaan (int): Jumlah baris strategi risiko per perusahaan
+
+    Returns:
+        dict: DataFrame perusahaan, harga_sicom_sir, harga_sicom_harian, penjualan_karet,
+            realisasi_anggaran, strategi_risiko
+    """
+    rng = np.random.default_rng(seed)
+    n_weeks = max(1, int(round(tahun * 52.18)))
+    end = start + datetime.timedelta(weeks=n_weeks)
+
+    perusahaan = generate_perusahaan(n_perusahaan, rng)
+    harga = generate_harga_sicom(n_weeks, rng, start)
+    penjualan = generate_penjualan(perusahaan, harga, penjualan_per_perusahaan or n_weeks * 2, rng)
+    anggaran = generate_anggaran(n_perusahaan, anggaran_per_perusahaan or n_weeks * 5, start, end, rng)
+    strategi = generate_strategi(n_perusahaan, strategi_per_perusahaan)
+
+    return {
+        "perusahaan": perusahaan,
+        "harga_sicom_sir": harga[harga["tipe_data"].notna()].reset_index(drop=True),
+        "harga_sicom_harian": harga.drop(columns=["tipe_data"]),
+        "penjualan_karet": penjualan,
+        "realisasi_anggaran": anggaran,
+        "strategi_risiko": strategi,
+    }
+
+
+def ringkasan_penjualan(penjualan):
+    """
+    Menghitung ringkasan penjualan bulanan dari DataFrame penjualan (dengan perusahaan_id),
+    sama seperti yang dipelihara database.py secara inkremental
+
+    Returns:
+        DataFrame: kolom tabel ringkasan_penjualan_bulanan
+    """
+    tanggal = pd.to_datetime(penjualan["tanggal"])
+    grouped = penjualan.assign(tahun=tanggal.dt.year, bulan=tanggal.dt.month).groupby(["perusahaan_id", "tahun", "bulan"])
+    return grouped.agg(
+        jumlah_penjualan=("keuntungan_bersih", "size"),
+        total_berat_awal=("berat_awal", "sum"),
+        total_berat_jual=("berat_jual", "sum"),
+        total_harga_jual=("total_harga_jual", "sum"),
+        total_harga_beli=("total_harga_beli", "sum"),
+        total_ongkos_kirim=("ongkos_kirim", "sum"),
+        total_keuntungan_bersih=("keuntungan_bersih", "sum"),
+        keuntungan_maks=("keuntungan_bersih", "max"),
+        keuntungan_min=("keuntungan_bersih", "min"),
+    ).reset_index()
+
+
+def ringkasan_anggaran(anggaran):
+    """
+    Menghitung ringkasan anggaran bulanan dari DataFrame realisasi anggaran (dengan perusahaan_id),
+    sama seperti yang dipelihara database.py secara inkremental
+
+    Returns:
+        DataFrame: kolom tabel ringkasan_anggaran_bulanan
+    """
+    tanggal = pd.to_datetime(anggaran["tanggal"])
+    grouped = anggaran.assign(tahun=tanggal.dt.year, bulan=tanggal.dt.month).groupby(["perusahaan_id", "tahun", "bulan"])
+    return grouped.agg(
+        jumlah_transaksi=("debet", "size"),
+        total_debet=("debet", "sum"),
+        total_kredit=("kredit", "sum"),
+    ).reset_index()
+
+
+def _copy_dataframe(raw_connection, table_name, df):
+    # COPY FROM STDIN dalam potongan agar memori tetap terkendali
+    cursor = raw_connection.cursor()
+    columns = ", ".join(df.columns)
+    for start in range(0, len(df), CHUNK_ROWS):
+        buffer = io.StringIO()
+        df.iloc[start:start + CHUNK_ROWS].to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.close()
+
+
+def _insert_dataframe(conn, table, df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        conn.execute(table.insert(), chunk.to_dict("records"))
+
+
+def bulk_load(engine, tables, data):
+    """
+    Menulis dataset sintetis ke database dengan bulk insert
+
+    Args:
+        engine: SQLAlchemy Engine
+        tables (dict): Nama tabel -> SQLAlchemy Table (dari model database.py)
+        data (dict): Hasil generate()
+
+    Returns:
+        dict: Jumlah baris per tabel dan ID perusahaan (perusahaan_ids, sicom_id)
+    """
+    with engine.begin() as conn:
+        conn.execute(tables["perusahaan"].insert(), data["perusahaan"][["nama", "jenis"]].to_dict("records"))
+        conn.execute(tables["perusahaan"].insert(), [{"nama": "SICOM", "jenis": "Pasar Karet"}])
+        rows = conn.execute(tables["perusahaan"].select().order_by(tables["perusahaan"].c.id)).fetchall()
+
+    id_by_nama = {r.nama: r.id for r in rows}
+    perusahaan_ids = data["perusahaan"]["nama"].map(id_by_nama).to_numpy()
+    sicom_id = id_by_nama["SICOM"]
+
+    def _with_ids(df):
+        out = df.drop(columns=["perusahaan_idx"])
+        out.insert(0, "perusahaan_id", perusahaan_ids[df["perusahaan_idx"].to_numpy()])
+        if "tanggal" in out:
+            out["tanggal"] = pd.to_datetime(out["tanggal"]).dt.date
+        return out
+
+    harga = data["harga_sicom_sir"].copy()
+    harga.insert(0, "perusahaan_id", sicom_id)
+    harga["tanggal"] = pd.to_datetime(harga["tanggal"]).dt.date
+
+    frames = {
+        "penjualan_karet": _with_ids(data["penjualan_karet"]),
+        "realisasi_anggaran": _with_ids(data["realisasi_anggaran"]),
+        "strategi_risiko": _with_ids(data["strategi_risiko"]),
+        "harga_sicom_sir": harga,
+    }
+    if "harga_sicom_harian" in tables and "harga_sicom_harian" in data:
+        harian = data["harga_sicom_harian"].copy()
+        harian.insert(0, "perusahaan_id", sicom_id)
+        harian["tanggal"] = pd.to_datetime(harian["tanggal"]).dt.date
+        frames["harga_sicom_harian"] = harian
+    if "ringkasan_penjualan_bulanan" in tables:
+        frames["ringkasan_penjualan_bulanan"] = ringkasan_penjualan(frames["penjualan_karet"])
+    if "ringkasan_anggaran_bulanan" in tables:
+        frames["ringkasan_anggaran_bulanan"] = ringkasan_anggaran(frames["realisasi_anggaran"])
+
+    if engine.dialect.name == "postgresql":
+        raw = engine.raw_connection()
+        try:
+            for name, df in frames.items():
+                _copy_dataframe(raw, name, df)
+            raw.commit()
+        finally:
+            raw.close()
+    else:
+        with engine.begin() as conn:
+            for name, df in frames.items():
+                _insert_dataframe(conn, tables[name], df)
+
+    # Data ditulis langsung tanpa fungsi simpan_* di database.py, jadi cache diinvalidasi di sini
+    from shared_cache import invalidate_table
+    for name in tables:
+        invalidate_table(name)
+
+    counts = {name: len(df) for name, df in frames.items()}
+    counts["perusahaan"] = len(data["perusahaan"]) + 1
+    return {"counts": counts, "perusahaan_ids": [int(i) for i in perusahaan_ids], "sicom_id": int(sicom_id)}
+
+
+def get_tables(database):
+    return {
+        "perusahaan": database.Perusahaan.__table__,
+        "penjualan_karet": database.PenjualanKaret.__table__,
+        "realisasi_anggaran": database.RealisasiAnggaran.__table__,
+        "strategi_risiko": database.StrategiRisiko.__table__,
+        "harga_sicom_sir": database.HargaSicomSir.__table__,
+        "harga_sicom_harian": database.HargaSicomHarian.__table__,
+        "ringkasan_penjualan_bulanan": database.RingkasanPenjualanBulanan.__table__,
+        "ringkasan_anggaran_bulanan": database.RingkasanAnggaranBulanan.__table__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--perusahaan", type=int, default=10)
+    parser.add_argument("--tahun", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--penjualan-per-perusahaan", type=int)
+    parser.add_argument("--anggaran-per-perusahaan", type=int)
+    parser.add_argument("--database-url", help="Default: DATABASE_URL")
+    parser.add_argument("--reset", action="store_true", help="Hapus dan buat ulang semua tabel sebelum memuat data")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    import database
+
+    if args.reset:
+        database.Base.metadata.drop_all(database.engine)
+        database.Base.metadata.create_all(database.engine)
+
+    start = time.perf_counter()
+    data = generate(args.perusahaan, args.tahun, args.seed,
+                    args.penjualan_per_perusahaan, args.anggaran_per_perusahaan)
+    generated = time.perf_counter()
+    result = bulk_load(database.engine, get_tables(database), data)
+    loaded = time.perf_counter()
+
+    print(f"Data dibuat dalam {generated - start:.1f} detik, dimuat dalam {loaded - generated:.1f} detik")
+    for name, count in result["counts"].items():
+        print(f"  {name:<20} {count:>12,} baris")
+
+
+if __name__ == "__main__":
+    main()
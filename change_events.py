@@ -0,0 +1,229 @@
+import datetime
+import json
+import os
+import select
+import threading
+import time
+
+from sqlalchemy import text
+
+from shared_cache import invalidate_table
+
+# Channel NOTIFY PostgreSQL untuk event perubahan data
+CHANNEL = "karet_changes"
+
+# Interval polling tabel change_log (fallback SQLite) dan batas tunggu NOTIFY, dalam detik
+POLL_INTERVAL = float(os.environ.get("KARET_CHANGE_POLL_INTERVAL", "2"))
+
+# Umur maksimum baris change_log sebelum dihapus
+RETENTION = datetime.timedelta(hours=float(os.environ.get("KARET_CHANGE_LOG_RETENTION_HOURS", "24")))
+
+# Tabel yang hasil query-nya disimpan di cache (diinvalidasi seluruhnya saat resinkronisasi)
+CACHED_TABLES = ("perusahaan", "penjualan_karet", "strategi_risiko", "realisasi_anggaran", "harga_sicom_sir",
+                  "harga_sicom_harian", "kurs_sgd_idr", "skenario_simulasi")
+
+_RECONNECT_DELAY = 5.0
+_PRUNE_INTERVAL = 3600.0
+
+
+def record_change(session, change_log_table, table, perusahaan_id=None):
+    """
+    Mencatat event perubahan di dalam transaksi tulis yang sedang berjalan
+
+    Baris change_log ikut ter-commit atau ter-rollback bersama datanya. Di
+    PostgreSQL, pg_notify juga dikirim di transaksi yang sama sehingga listener
+    hanya menerimanya setelah commit.
+
+    Args:
+        session: SQLAlchemy Session yang sedang menulis
+        change_log_table: Table change_log
+        table (str): Nama tabel yang berubah
+        perusahaan_id (int): Perusahaan yang datanya berubah; None untuk seluruh tabel
+
+    Returns:
+        int: ID event perubahan
+    """
+    result = session.execute(change_log_table.insert().values(
+        table_name=table,
+        perusahaan_id=perusahaan_id,
+        created_at=datetime.datetime.utcnow()
+    ))
+    change_id = result.inserted_primary_key[0]
+
+    if session.get_bind().dialect.name == "postgresql":
+        payload = json.dumps({"id": change_id, "table": table, "perusahaan_id": perusahaan_id})
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+    return change_id
+
+
+def apply_change(table, perusahaan_id, change_id):
+    """
+    Menginvalidasi entri cache yang terpengaruh oleh satu event perubahan
+
+    Versi namespace hanya dinaikkan ke ID event jika lebih besar dari ID yang
+    sudah diterapkan, sehingga event yang sama boleh diterapkan berkali-kali
+    (oleh penulis dan oleh listener setiap worker) dan event lama yang datang
+    setelah event yang lebih baru tidak mengembalikan versi lama.
+    """
+    invalidate_table(table, perusahaan_id, change_id=change_id)
+
+
+class ChangeListener(threading.Thread):
+    """
+    Thread latar belakang yang menerapkan event perubahan ke cache worker ini
+
+    PostgreSQL: LISTEN pada CHANNEL dengan koneksi khusus di luar pool.
+    Database lain (SQLite): polling tabel change_log setiap POLL_INTERVAL detik.
+
+    Setelah (re)koneksi, event yang terlewat diambil dari change_log
+    berdasarkan ID terakhir yang sudah diterapkan; saat pertama kali berjalan
+    semua tabel yang di-cache diinvalidasi karena riwayat sebelumnya tidak diketahui.
+    """
+
+    def __init__(self, engine, change_log_table, poll_interval=POLL_INTERVAL):
+        super().__init__(name="karet-change-listener", daemon=True)
+        self.engine = engine
+        self.change_log_table = change_log_table
+        self.poll_interval = poll_interval
+        self.mode = "listen" if engine.dialect.name == "postgresql" else "polling"
+        self.last_id = None
+        self.events_applied = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+        self._last_prune = 0.0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def status(self):
+        """
+        Returns:
+            dict: mode, running, last_id, events_applied, last_error
+        """
+        return {
+            "mode": self.mode,
+            "running": self.is_alive(),
+            "last_id": self.last_id,
+            "events_applied": self.events_applied,
+            "last_error": self.last_error,
+        }
+
+    def run(self):
+        while not self._stop_event.is_set():
+            connection = None
+            try:
+                # Koneksi dilepas dari pool agar tidak memakan slot pool selamanya;
+                # query lewat cursor DBAPI langsung tidak ikut tercatat di metrik query
+                connection = self.engine.connect()
+                connection.detach()
+                dbapi_connection = connection.connection.dbapi_connection
+                if self.mode == "listen":
+                    self._start_listening(dbapi_connection)
+                self._catch_up(dbapi_connection)
+                if self.mode == "listen":
+                    self._listen(dbapi_connection)
+                else:
+                    self._poll(dbapi_connection)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Listener perubahan data terputus, mencoba lagi dalam {_RECONNECT_DELAY:.0f} detik: {e}")
+                self._stop_event.wait(_RECONNECT_DELAY)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _start_listening(self, dbapi_connection):
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"LISTEN {CHANNEL}")
+        cursor.close()
+
+    def _query(self, dbapi_connection, sql, params=()):
+        if self.engine.dialect.paramstyle == "qmark":
+            sql = sql.replace("%s", "?")
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else []
+        finally:
+            cursor.close()
+        if self.mode == "polling":
+            dbapi_connection.commit()
+        return rows
+
+    def _catch_up(self, dbapi_connection):
+        if self.last_id is None:
+            row = self._query(dbapi_connection, "SELECT MAX(id) FROM change_log")
+            self.last_id = row[0][0] or 0
+            for table in CACHED_TABLES:
+                invalidate_table(table)
+            return
+
+        rows = self._query(
+            dbapi_connection,
+            "SELECT id, table_name, perusahaan_id FROM change_log WHERE id > %s ORDER BY id",
+            (self.last_id,)
+        )
+        for change_id, table, perusahaan_id in rows:
+            self._apply(change_id, table, perusahaan_id)
+
+    def _apply(self, change_id, table, perusahaan_id):
+        apply_change(table, perusahaan_id, change_id)
+        self.last_id = max(self.last_id or 0, change_id)
+        self.events_applied += 1
+
+    def _listen(self, dbapi_connection):
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([dbapi_connection], [], [], self.poll_interval)
+            if readable:
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    event = json.loads(notify.payload)
+                    self._apply(event["id"], event["table"], event["perusahaan_id"])
+            self._maybe_prune()
+
+    def _poll(self, dbapi_connection):
+        while not self._stop_event.wait(self.poll_interval):
+            self._catch_up(dbapi_connection)
+            self._maybe_prune()
+
+    def _maybe_prune(self):
+        now = time.time()
+        if now - self._last_prune < _PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        cutoff = datetime.datetime.utcnow() - RETENTION
+        with self.engine.begin() as conn:
+            conn.execute(self.change_log_table.delete().where(self.change_log_table.c.created_at < cutoff))
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def start_change_listener(engine, change_log_table):
+    """
+    Memulai listener perubahan data untuk proses ini (sekali per proses)
+
+    Returns:
+        ChangeListener: Listener yang berjalan
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = ChangeListener(engine, change_log_table)
+            _listener.start()
+    return _listener
+
+
+def get_listener_status():
+    """
+    Returns:
+        dict: Status listener, atau None jika belum dimulai
+    """
+    return _listener.status() if _listener is not None else None
@@ -0,0 +1,151 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Di atas jumlah titik ini trace digambar dengan WebGL (scattergl), bukan SVG
+AMBANG_WEBGL = int(os.environ.get("KARET_AMBANG_WEBGL", "1000"))
+
+# Jumlah titik maksimum per garis setelah downsampling LTTB
+MAKS_TITIK_GARIS = int(os.environ.get("KARET_MAKS_TITIK_GARIS", "2000"))
+
+# Jumlah titik maksimum scatter; sisanya disampel acak (seed tetap) dengan titik ekstrem dipertahankan
+MAKS_TITIK_SEBAR = int(os.environ.get("KARET_MAKS_TITIK_SEBAR", "20000"))
+
+
+def _numerik(nilai):
+    """
+    Nilai sumbu (angka atau tanggal) sebagai float untuk perhitungan luas segitiga
+    """
+    seri = pd.Series(nilai)
+    if pd.api.types.is_numeric_dtype(seri):
+        return seri.to_numpy(dtype=float)
+    return pd.to_datetime(seri).to_numpy().astype("datetime64[ns]").astype(np.int64).astype(float)
+
+
+def lttb(x, y, jumlah_keluar):
+    """
+    Downsampling Largest-Triangle-Three-Buckets
+
+    Titik pertama dan terakhir selalu dipertahankan; dari setiap bucket di
+    antaranya dipilih titik yang membentuk segitiga terluas dengan titik
+    terpilih sebelumnya dan rata-rata bucket berikutnya, sehingga puncak dan
+    lembah garis tetap terlihat.
+
+    Args:
+        x, y (array-like): Titik garis, terurut menurut x
+        jumlah_keluar (int): Jumlah titik hasil
+
+    Returns:
+        ndarray: Indeks titik yang dipertahankan (terurut)
+    """
+    x = _numerik(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if jumlah_keluar >= n or jumlah_keluar < 3:
+        return np.arange(n)
+
+    # Batas bucket untuk titik 1..n-2; bucket terakhir "berikutnya" adalah titik terakhir
+    batas = np.linspace(1, n - 1, jumlah_keluar - 1).astype(np.int64)
+    batas_berikut = np.append(batas[1:], n)
+    indeks = np.empty(jumlah_keluar, dtype=np.int64)
+    indeks[0], indeks[-1] = 0, n - 1
+
+    # Rata-rata setiap bucket sekaligus dari jumlah kumulatif
+    kum_x = np.concatenate(([0.0], np.cumsum(x)))
+    kum_y = np.concatenate(([0.0], np.cumsum(y)))
+    panjang = batas_berikut - batas
+    rata_x_bucket = (kum_x[batas_berikut] - kum_x[batas]) / panjang
+    rata_y_bucket = (kum_y[batas_berikut] - kum_y[batas]) / panjang
+
+    terpilih = 0
+    for i in range(jumlah_keluar - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        rata_x, rata_y = rata_x_bucket[i + 1], rata_y_bucket[i + 1]
+        luas = np.abs(
+            (x[terpilih] - rata_x) * (y[awal:akhir] - y[terpilih])
+            - (x[terpilih] - x[awal:akhir]) * (rata_y - y[terpilih])
+        )
+        terpilih = awal + int(np.argmax(luas))
+        indeks[i + 1] = terpilih
+    return indeks
+
+
+def turunkan_garis(df, x, y, color=None, maks_titik=MAKS_TITIK_GARIS):
+    """
+    Menerapkan LTTB ke setiap garis (setiap grup color) secara terpisah
+
+    Returns:
+        DataFrame: Baris yang dipertahankan, terurut menurut grup lalu x
+    """
+    df = df.dropna(subset=[x, y]).sort_values(x, kind="stable")
+    grup = [df] if color is None else [g for _, g in df.groupby(color, sort=False)]
+    return pd.concat(
+        [g.iloc[lttb(g[x], g[y], maks_titik)] for g in grup] or [df],
+        ignore_index=True
+    )
+
+
+def turunkan_sebar(df, x, y, maks_titik=MAKS_TITIK_SEBAR):
+    """
+    Sampel acak (seed tetap) untuk scatter besar; baris dengan x/y minimum dan
+    maksimum selalu ikut agar rentang sumbu tidak berubah
+
+    LTTB tidak dipakai untuk scatter karena yang ingin dilihat adalah sebaran
+    titik, bukan bentuk garis.
+    """
+    if len(df) <= maks_titik:
+        return df
+    df = df.reset_index(drop=True)
+    ekstrem = {df[kolom].idxmin() for kolom in (x, y)} | {df[kolom].idxmax() for kolom in (x, y)}
+    sisa = df.drop(index=list(ekstrem))
+    sampel = sisa.sample(n=max(maks_titik - len(ekstrem), 0), random_state=0)
+    return pd.concat([df.loc[list(ekstrem)], sampel]).sort_index()
+
+
+def _mode_render(jumlah_titik):
+    return "webgl" if jumlah_titik > AMBANG_WEBGL else "svg"
+
+
+def grafik_garis(df, x, y, color=None, maks_titik=MAKS_TITIK_GARIS, **kwargs):
+    """
+    px.line dengan downsampling LTTB dan WebGL untuk seri besar
+
+    Args:
+        df (DataFrame): Data
+        x (str): Kolom sumbu x
+        y (str | list): Kolom sumbu y; beberapa kolom digambar sebagai garis
+            terpisah seperti px.line bentuk lebar (legend "variable", sumbu "value")
+        color (str): Kolom pengelompokan garis
+        maks_titik (int): Jumlah titik maksimum per garis
+        **kwargs: Diteruskan ke px.line
+
+    Returns:
+        Figure: Figure Plotly
+    """
+    import plotly.express as px
+
+    if isinstance(y, (list, tuple)):
+        df = df.melt(id_vars=[x], value_vars=list(y), var_name="variable", value_name="value")
+        y, color = "value", "variable"
+    data = turunkan_garis(df, x, y, color, maks_titik)
+    return px.line(data, x=x, y=y, color=color, render_mode=_mode_render(len(data)), **kwargs)
+
+
+def grafik_sebar(df, x, y, maks_titik=MAKS_TITIK_SEBAR, **kwargs):
+    """
+    px.scatter dengan sampling untuk data besar dan WebGL di atas AMBANG_WEBGL
+
+    Args:
+        df (DataFrame): Data
+        x, y (str): Kolom sumbu
+        maks_titik (int): Jumlah titik maksimum
+        **kwargs: Diteruskan ke px.scatter
+
+    Returns:
+        Figure: Figure Plotly
+    """
+    import plotly.express as px
+
+    data = turunkan_sebar(df.dropna(subset=[x, y]), x, y, maks_titik)
+    return px.scatter(data, x=x, y=y, render_mode=_mode_render(len(data)), **kwargs)
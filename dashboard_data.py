@@ -0,0 +1,323 @@
+import pandas as pd
+from utils import format_currency, format_percentage
+from kpi_anggaran import kpi_terkini, format_runway
+
+# Nama bulan untuk label tampilan (indeks 1-12)
+NAMA_BULAN = [None, "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+              "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
+
+
+def penjualan_dataframe(penjualan_data):
+    """
+    Membuat DataFrame tab Rencana Penjualan Karet dari objek PenjualanKaret
+    """
+    return pd.DataFrame([
+        {
+            "ID": p.id,
+            "Tanggal": p.tanggal,
+            "Jarak (km)": p.jarak,
+            "Harga Jual (Rp/kg)": p.harga_jual,
+            "Susut (%)": p.susut,
+            "Harga Beli (Rp/kg)": p.harga_beli,
+            "Berat Awal (kg)": p.berat_awal,
+            "Berat Jual (kg)": p.berat_jual,
+            "Total Harga Jual": p.total_harga_jual,
+            "Total Harga Beli": p.total_harga_beli,
+            "Keuntungan Kotor": p.keuntungan_kotor,
+            "Ongkos Kirim": p.ongkos_kirim,
+            "Keuntungan Bersih": p.keuntungan_bersih
+        } for p in penjualan_data
+    ])
+
+
+def ringkasan_penjualan_dataframe(ringkasan_data):
+    """
+    Membuat DataFrame ringkasan penjualan per bulan dari objek RingkasanPenjualanBulanan
+    """
+    return pd.DataFrame([
+        {
+            "Periode": f"{r.bulan:02d}/{r.tahun}",
+            "Jumlah Penjualan": r.jumlah_penjualan,
+            "Berat Awal (kg)": r.total_berat_awal,
+            "Berat Jual (kg)": r.total_berat_jual,
+            "Total Harga Jual": r.total_harga_jual,
+            "Total Harga Beli": r.total_harga_beli,
+            "Ongkos Kirim": r.total_ongkos_kirim,
+            "Keuntungan Bersih": r.total_keuntungan_bersih,
+            "Keuntungan Maks": r.keuntungan_maks,
+            "Keuntungan Min": r.keuntungan_min
+        } for r in ringkasan_data
+    ])
+
+
+def ringkasan_kpi(ringkasan_data):
+    """
+    Menggabungkan ringkasan bulanan menjadi KPI keseluruhan perusahaan
+
+    Returns:
+        dict: jumlah_penjualan, total_* dan keuntungan_maks/min (None jika belum ada penjualan)
+    """
+    return {
+        "jumlah_penjualan": sum(r.jumlah_penjualan for r in ringkasan_data),
+        "total_berat_awal": sum(r.total_berat_awal for r in ringkasan_data),
+        "total_berat_jual": sum(r.total_berat_jual for r in ringkasan_data),
+        "total_harga_jual": sum(r.total_harga_jual for r in ringkasan_data),
+        "total_harga_beli": sum(r.total_harga_beli for r in ringkasan_data),
+        "total_ongkos_kirim": sum(r.total_ongkos_kirim for r in ringkasan_data),
+        "total_keuntungan_bersih": sum(r.total_keuntungan_bersih for r in ringkasan_data),
+        "keuntungan_maks": max((r.keuntungan_maks for r in ringkasan_data), default=None),
+        "keuntungan_min": min((r.keuntungan_min for r in ringkasan_data), default=None),
+    }
+
+
+def konsolidasi_dataframe(konsolidasi_data):
+    """
+    Membuat DataFrame perbandingan antar perusahaan dari hasil get_konsolidasi_penjualan
+    """
+    return pd.DataFrame([
+        {
+            "Perusahaan": k["nama"],
+            "Jenis": k["jenis"],
+            "Jumlah Penjualan": k["jumlah_penjualan"],
+            "Berat Jual (kg)": k["total_berat_jual"],
+            "Keuntungan Bersih": k["total_keuntungan_bersih"],
+            "Keuntungan/kg": k["keuntungan_per_kg"],
+            "Keuntungan/km": k["keuntungan_per_km"],
+            "Rata-rata Susut (%)": k["rata_rata_susut"],
+            "Margin (%)": k["margin"]
+        } for k in konsolidasi_data
+    ], columns=["Perusahaan", "Jenis", "Jumlah Penjualan", "Berat Jual (kg)", "Keuntungan Bersih",
+                "Keuntungan/kg", "Keuntungan/km", "Rata-rata Susut (%)", "Margin (%)"])
+
+
+def strategi_dataframe(strategi_data):
+    """
+    Membuat DataFrame tab Strategi dan Risiko dari objek StrategiRisiko
+    """
+    return pd.DataFrame([
+        {
+            "No": i+1,
+            "Aspek": s.aspek,
+            "Risiko": s.risiko,
+            "Solusi": s.solusi
+        } for i, s in enumerate(strategi_data)
+    ])
+
+
+def anggaran_dataframe(anggaran_data):
+    """
+    Membuat DataFrame tab Realisasi Anggaran (diurutkan berdasarkan tanggal)
+    """
+    sorted_anggaran = sorted(anggaran_data, key=lambda x: x.tanggal)
+    return pd.DataFrame([
+        {
+            "ID": a.id,
+            "No": i+1,
+            "Tanggal": a.tanggal,
+            "Debet (In)": a.debet,
+            "Kredit (Out)": a.kredit,
+            "Saldo": a.saldo,
+            "Volume": a.volume,
+            "Keterangan": a.keterangan
+        } for i, a in enumerate(sorted_anggaran)
+    ])
+
+
+def harga_sicom_tabel_dataframe(harga_data):
+    """
+    Membuat DataFrame tabel harga SICOM x SIR 20 (terbaru di atas, sudah diformat)
+    """
+    return pd.DataFrame([
+        {
+            "ID": h.id,
+            "Tanggal": h.tanggal.strftime("%d/%m/%Y"),
+            "Harga Rupiah": format_currency(h.harga_rupiah),
+            "Harga Rp/100": f"Rp {h.harga_rupiah_100:.2f}",
+            "Harga SIR SGD": h.harga_sir_sgd,
+            "Harga SIR (Rp)": format_currency(h.harga_sir_rupiah)
+        } for h in sorted(harga_data, key=lambda x: x.tanggal, reverse=True)
+    ])
+
+
+def harga_sicom_visual_dataframe(harga_data):
+    """
+    Membuat DataFrame numerik harga SICOM x SIR 20 untuk visualisasi
+    """
+    return pd.DataFrame([
+        {
+            "Tanggal": h.tanggal,
+            "Harga Rupiah": h.harga_rupiah,
+            "Harga SIR SGD": h.harga_sir_sgd,
+            "Harga SIR (Rp)": h.harga_sir_rupiah,
+            "Tahun": h.tanggal.year
+        } for h in harga_data
+    ])
+
+
+def _format_harga_sicom_pdf(harga_data):
+    return [
+        {
+            'tanggal': item.tanggal,
+            'harga_rupiah': format_currency(item.harga_rupiah),
+            'harga_rupiah_100': format_currency(item.harga_rupiah_100),
+            'harga_sir_sgd': format_currency(item.harga_sir_sgd),
+            'harga_sir_rupiah': format_currency(item.harga_sir_rupiah)
+        } for item in harga_data
+    ]
+
+
+def build_pdf_data(perusahaan, penjualan_data, strategi_data, anggaran_data,
+                   harga_tertinggi=None, harga_terendah=None, ringkasan_data=None, ringkasan_selisih=None,
+                   risiko_harga=None, kpi_anggaran=None):
+    """
+    Menyusun dictionary data untuk generate_pdf_penjualan_karet
+
+    Args:
+        perusahaan: Objek Perusahaan
+        penjualan_data (list): Objek PenjualanKaret
+        strategi_data (list): Objek StrategiRisiko
+        anggaran_data (list): Objek RealisasiAnggaran
+        harga_tertinggi (list): Objek HargaSicomSir bertipe Tertinggi
+        harga_terendah (list): Objek HargaSicomSir bertipe Terendah
+        ringkasan_data (list): Objek RingkasanPenjualanBulanan untuk kesimpulan
+        ringkasan_selisih (dict): Hasil spread.ringkasan_spread (harga jual vs harga SIR 20)
+        risiko_harga (dict): Hasil monte_carlo.ringkasan_risiko untuk perusahaan ini
+        kpi_anggaran (DataFrame): Hasil kpi_anggaran.kpi_bulanan
+
+    Returns:
+        dict: Data laporan PDF
+    """
+    perusahaan_data = {
+        "nama": perusahaan.nama,
+        "jenis": perusahaan.jenis
+    }
+
+    # Data penjualan karet
+    penjualan_karet_data = []
+    for p in penjualan_data:
+        penjualan_karet_data.append({
+            "nama_perusahaan": perusahaan.nama,
+            "jarak": p.jarak,
+            "harga_jual": format_currency(p.harga_jual),
+            "susut": f"{p.susut}%",
+            "harga_beli": format_currency(p.harga_beli),
+            "berat_awal": f"{p.berat_awal} kg",
+            "berat_jual": f"{p.berat_jual} kg",
+            "total_harga_jual": format_currency(p.total_harga_jual),
+            "total_harga_beli": format_currency(p.total_harga_beli),
+            "keuntungan_kotor": format_currency(p.keuntungan_kotor),
+            "ongkos_kirim": format_currency(p.ongkos_kirim),
+            "keuntungan_bersih": format_currency(p.keuntungan_bersih),
+            "rekomendasi": p.rekomendasi
+        })
+
+    # Data strategi risiko
+    strategi_risiko_data = []
+    for s in strategi_data:
+        strategi_risiko_data.append({
+            "aspek": s.aspek,
+            "risiko": s.risiko,
+            "solusi": s.solusi
+        })
+
+    # Data realisasi anggaran
+    realisasi_anggaran_data = []
+    for a in sorted(anggaran_data, key=lambda x: x.tanggal):
+        realisasi_anggaran_data.append({
+            "tanggal": a.tanggal.strftime("%d/%m/%Y"),
+            "debet": format_currency(a.debet),
+            "kredit": format_currency(a.kredit),
+            "saldo": format_currency(a.saldo),
+            "volume": a.volume,
+            "volume_jumlah": a.volume_jumlah,
+            "volume_satuan": a.volume_satuan.value if a.volume_satuan else None,
+            "keterangan": a.keterangan
+        })
+
+    # Kesimpulan dari ringkasan bulanan (angka, bukan string mata uang yang di-parse ulang)
+    kesimpulan = ""
+    if penjualan_karet_data:
+        if ringkasan_data is not None:
+            kpi = ringkasan_kpi(ringkasan_data)
+        else:
+            profits = [p.keuntungan_bersih or 0 for p in penjualan_data]
+            kpi = {
+                "jumlah_penjualan": len(profits),
+                "total_keuntungan_bersih": sum(profits),
+                "keuntungan_maks": max(profits),
+                "keuntungan_min": min(profits),
+            }
+
+        max_profit_text = format_currency(kpi["keuntungan_maks"]) if kpi["keuntungan_maks"] is not None else "tidak diketahui"
+        min_profit_text = format_currency(kpi["keuntungan_min"]) if kpi["keuntungan_min"] is not None else "tidak diketahui"
+
+        kesimpulan = f"""
+        Berdasarkan analisis data penjualan karet, berikut adalah beberapa kesimpulan utama:
+        • Total keuntungan bersih dari {kpi["jumlah_penjualan"]} penjualan adalah {format_currency(kpi["total_keuntungan_bersih"])}.
+        • Profitabilitas tertinggi ditemukan pada penjualan dengan keuntungan bersih {max_profit_text}, terendah {min_profit_text}.
+        • Penjualan dengan jarak terjauh memiliki tingkat susut yang lebih tinggi.
+        • Rekomendasi: Fokus pada penjualan ke perusahaan dengan harga jual tinggi dan jarak yang tidak terlalu jauh untuk mengoptimalkan keuntungan.
+        """
+
+    # Selisih harga jual terhadap harga SIR 20 yang berlaku, sebagai baris tabel siap cetak
+    selisih_harga = []
+    if ringkasan_selisih and ringkasan_selisih["jumlah_penjualan"]:
+        selisih_harga = [
+            ["Penjualan dengan harga pasar", f"{ringkasan_selisih['jumlah_penjualan']} (tanpa harga pasar: {ringkasan_selisih['jumlah_tanpa_harga']})"],
+            ["Rata-rata selisih (Rp/kg)", format_currency(ringkasan_selisih["spread_rata_rata"])],
+            ["Selisih tertimbang berat jual (Rp/kg)", format_currency(ringkasan_selisih["spread_tertimbang"])],
+            ["Median selisih", f"{ringkasan_selisih['spread_persen_median']:.1f}%"],
+            ["Rentang P10 - P90", f"{ringkasan_selisih['spread_persen_p10']:.1f}% s/d {ringkasan_selisih['spread_persen_p90']:.1f}%"],
+            ["Selisih terendah / tertinggi", f"{ringkasan_selisih['spread_persen_min']:.1f}% / {ringkasan_selisih['spread_persen_maks']:.1f}%"],
+        ]
+
+    # Risiko harga SIR 20 dari simulasi Monte Carlo
+    risiko_harga_rows = []
+    if risiko_harga:
+        tingkat = format_percentage(risiko_harga["tingkat"])
+        risiko_harga_rows = [
+            ["Simulasi", f"{risiko_harga['jumlah_jalur']:,} jalur, {risiko_harga['horizon']} minggu, {risiko_harga['label_metode'].lower()}"],
+            ["Harga SIR 20 awal", f"{format_currency(risiko_harga['harga_awal'])} ({risiko_harga['tanggal_awal']:%d/%m/%Y})"],
+            ["Volatilitas mingguan", f"{risiko_harga['volatilitas'] * 100:.2f}% ({risiko_harga['jumlah_return']} return)"],
+            ["Ekspektasi keuntungan", format_currency(risiko_harga["ekspektasi_keuntungan"])],
+            ["Keuntungan P5 - P95", f"{format_currency(risiko_harga['keuntungan_p5'])} s/d {format_currency(risiko_harga['keuntungan_p95'])}"],
+            [f"VaR {tingkat}", format_currency(risiko_harga["var"])],
+            [f"CVaR {tingkat}", format_currency(risiko_harga["cvar"])],
+            ["Probabilitas rugi", format_percentage(risiko_harga["probabilitas_rugi"])],
+        ]
+
+    # KPI kas: ringkasan bulan terakhir dan tabel 12 bulan terakhir
+    kpi_anggaran_pdf = {"ringkasan": [], "bulanan": []}
+    kpi = kpi_terkini(kpi_anggaran) if kpi_anggaran is not None else None
+    if kpi:
+        kpi_anggaran_pdf["ringkasan"] = [
+            ["Periode", f"{kpi['jumlah_bulan']} bulan s/d {kpi['periode']:%m/%Y}"],
+            ["Saldo akhir", format_currency(kpi["saldo_akhir"])],
+            ["Rata-rata dana masuk / bulan", format_currency(kpi["pendapatan_rata"])],
+            ["Rata-rata pengeluaran / bulan", format_currency(kpi["pengeluaran_rata"])],
+            ["Burn rate bersih / bulan", format_currency(kpi["burn_rate"])],
+            ["Runway", format_runway(kpi)],
+            ["Modal kerja", format_currency(kpi["modal_kerja"])],
+        ]
+        kpi_anggaran_pdf["bulanan"] = [
+            [
+                f"{k.periode:%m/%Y}", format_currency(k.pendapatan), format_currency(k.pengeluaran),
+                format_currency(k.saldo_akhir), format_currency(k.burn_rate), format_currency(k.modal_kerja)
+            ]
+            for k in kpi_anggaran.tail(12).itertuples()
+        ]
+
+    return {
+        "perusahaan": perusahaan_data,
+        "penjualan_karet": penjualan_karet_data,
+        "strategi_risiko": strategi_risiko_data,
+        "realisasi_anggaran": realisasi_anggaran_data,
+        "harga_sicom_sir": {
+            "harga_tertinggi": _format_harga_sicom_pdf(harga_tertinggi or []),
+            "harga_terendah": _format_harga_sicom_pdf(harga_terendah or [])
+        },
+        "selisih_harga_pasar": selisih_harga,
+        "risiko_harga": risiko_harga_rows,
+        "kpi_anggaran": kpi_anggaran_pdf,
+        "kesimpulan": kesimpulan
+    }
@@ -1,27 +1,65 @@
 import os
 import re
 import streamlit as st
-from sqlalchemy import create_engine, Column, Integer, Float, String, Date, ForeignKey, text
+from sqlalchemy import create_engine, event, func, extract, select, Column, Integer, Float, String, Date, DateTime, ForeignKey, UniqueConstraint, Index, text, cast, literal_column, type_coerce, bindparam, inspect, Enum, and_, not_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.exc import IntegrityError
 import datetime
+import functools
+import json
+import types
+import pandas as pd
+from db_health import CircuitBreaker, DatabaseUnavailableError
+from db_metrics import instrument_pool, instrument_queries, checkout_timer
+from shared_cache import get_cache, table_namespaces
+from change_events import record_change, apply_change, start_change_listener, get_listener_status
+from kurs import kurs_asof, turunkan_harga, validasi_harga
+from volume import SatuanVolume, parse_volume, parse_volume_series, format_volume
 
 # Dapatkan connection string database dari environment variable
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
-# Buat engine untuk koneksi ke database dengan parameter koneksi untuk menangani SSL issue
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    connect_args={
-        'connect_timeout': 30,
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+# Konfigurasi pool koneksi, dapat diatur melalui environment variable
+POOL_CONFIG = {
+    "pool_size": _env_int("DB_POOL_SIZE", 5),
+    "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+    "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+    "pool_recycle": _env_int("DB_POOL_RECYCLE", 3600),
+}
+
+def _engine_kwargs(database_url):
+    """
+    Menyusun argumen create_engine sesuai dialek database
+    
+    Parameter keepalive hanya berlaku untuk PostgreSQL (psycopg2) untuk menangani
+    SSL issue; SQLite dipakai untuk pengembangan lokal dan benchmark.
+    """
+    kwargs = {"pool_pre_ping": True}
+    
+    if database_url and database_url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if ":memory:" not in database_url:
+            kwargs["pool_recycle"] = POOL_CONFIG["pool_recycle"]
+        return kwargs
+    
+    kwargs.update(POOL_CONFIG)
+    kwargs["connect_args"] = {
+        'connect_timeout': _env_int("DB_CONNECT_TIMEOUT", 30),
         'keepalives': 1,
-        'keepalives_idle': 30,
-        'keepalives_interval': 10,
-        'keepalives_count': 5
+        'keepalives_idle': _env_int("DB_KEEPALIVES_IDLE", 30),
+        'keepalives_interval': _env_int("DB_KEEPALIVES_INTERVAL", 10),
+        'keepalives_count': _env_int("DB_KEEPALIVES_COUNT", 5)
     }
-)
+    return kwargs
+
+# Buat engine untuk koneksi ke database dengan parameter koneksi untuk menangani SSL issue
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
+instrument_pool(engine)
+instrument_queries(engine)
 
 # Buat base class untuk model SQLAlchemy
 Base = declarative_base()
@@ -84,6 +122,8 @@ class RealisasiAnggaran(Base):
     kredit = Column(Float, default=0)  # uang keluar
     saldo = Column(Float, default=0)  # saldo akhir
     volume = Column(String)  # misalnya: "1 Lot", "323 kg"
+    volume_jumlah = Column(Float)  # jumlah terurai dari volume (ton dikonversi ke kg)
+    volume_satuan = Column(Enum(SatuanVolume, native_enum=False, length=10, values_callable=lambda e: [m.value for m in e]))
     keterangan = Column(String)
     
     # Relationship
@@ -104,51 +144,255 @@ class HargaSicomSir(Base):
     # Relationship
     perusahaan = relationship("Perusahaan", back_populates="harga_sicom_sir")
 
+class HargaSicomHarian(Base):
+    __tablename__ = 'harga_sicom_harian'
+    __table_args__ = (UniqueConstraint('perusahaan_id', 'tanggal'),)
+    
+    id = Column(Integer, primary_key=True)
+    perusahaan_id = Column(Integer, ForeignKey('perusahaan.id'), nullable=False)
+    tanggal = Column(Date, nullable=False)  # tanggal perdagangan
+    harga_rupiah = Column(Float, default=0)  # Harga Rupiah/kg
+    harga_rupiah_100 = Column(Float, default=0)  # Harga Rupiah/100kg
+    harga_sir_sgd = Column(Float, default=0)  # Harga SIR SGD
+    harga_sir_rupiah = Column(Float, default=0)  # Harga SIR (Rp)
+
+class KursSgdIdr(Base):
+    __tablename__ = 'kurs_sgd_idr'
+    
+    id = Column(Integer, primary_key=True)
+    tanggal = Column(Date, nullable=False, unique=True)  # berlaku mulai tanggal ini sampai kurs berikutnya
+    kurs = Column(Float, nullable=False)  # Rupiah per 1 SGD
+
+# Kolom harga yang dirata-rata per minggu pada view harga SICOM
+KOLOM_HARGA_SICOM = ("harga_rupiah", "harga_rupiah_100", "harga_sir_sgd", "harga_sir_rupiah")
+
+# Jumlah minggu minimum agar suatu bulan ikut dibandingkan saat memilih bulan tertinggi/terendah
+MIN_MINGGU_PER_BULAN = 2
+
+class RingkasanPenjualanBulanan(Base):
+    __tablename__ = 'ringkasan_penjualan_bulanan'
+    __table_args__ = (UniqueConstraint('perusahaan_id', 'tahun', 'bulan'),)
+    
+    id = Column(Integer, primary_key=True)
+    perusahaan_id = Column(Integer, ForeignKey('perusahaan.id'), nullable=False)
+    tahun = Column(Integer, nullable=False)
+    bulan = Column(Integer, nullable=False)
+    jumlah_penjualan = Column(Integer, default=0)
+    total_berat_awal = Column(Float, default=0)
+    total_berat_jual = Column(Float, default=0)
+    total_harga_jual = Column(Float, default=0)
+    total_harga_beli = Column(Float, default=0)
+    total_ongkos_kirim = Column(Float, default=0)
+    total_keuntungan_bersih = Column(Float, default=0)
+    keuntungan_maks = Column(Float)  # keuntungan bersih tertinggi satu penjualan
+    keuntungan_min = Column(Float)  # keuntungan bersih terendah satu penjualan
+
+# Kolom ringkasan -> kolom sumber di penjualan_karet
+KOLOM_RINGKASAN_PENJUALAN = {
+    "total_berat_awal": "berat_awal",
+    "total_berat_jual": "berat_jual",
+    "total_harga_jual": "total_harga_jual",
+    "total_harga_beli": "total_harga_beli",
+    "total_ongkos_kirim": "ongkos_kirim",
+    "total_keuntungan_bersih": "keuntungan_bersih",
+}
+
+class RingkasanAnggaranBulanan(Base):
+    __tablename__ = 'ringkasan_anggaran_bulanan'
+    __table_args__ = (UniqueConstraint('perusahaan_id', 'tahun', 'bulan'),)
+    
+    id = Column(Integer, primary_key=True)
+    perusahaan_id = Column(Integer, ForeignKey('perusahaan.id'), nullable=False)
+    tahun = Column(Integer, nullable=False)
+    bulan = Column(Integer, nullable=False)
+    jumlah_transaksi = Column(Integer, default=0)
+    total_debet = Column(Float, default=0)  # uang masuk
+    total_kredit = Column(Float, default=0)  # uang keluar
+
+class SkenarioSimulasi(Base):
+    __tablename__ = 'skenario_simulasi'
+    __table_args__ = (UniqueConstraint('perusahaan_id', 'nama'),)
+    
+    id = Column(Integer, primary_key=True)
+    perusahaan_id = Column(Integer, ForeignKey('perusahaan.id'), nullable=False)
+    nama = Column(String, nullable=False)
+    parameter = Column(String)  # JSON: berat_awal dan rentang {min, maks, jumlah} tiap parameter
+    dibuat_pada = Column(DateTime)
+
+class ChangeLog(Base):
+    __tablename__ = 'change_log'
+    
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    perusahaan_id = Column(Integer)  # None jika seluruh tabel berubah
+    created_at = Column(DateTime, index=True)
+
+# Index komposit untuk filter per perusahaan (dan rentang tanggal) serta
+# agregasi GROUP BY perusahaan_id pada tampilan konsolidasi
+INDEXES = [
+    Index('ix_penjualan_karet_perusahaan_tanggal', PenjualanKaret.perusahaan_id, PenjualanKaret.tanggal),
+    Index('ix_strategi_risiko_perusahaan', StrategiRisiko.perusahaan_id),
+    Index('ix_realisasi_anggaran_perusahaan_tanggal', RealisasiAnggaran.perusahaan_id, RealisasiAnggaran.tanggal),
+    Index('ix_harga_sicom_sir_perusahaan_tanggal', HargaSicomSir.perusahaan_id, HargaSicomSir.tanggal),
+]
+
 # Buat tabel di database jika belum ada
 Base.metadata.create_all(engine)
 
+# create_all tidak menambah index ke tabel yang sudah ada (database lama)
+for index in INDEXES:
+    index.create(engine, checkfirst=True)
+
+# create_all juga tidak menambah kolom baru ke tabel yang sudah ada
+def _tambah_kolom(table, kolom):
+    """
+    ALTER TABLE ... ADD COLUMN untuk kolom model yang belum ada di database lama
+    """
+    ada = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        for nama in kolom:
+            if nama not in ada:
+                tipe = table.c[nama].type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {nama} {tipe}"))
+                print(f"Kolom {table.name}.{nama} ditambahkan")
+
+_tambah_kolom(RealisasiAnggaran.__table__, ["volume_jumlah", "volume_satuan"])
+
 # Buat sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _publish_change(db, table, perusahaan_id=None):
+    """
+    Mencatat event perubahan di transaksi session ini; cache lokal diinvalidasi
+    setelah commit, worker lain menerimanya lewat listener change_events
+    """
+    change_id = record_change(db, ChangeLog.__table__, table, perusahaan_id)
+    db.info.setdefault("pending_changes", []).append((table, perusahaan_id, change_id))
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_pending_changes(session):
+    for table, perusahaan_id, change_id in session.info.pop("pending_changes", []):
+        apply_change(table, perusahaan_id, change_id)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending_changes(session):
+    session.info.pop("pending_changes", None)
+
+def _probe_database():
+    """
+    Probe koneksi yang dijalankan circuit breaker di thread latar belakang
+    """
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+# Circuit breaker bersama untuk semua session yang memakai engine ini
+db_breaker = CircuitBreaker(
+    _probe_database,
+    failure_threshold=int(os.environ.get("DB_BREAKER_THRESHOLD", "3")),
+    base_delay=float(os.environ.get("DB_BREAKER_BASE_DELAY", "1")),
+    max_delay=float(os.environ.get("DB_BREAKER_MAX_DELAY", "60"))
+)
+
+def get_pool_status():
+    """
+    Mendapatkan konfigurasi dan status pool koneksi untuk panel diagnostik admin
+    
+    Returns:
+        dict: Konfigurasi pool dan string status dari SQLAlchemy
+    """
+    return {
+        "config": dict(POOL_CONFIG),
+        "status": engine.pool.status()
+    }
+
+def get_db_health():
+    """
+    Mendapatkan status kesehatan koneksi database dari circuit breaker
+
+    Returns:
+        dict: Lihat CircuitBreaker.health()
+    """
+    return db_breaker.health()
+
 # Function untuk mendapatkan session database dengan penanganan error dan reconnect
-def get_db_session(max_retries=3, retry_delay=1):
+def get_db_session(max_retries=3, idempotent=True):
     """
-    Mendapatkan session database dengan mekanisme reconnect otomatis
+    Mendapatkan session database melalui circuit breaker
+    
+    Percobaan ulang dilakukan langsung tanpa jeda (pool_pre_ping sudah membuang
+    koneksi yang basi) dan hanya untuk pembacaan yang idempotent. Selama breaker
+    terbuka, fungsi ini langsung gagal; pemulihan diuji oleh probe latar belakang.
     
     Args:
-        max_retries (int): Jumlah maksimal percobaan koneksi ulang
-        retry_delay (int): Waktu tunggu dalam detik antara percobaan koneksi
+        max_retries (int): Jumlah maksimal percobaan koneksi untuk pembacaan
+        idempotent (bool): False untuk operasi tulis, yang hanya dicoba sekali
         
     Returns:
         Session: SQLAlchemy session yang aktif
+        
+    Raises:
+        DatabaseUnavailableError: Jika breaker sedang terbuka
     """
-    import time
+    attempts = max_retries if idempotent else 1
     
-    for attempt in range(max_retries):
+    for attempt in range(attempts):
+        if not db_breaker.allow():
+            raise DatabaseUnavailableError(
+                f"Database sedang tidak tersedia: {db_breaker.health()['last_error']}"
+            )
+        
         db = SessionLocal()
         try:
-            # Test koneksi dengan melakukan query sederhana
+            # Checkout koneksi dari pool (termasuk pre-ping) lalu test dengan query sederhana
+            with checkout_timer():
+                db.connection()
             db.execute(text("SELECT 1"))
+            db_breaker.record_success()
             return db
         except Exception as e:
             db.close()
+            db_breaker.record_failure(e)
             
-            # Berikan log error dan coba lagi jika belum melebihi max_retries
-            if attempt < max_retries - 1:
-                print(f"Error koneksi ke database (percobaan {attempt+1}/{max_retries}): {e}")
-                print(f"Mencoba koneksi ulang dalam {retry_delay} detik...")
-                time.sleep(retry_delay)
+            # Berikan log error dan coba lagi jika belum melebihi batas percobaan
+            if attempt < attempts - 1:
+                print(f"Error koneksi ke database (percobaan {attempt+1}/{attempts}): {e}")
             else:
-                print(f"Error koneksi ke database setelah {max_retries} percobaan: {e}")
+                print(f"Error koneksi ke database setelah {attempts} percobaan: {e}")
                 # Jika sudah mencapai batas maksimal percobaan, lempar exception
                 raise
 
+def cached_read(*tables, per_perusahaan=True):
+    """
+    Decorator untuk fungsi get_* yang hasilnya disimpan di cache bersama
+    
+    Argumen pertama fungsi (perusahaan_id) menentukan namespace invalidasi;
+    fungsi tulis mencatat event perubahan (_publish_change) sebelum commit.
+    
+    Args:
+        tables (str): Nama tabel sumber data
+        per_perusahaan (bool): False jika hasil mencakup semua perusahaan
+            (argumen pertama bukan perusahaan_id)
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            perusahaan_id = None
+            if per_perusahaan:
+                perusahaan_id = args[0] if args else kwargs.get("perusahaan_id")
+            key_parts = (args, tuple(sorted(kwargs.items())))
+            namespaces = [ns for table in tables for ns in table_namespaces(table, perusahaan_id)]
+            return get_cache().get_or_compute(
+                fn.__name__, key_parts, lambda: fn(*args, **kwargs), namespaces
+            )
+        return wrapper
+    return decorator
+
 # Function untuk menyimpan dan mendapatkan data penjualan karet
 def tambah_perusahaan(nama, jenis=None):
     """
     Menambahkan perusahaan baru ke database
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     try:
         new_company = Perusahaan(
             nama=nama,
@@ -156,6 +400,7 @@ def tambah_perusahaan(nama, jenis=None):
         )
         
         db.add(new_company)
+        _publish_change(db, "perusahaan")
         db.commit()
         db.refresh(new_company)
         
@@ -166,6 +411,7 @@ def tambah_perusahaan(nama, jenis=None):
     finally:
         db.close()
 
+@cached_read("perusahaan")
 def get_perusahaan():
     """
     Mendapatkan semua perusahaan
@@ -186,13 +432,411 @@ def get_perusahaan_by_id(perusahaan_id):
     finally:
         db.close()
 
+def _nilai_penjualan(penjualan):
+    values = {sumber: getattr(penjualan, sumber) or 0 for sumber in KOLOM_RINGKASAN_PENJUALAN.values()}
+    values["tanggal"] = penjualan.tanggal
+    return values
+
+def _rentang_bulan(tahun, bulan):
+    awal = datetime.date(tahun, bulan, 1)
+    akhir = datetime.date(tahun + 1, 1, 1) if bulan == 12 else datetime.date(tahun, bulan + 1, 1)
+    return awal, akhir
+
+def _kunci_ringkasan_bulanan(db, model, perusahaan_id, tahun, bulan, buat=True):
+    """
+    Mengambil dan mengunci baris ringkasan bulanan, membuatnya lebih dulu jika belum ada
+    
+    SELECT ... FOR UPDATE tidak mengunci baris yang belum ada, sehingga dua
+    transaksi yang sama-sama menyimpan data pertama suatu bulan bisa sama-sama
+    menambah baris dan salah satunya gagal di UniqueConstraint. Baris kosong
+    karena itu dibuat dengan INSERT ... ON CONFLICT DO NOTHING (menunggu
+    transaksi lain yang sedang membuat baris yang sama), baru lalu dikunci.
+    
+    Args:
+        db: Session yang sedang menulis
+        model: RingkasanPenjualanBulanan atau RingkasanAnggaranBulanan
+        perusahaan_id (int): ID perusahaan
+        tahun, bulan (int): Periode
+        buat (bool): Buat baris jika belum ada (False untuk penghapusan)
+    
+    Returns:
+        object: Baris ringkasan terkunci, atau None jika tidak ada dan buat=False
+    """
+    def _ambil():
+        return db.query(model).filter(
+            model.perusahaan_id == perusahaan_id,
+            model.tahun == tahun,
+            model.bulan == bulan
+        ).with_for_update().populate_existing().first()
+    
+    ringkasan = _ambil()
+    # Diulang sekali jika baris yang baru dibuat transaksi lain langsung terhapus olehnya
+    for _ in range(2):
+        if ringkasan is not None or not buat:
+            return ringkasan
+        nilai = {"perusahaan_id": perusahaan_id, "tahun": tahun, "bulan": bulan}
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            db.execute(insert(model).values(**nilai).on_conflict_do_nothing(
+                index_elements=["perusahaan_id", "tahun", "bulan"]
+            ))
+        else:
+            try:
+                with db.begin_nested():
+                    db.execute(model.__table__.insert().values(**nilai))
+            except IntegrityError:
+                pass
+        ringkasan = _ambil()
+    if ringkasan is None:
+        raise RuntimeError(f"Ringkasan {model.__tablename__} {tahun}-{bulan:02d} tidak bisa dibuat")
+    return ringkasan
+
+def _update_ringkasan_penjualan(db, perusahaan_id, tanggal, lama=None, baru=None):
+    """
+    Memperbarui ringkasan bulanan secara inkremental di dalam transaksi tulis
+    
+    Total dan jumlah penjualan diperbarui dengan selisih nilai lama dan baru.
+    Keuntungan maks/min hanya dihitung ulang dari baris bulan tersebut jika
+    nilai ekstrem yang lama ikut berubah atau terhapus.
+    
+    Args:
+        db: Session yang sedang menulis
+        perusahaan_id (int): ID perusahaan
+        tanggal (date): Tanggal penjualan
+        lama (dict): Nilai sebelum perubahan (None untuk data baru)
+        baru (dict): Nilai sesudah perubahan (None untuk penghapusan)
+    """
+    tahun, bulan = tanggal.year, tanggal.month
+    ringkasan = _kunci_ringkasan_bulanan(db, RingkasanPenjualanBulanan, perusahaan_id, tahun, bulan, buat=baru is not None)
+    if ringkasan is None:
+        return
+    
+    for kolom, sumber in KOLOM_RINGKASAN_PENJUALAN.items():
+        delta = (baru[sumber] if baru else 0) - (lama[sumber] if lama else 0)
+        setattr(ringkasan, kolom, (getattr(ringkasan, kolom) or 0) + delta)
+    ringkasan.jumlah_penjualan = (ringkasan.jumlah_penjualan or 0) + (1 if baru else 0) - (1 if lama else 0)
+    
+    if ringkasan.jumlah_penjualan <= 0:
+        db.delete(ringkasan)
+        return
+    
+    keuntungan_lama = lama["keuntungan_bersih"] if lama else None
+    if keuntungan_lama is not None and keuntungan_lama in (ringkasan.keuntungan_maks, ringkasan.keuntungan_min):
+        # Nilai ekstrem lama hilang, hitung ulang dari penjualan bulan ini saja
+        db.flush()
+        awal, akhir = _rentang_bulan(tahun, bulan)
+        ringkasan.keuntungan_maks, ringkasan.keuntungan_min = db.query(
+            func.max(PenjualanKaret.keuntungan_bersih), func.min(PenjualanKaret.keuntungan_bersih)
+        ).filter(
+            PenjualanKaret.perusahaan_id == perusahaan_id,
+            PenjualanKaret.tanggal >= awal,
+            PenjualanKaret.tanggal < akhir
+        ).one()
+    elif baru is not None:
+        keuntungan_baru = baru["keuntungan_bersih"]
+        if ringkasan.keuntungan_maks is None or keuntungan_baru > ringkasan.keuntungan_maks:
+            ringkasan.keuntungan_maks = keuntungan_baru
+        if ringkasan.keuntungan_min is None or keuntungan_baru < ringkasan.keuntungan_min:
+            ringkasan.keuntungan_min = keuntungan_baru
+
+def rebuild_ringkasan_penjualan(perusahaan_id=None):
+    """
+    Membangun ulang ringkasan penjualan bulanan dari seluruh data penjualan
+    dengan satu query INSERT ... SELECT ... GROUP BY (untuk backfill)
+    
+    Args:
+        perusahaan_id (int): Hanya perusahaan ini; None untuk semua perusahaan
+    """
+    tahun = extract('year', PenjualanKaret.tanggal)
+    bulan = extract('month', PenjualanKaret.tanggal)
+    query = select(
+        PenjualanKaret.perusahaan_id, tahun, bulan,
+        func.count(PenjualanKaret.id),
+        *[func.sum(getattr(PenjualanKaret, sumber)) for sumber in KOLOM_RINGKASAN_PENJUALAN.values()],
+        func.max(PenjualanKaret.keuntungan_bersih),
+        func.min(PenjualanKaret.keuntungan_bersih)
+    ).where(PenjualanKaret.tanggal.isnot(None)).group_by(PenjualanKaret.perusahaan_id, tahun, bulan)
+    
+    table = RingkasanPenjualanBulanan.__table__
+    hapus = table.delete()
+    if perusahaan_id:
+        query = query.where(PenjualanKaret.perusahaan_id == perusahaan_id)
+        hapus = hapus.where(table.c.perusahaan_id == perusahaan_id)
+    
+    kolom = ["perusahaan_id", "tahun", "bulan", "jumlah_penjualan", *KOLOM_RINGKASAN_PENJUALAN, "keuntungan_maks", "keuntungan_min"]
+    db = get_db_session(idempotent=False)
+    try:
+        db.execute(hapus)
+        db.execute(table.insert().from_select(kolom, query))
+        _publish_change(db, "penjualan_karet", perusahaan_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def init_ringkasan_penjualan():
+    """
+    Backfill ringkasan penjualan bulanan jika tabelnya masih kosong
+    """
+    db = get_db_session()
+    try:
+        kosong = db.query(RingkasanPenjualanBulanan.id).first() is None
+        ada_penjualan = db.query(PenjualanKaret.id).first() is not None
+    finally:
+        db.close()
+    
+    if kosong and ada_penjualan:
+        rebuild_ringkasan_penjualan()
+        print("Ringkasan penjualan bulanan dibangun dari data penjualan")
+
+def _update_ringkasan_anggaran(db, perusahaan_id, tanggal, lama=None, baru=None):
+    """
+    Memperbarui ringkasan anggaran bulanan secara inkremental di dalam transaksi tulis
+    
+    Args:
+        db: Session yang sedang menulis
+        perusahaan_id (int): ID perusahaan
+        tanggal (date): Tanggal transaksi
+        lama (tuple): (debet, kredit) sebelum perubahan (None untuk data baru)
+        baru (tuple): (debet, kredit) sesudah perubahan (None untuk penghapusan)
+    """
+    if tanggal is None:
+        return
+    ringkasan = _kunci_ringkasan_bulanan(
+        db, RingkasanAnggaranBulanan, perusahaan_id, tanggal.year, tanggal.month, buat=baru is not None
+    )
+    if ringkasan is None:
+        return
+    
+    debet_lama, kredit_lama = lama or (0, 0)
+    debet_baru, kredit_baru = baru or (0, 0)
+    ringkasan.total_debet = (ringkasan.total_debet or 0) + (debet_baru or 0) - (debet_lama or 0)
+    ringkasan.total_kredit = (ringkasan.total_kredit or 0) + (kredit_baru or 0) - (kredit_lama or 0)
+    ringkasan.jumlah_transaksi = (ringkasan.jumlah_transaksi or 0) + (1 if baru else 0) - (1 if lama else 0)
+    
+    if ringkasan.jumlah_transaksi <= 0:
+        db.delete(ringkasan)
+
+def rebuild_ringkasan_anggaran(perusahaan_id=None):
+    """
+    Membangun ulang ringkasan anggaran bulanan dari seluruh realisasi anggaran
+    dengan satu query INSERT ... SELECT ... GROUP BY (untuk backfill)
+    
+    Args:
+        perusahaan_id (int): Hanya perusahaan ini; None untuk semua perusahaan
+    """
+    tahun = extract('year', RealisasiAnggaran.tanggal)
+    bulan = extract('month', RealisasiAnggaran.tanggal)
+    query = select(
+        RealisasiAnggaran.perusahaan_id, tahun, bulan,
+        func.count(RealisasiAnggaran.id),
+        func.coalesce(func.sum(RealisasiAnggaran.debet), 0),
+        func.coalesce(func.sum(RealisasiAnggaran.kredit), 0)
+    ).where(RealisasiAnggaran.tanggal.isnot(None)).group_by(RealisasiAnggaran.perusahaan_id, tahun, bulan)
+    
+    table = RingkasanAnggaranBulanan.__table__
+    hapus = table.delete()
+    if perusahaan_id:
+        query = query.where(RealisasiAnggaran.perusahaan_id == perusahaan_id)
+        hapus = hapus.where(table.c.perusahaan_id == perusahaan_id)
+    
+    kolom = ["perusahaan_id", "tahun", "bulan", "jumlah_transaksi", "total_debet", "total_kredit"]
+    db = get_db_session(idempotent=False)
+    try:
+        db.execute(hapus)
+        db.execute(table.insert().from_select(kolom, query))
+        _publish_change(db, "realisasi_anggaran", perusahaan_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def init_ringkasan_anggaran():
+    """
+    Backfill ringkasan anggaran bulanan jika tabelnya masih kosong
+    """
+    db = get_db_session()
+    try:
+        kosong = db.query(RingkasanAnggaranBulanan.id).first() is None
+        ada_anggaran = db.query(RealisasiAnggaran.id).first() is not None
+    finally:
+        db.close()
+    
+    if kosong and ada_anggaran:
+        rebuild_ringkasan_anggaran()
+        print("Ringkasan anggaran bulanan dibangun dari data realisasi anggaran")
+
+@cached_read("realisasi_anggaran")
+def get_ringkasan_anggaran(perusahaan_id=None):
+    """
+    Mendapatkan ringkasan anggaran bulanan (total debet/kredit per bulan) diurutkan berdasarkan periode
+    """
+    db = get_db_session()
+    try:
+        query = db.query(RingkasanAnggaranBulanan)
+        
+        if perusahaan_id:
+            query = query.filter(RingkasanAnggaranBulanan.perusahaan_id == perusahaan_id)
+        
+        return query.order_by(RingkasanAnggaranBulanan.tahun, RingkasanAnggaranBulanan.bulan).all()
+    finally:
+        db.close()
+
+@cached_read("penjualan_karet")
+def get_ringkasan_penjualan(perusahaan_id=None):
+    """
+    Mendapatkan ringkasan penjualan bulanan diurutkan berdasarkan periode
+    """
+    db = get_db_session()
+    try:
+        query = db.query(RingkasanPenjualanBulanan)
+        
+        if perusahaan_id:
+            query = query.filter(RingkasanPenjualanBulanan.perusahaan_id == perusahaan_id)
+        
+        return query.order_by(RingkasanPenjualanBulanan.tahun, RingkasanPenjualanBulanan.bulan).all()
+    finally:
+        db.close()
+
+@cached_read("penjualan_karet", "perusahaan", per_perusahaan=False)
+def get_konsolidasi_penjualan(tanggal_awal=None, tanggal_akhir=None):
+    """
+    Mendapatkan perbandingan kinerja penjualan seluruh perusahaan
+    
+    Dihitung dengan satu query GROUP BY perusahaan_id di database (memakai
+    index ix_penjualan_karet_perusahaan_tanggal), bukan loop per perusahaan.
+    Rasio bernilai None jika pembaginya nol.
+    
+    Args:
+        tanggal_awal (date): Batas awal periode (inklusif), None untuk semua
+        tanggal_akhir (date): Batas akhir periode (inklusif), None untuk semua
+    
+    Returns:
+        list: dict per perusahaan dengan perusahaan_id, nama, jenis, jumlah_penjualan,
+            total_berat_jual, total_jarak, total_harga_jual, total_keuntungan_bersih,
+            keuntungan_per_kg, keuntungan_per_km, rata_rata_susut dan margin
+    """
+    total_berat_jual = func.sum(PenjualanKaret.berat_jual)
+    total_jarak = func.sum(PenjualanKaret.jarak)
+    total_harga_jual = func.sum(PenjualanKaret.total_harga_jual)
+    total_keuntungan = func.sum(PenjualanKaret.keuntungan_bersih)
+    
+    query = (
+        select(
+            Perusahaan.id.label("perusahaan_id"),
+            Perusahaan.nama.label("nama"),
+            Perusahaan.jenis.label("jenis"),
+            func.count(PenjualanKaret.id).label("jumlah_penjualan"),
+            total_berat_jual.label("total_berat_jual"),
+            total_jarak.label("total_jarak"),
+            total_harga_jual.label("total_harga_jual"),
+            total_keuntungan.label("total_keuntungan_bersih"),
+            (total_keuntungan / func.nullif(total_berat_jual, 0)).label("keuntungan_per_kg"),
+            (total_keuntungan / func.nullif(total_jarak, 0)).label("keuntungan_per_km"),
+            func.avg(PenjualanKaret.susut).label("rata_rata_susut"),
+            (total_keuntungan * 100.0 / func.nullif(total_harga_jual, 0)).label("margin"),
+        )
+        .join(Perusahaan, Perusahaan.id == PenjualanKaret.perusahaan_id)
+        .group_by(Perusahaan.id, Perusahaan.nama, Perusahaan.jenis)
+        .order_by(Perusahaan.nama)
+    )
+    if tanggal_awal:
+        query = query.where(PenjualanKaret.tanggal >= tanggal_awal)
+    if tanggal_akhir:
+        query = query.where(PenjualanKaret.tanggal <= tanggal_akhir)
+    
+    db = get_db_session()
+    try:
+        return [dict(row) for row in db.execute(query).mappings()]
+    finally:
+        db.close()
+
+@cached_read("penjualan_karet", "perusahaan", per_perusahaan=False)
+def get_kandidat_tujuan():
+    """
+    Mendapatkan data kandidat tujuan pengiriman (semua perusahaan yang pernah menerima penjualan)
+    
+    Satu query: harga jual dan jarak dari penjualan terakhir tiap perusahaan
+    (ROW_NUMBER per perusahaan_id) digabung dengan agregat histori susut dan
+    tarif ongkos kirim.
+    
+    Returns:
+        list: dict per perusahaan dengan perusahaan_id, nama, jenis, tanggal_terakhir,
+            harga_jual, jarak, susut_historis (persen, tertimbang berat),
+            tarif_kirim (Rp per kg per km, None jika jarak/berat nol) dan jumlah_penjualan
+    """
+    terakhir = select(
+        PenjualanKaret.perusahaan_id,
+        PenjualanKaret.tanggal,
+        PenjualanKaret.harga_jual,
+        PenjualanKaret.jarak,
+        func.row_number().over(
+            partition_by=PenjualanKaret.perusahaan_id,
+            order_by=(PenjualanKaret.tanggal.desc(), PenjualanKaret.id.desc())
+        ).label("urutan")
+    ).subquery()
+    
+    histori = select(
+        PenjualanKaret.perusahaan_id,
+        func.count(PenjualanKaret.id).label("jumlah_penjualan"),
+        (100.0 * (1 - func.sum(PenjualanKaret.berat_jual) / func.nullif(func.sum(PenjualanKaret.berat_awal), 0))).label("susut_historis"),
+        (func.sum(PenjualanKaret.ongkos_kirim) / func.nullif(func.sum(PenjualanKaret.jarak * PenjualanKaret.berat_awal), 0)).label("tarif_kirim"),
+    ).group_by(PenjualanKaret.perusahaan_id).subquery()
+    
+    query = (
+        select(
+            Perusahaan.id.label("perusahaan_id"),
+            Perusahaan.nama.label("nama"),
+            Perusahaan.jenis.label("jenis"),
+            terakhir.c.tanggal.label("tanggal_terakhir"),
+            terakhir.c.harga_jual,
+            terakhir.c.jarak,
+            histori.c.susut_historis,
+            histori.c.tarif_kirim,
+            histori.c.jumlah_penjualan,
+        )
+        .join(terakhir, (terakhir.c.perusahaan_id == Perusahaan.id) & (terakhir.c.urutan == 1))
+        .join(histori, histori.c.perusahaan_id == Perusahaan.id)
+        .order_by(Perusahaan.nama)
+    )
+    
+    db = get_db_session()
+    try:
+        return [dict(row) for row in db.execute(query).mappings()]
+    finally:
+        db.close()
+
+def get_data_susut():
+    """
+    Mendapatkan pasangan jarak dan susut seluruh penjualan untuk melatih model susut
+    
+    Returns:
+        list: tuple (perusahaan_id, jarak, susut)
+    """
+    db = get_db_session()
+    try:
+        return [tuple(row) for row in db.execute(
+            select(PenjualanKaret.perusahaan_id, PenjualanKaret.jarak, PenjualanKaret.susut)
+            .where(PenjualanKaret.jarak.isnot(None), PenjualanKaret.susut.isnot(None))
+        )]
+    finally:
+        db.close()
+
 def simpan_penjualan_karet(perusahaan_id, tanggal, jarak, harga_jual, susut, harga_beli, 
                           berat_awal, berat_jual, total_harga_jual, total_harga_beli, 
                           keuntungan_kotor, ongkos_kirim, keuntungan_bersih, rekomendasi):
     """
     Menyimpan data penjualan karet
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Cek apakah data sudah ada
     existing_data = db.query(PenjualanKaret).filter(
@@ -200,6 +844,9 @@ def simpan_penjualan_karet(perusahaan_id, tanggal, jarak, harga_jual, susut, har
         PenjualanKaret.tanggal == tanggal
     ).first()
     
+    # Nilai lama untuk pembaruan ringkasan bulanan
+    nilai_lama = _nilai_penjualan(existing_data) if existing_data else None
+    
     if existing_data:
         # Update data yang sudah ada
         existing_data.jarak = jarak
@@ -234,8 +881,11 @@ def simpan_penjualan_karet(perusahaan_id, tanggal, jarak, harga_jual, susut, har
         )
         db.add(new_data)
     
+    _update_ringkasan_penjualan(db, perusahaan_id, tanggal, nilai_lama, _nilai_penjualan(existing_data or new_data))
+    _publish_change(db, "penjualan_karet", perusahaan_id)
     db.commit()
 
+@cached_read("penjualan_karet")
 def get_penjualan_karet(perusahaan_id=None):
     """
     Mendapatkan data penjualan karet
@@ -271,7 +921,7 @@ def hapus_penjualan_karet(id, perusahaan_id):
     """
     Menghapus data penjualan karet berdasarkan ID
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     try:
         penjualan_karet = db.query(PenjualanKaret).filter(
             PenjualanKaret.id == id, 
@@ -281,7 +931,10 @@ def hapus_penjualan_karet(id, perusahaan_id):
         if not penjualan_karet:
             raise Exception("Data penjualan karet tidak ditemukan")
         
+        nilai_lama = _nilai_penjualan(penjualan_karet)
         db.delete(penjualan_karet)
+        _update_ringkasan_penjualan(db, perusahaan_id, penjualan_karet.tanggal, nilai_lama, None)
+        _publish_change(db, "penjualan_karet", perusahaan_id)
         db.commit()
         return True
     except Exception as e:
@@ -295,7 +948,7 @@ def simpan_strategi_risiko(perusahaan_id, aspek, risiko, solusi):
     """
     Menyimpan data strategi risiko
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Cek apakah data sudah ada
     existing_data = db.query(StrategiRisiko).filter(
@@ -317,8 +970,10 @@ def simpan_strategi_risiko(perusahaan_id, aspek, risiko, solusi):
         )
         db.add(new_data)
     
+    _publish_change(db, "strategi_risiko", perusahaan_id)
     db.commit()
 
+@cached_read("strategi_risiko")
 def get_strategi_risiko(perusahaan_id=None):
     """
     Mendapatkan data strategi risiko
@@ -332,11 +987,25 @@ def get_strategi_risiko(perusahaan_id=None):
     return query.all()
 
 # Function untuk menyimpan dan mendapatkan data realisasi anggaran
-def simpan_realisasi_anggaran(perusahaan_id, tanggal, debet, kredit, saldo, volume, keterangan):
+def simpan_realisasi_anggaran(perusahaan_id, tanggal, debet, kredit, saldo, volume, keterangan,
+                              volume_jumlah=None, volume_satuan=None):
     """
     Menyimpan data realisasi anggaran dan rekalkukasi saldo
+    
+    Volume dapat diberikan terstruktur (volume_jumlah dan volume_satuan); teks
+    volume lalu dibentuk dari keduanya jika kosong. Jika hanya teks yang
+    diberikan, jumlah dan satuan diurai dari teks tersebut.
     """
-    db = get_db_session()
+    if volume_jumlah is None:
+        volume_jumlah, volume_satuan = parse_volume(volume)
+        if volume and volume_satuan is None:
+            volume_satuan = SatuanVolume.LAINNYA
+    elif not volume:
+        volume = format_volume(volume_jumlah, volume_satuan)
+    if volume_satuan is not None:
+        volume_satuan = SatuanVolume(volume_satuan)
+    
+    db = get_db_session(idempotent=False)
     
     # Cek apakah data sudah ada
     existing_data = db.query(RealisasiAnggaran).filter(
@@ -361,10 +1030,13 @@ def simpan_realisasi_anggaran(perusahaan_id, tanggal, debet, kredit, saldo, volu
     
     if existing_data:
         # Update data yang sudah ada
+        _update_ringkasan_anggaran(db, perusahaan_id, tanggal, (existing_data.debet, existing_data.kredit), (debet, kredit))
         existing_data.debet = debet
         existing_data.kredit = kredit
         existing_data.saldo = new_saldo  # Gunakan saldo yang baru dihitung
         existing_data.volume = volume
+        existing_data.volume_jumlah = volume_jumlah
+        existing_data.volume_satuan = volume_satuan
     else:
         # Buat data baru
         new_data = RealisasiAnggaran(
@@ -374,9 +1046,12 @@ def simpan_realisasi_anggaran(perusahaan_id, tanggal, debet, kredit, saldo, volu
             kredit=kredit,
             saldo=new_saldo,  # Gunakan saldo yang baru dihitung
             volume=volume,
+            volume_jumlah=volume_jumlah,
+            volume_satuan=volume_satuan,
             keterangan=keterangan
         )
         db.add(new_data)
+        _update_ringkasan_anggaran(db, perusahaan_id, tanggal, None, (debet, kredit))
     
     # Perbarui saldo untuk semua transaksi setelah tanggal ini
     next_transactions = db.query(RealisasiAnggaran).filter(
@@ -389,10 +1064,12 @@ def simpan_realisasi_anggaran(perusahaan_id, tanggal, debet, kredit, saldo, volu
         running_saldo = running_saldo + tx.debet - tx.kredit
         tx.saldo = running_saldo
     
+    _publish_change(db, "realisasi_anggaran", perusahaan_id)
     db.commit()
     
     return new_saldo  # Mengembalikan saldo yang baru dihitung
 
+@cached_read("realisasi_anggaran")
 def get_realisasi_anggaran(perusahaan_id=None):
     """
     Mendapatkan data realisasi anggaran diurutkan berdasarkan tanggal
@@ -406,6 +1083,91 @@ def get_realisasi_anggaran(perusahaan_id=None):
     # Mengembalikan hasil yang sudah diurutkan berdasarkan tanggal
     return query.order_by(RealisasiAnggaran.tanggal).all()
 
+@cached_read("realisasi_anggaran")
+def get_ringkasan_volume(perusahaan_id=None):
+    """
+    Total volume dan biaya pengeluaran per keterangan dan satuan, dihitung dengan SUM di database
+    
+    Returns:
+        list: dict per (keterangan, volume_satuan) dengan jumlah_transaksi,
+            total_volume, total_kredit dan biaya_per_satuan (None jika total_volume nol
+            atau volume tidak terbaca); terurut menurut total_kredit menurun
+    """
+    total_volume = func.sum(RealisasiAnggaran.volume_jumlah)
+    total_kredit = func.sum(RealisasiAnggaran.kredit)
+    query = (
+        select(
+            RealisasiAnggaran.keterangan.label("keterangan"),
+            RealisasiAnggaran.volume_satuan.label("volume_satuan"),
+            func.count(RealisasiAnggaran.id).label("jumlah_transaksi"),
+            total_volume.label("total_volume"),
+            total_kredit.label("total_kredit"),
+            (total_kredit / func.nullif(total_volume, 0)).label("biaya_per_satuan"),
+        )
+        .where(RealisasiAnggaran.kredit > 0)
+        .group_by(RealisasiAnggaran.keterangan, RealisasiAnggaran.volume_satuan)
+        .order_by(total_kredit.desc())
+    )
+    if perusahaan_id:
+        query = query.where(RealisasiAnggaran.perusahaan_id == perusahaan_id)
+    
+    db = get_db_session()
+    try:
+        return [dict(row) for row in db.execute(query).mappings()]
+    finally:
+        db.close()
+
+def backfill_volume_realisasi_anggaran(ukuran_batch=10000):
+    """
+    Mengisi volume_jumlah dan volume_satuan dari teks volume untuk baris yang belum terurai
+    
+    Teks diurai sekaligus dengan parse_volume_series lalu ditulis dengan
+    UPDATE executemany per batch. Teks yang tidak terbaca diberi satuan
+    "lainnya" tanpa jumlah, agar tidak diurai ulang setiap start.
+    
+    Returns:
+        int: Jumlah baris yang diperbarui
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        baris = pd.DataFrame(db.execute(
+            select(RealisasiAnggaran.id, RealisasiAnggaran.perusahaan_id, RealisasiAnggaran.volume)
+            .where(RealisasiAnggaran.volume_satuan.is_(None), RealisasiAnggaran.volume.isnot(None))
+        ).all(), columns=["id", "perusahaan_id", "volume"])
+        if baris.empty:
+            return 0
+        
+        baris = baris.join(parse_volume_series(baris["volume"]))
+        baris["volume_satuan"] = baris["volume_satuan"].where(baris["volume_satuan"].notna(), SatuanVolume.LAINNYA.value)
+        update = RealisasiAnggaran.__table__.update().where(RealisasiAnggaran.id == bindparam("b_id"))
+        for awal in range(0, len(baris), ukuran_batch):
+            batch = baris.iloc[awal:awal + ukuran_batch]
+            db.execute(update, [
+                {
+                    "b_id": int(b.id),
+                    "volume_jumlah": None if pd.isna(b.volume_jumlah) else float(b.volume_jumlah),
+                    "volume_satuan": b.volume_satuan
+                }
+                for b in batch.itertuples()
+            ])
+        for pid in baris["perusahaan_id"].unique():
+            _publish_change(db, "realisasi_anggaran", int(pid))
+        db.commit()
+        return len(baris)
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def init_volume_realisasi_anggaran():
+    """
+    Backfill volume terstruktur untuk database lama
+    """
+    jumlah = backfill_volume_realisasi_anggaran()
+    if jumlah:
+        print(f"Volume terstruktur diisi untuk {jumlah} baris realisasi anggaran")
+
 def get_realisasi_anggaran_by_id(id):
     """
     Mendapatkan data realisasi anggaran berdasarkan ID
@@ -418,7 +1180,7 @@ def hapus_realisasi_anggaran(id, perusahaan_id):
     Menghapus data realisasi anggaran berdasarkan ID
     dan memperbarui saldo untuk entri berikutnya
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Cari data yang akan dihapus
     data_to_delete = db.query(RealisasiAnggaran).filter(RealisasiAnggaran.id == id).first()
@@ -431,6 +1193,7 @@ def hapus_realisasi_anggaran(id, perusahaan_id):
     
     # Hapus data
     db.delete(data_to_delete)
+    _update_ringkasan_anggaran(db, data_to_delete.perusahaan_id, tanggal, (data_to_delete.debet, data_to_delete.kredit), None)
     db.commit()
     
     # Perbarui saldo untuk semua transaksi setelah tanggal ini
@@ -444,13 +1207,99 @@ def hapus_realisasi_anggaran(id, perusahaan_id):
         running_saldo = running_saldo + tx.debet - tx.kredit
         tx.saldo = running_saldo
     
+    _publish_change(db, "realisasi_anggaran", perusahaan_id)
     db.commit()
     
-    return True
+    return True
+
+# Function untuk menyimpan dan mendapatkan skenario simulasi
+def simpan_skenario_simulasi(perusahaan_id, nama, parameter):
+    """
+    Menyimpan skenario simulasi bernama; skenario dengan nama yang sama ditimpa
+    
+    Args:
+        perusahaan_id (int): ID perusahaan
+        nama (str): Nama skenario
+        parameter (dict): Parameter simulasi (harus bisa diserialisasi ke JSON)
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        existing_data = db.query(SkenarioSimulasi).filter(
+            SkenarioSimulasi.perusahaan_id == perusahaan_id,
+            SkenarioSimulasi.nama == nama
+        ).first()
+        
+        if existing_data:
+            existing_data.parameter = json.dumps(parameter)
+            existing_data.dibuat_pada = datetime.datetime.now()
+        else:
+            db.add(SkenarioSimulasi(
+                perusahaan_id=perusahaan_id,
+                nama=nama,
+                parameter=json.dumps(parameter),
+                dibuat_pada=datetime.datetime.now()
+            ))
+        
+        _publish_change(db, "skenario_simulasi", perusahaan_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+@cached_read("skenario_simulasi")
+def get_skenario_simulasi(perusahaan_id=None):
+    """
+    Mendapatkan skenario simulasi tersimpan diurutkan berdasarkan nama
+    
+    Returns:
+        list: dict dengan id, nama, parameter (dict) dan dibuat_pada
+    """
+    db = get_db_session()
+    try:
+        query = db.query(SkenarioSimulasi)
+        
+        if perusahaan_id:
+            query = query.filter(SkenarioSimulasi.perusahaan_id == perusahaan_id)
+        
+        return [
+            {
+                "id": s.id,
+                "nama": s.nama,
+                "parameter": json.loads(s.parameter) if s.parameter else {},
+                "dibuat_pada": s.dibuat_pada
+            } for s in query.order_by(SkenarioSimulasi.nama).all()
+        ]
+    finally:
+        db.close()
+
+def hapus_skenario_simulasi(id, perusahaan_id):
+    """
+    Menghapus skenario simulasi berdasarkan ID
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        data_to_delete = db.query(SkenarioSimulasi).filter(
+            SkenarioSimulasi.id == id,
+            SkenarioSimulasi.perusahaan_id == perusahaan_id
+        ).first()
+        
+        if not data_to_delete:
+            raise Exception("Skenario simulasi tidak ditemukan")
+        
+        db.delete(data_to_delete)
+        _publish_change(db, "skenario_simulasi", perusahaan_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
 
 # Inisialisasi database dengan data penjualan karet
 def init_db_with_karet_data():
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Cek apakah ada perusahaan
     companies = db.query(Perusahaan).all()
@@ -616,6 +1465,8 @@ def init_db_with_karet_data():
         ]
         
         db.add_all(realisasi_anggaran)
+        for table in ("perusahaan", "penjualan_karet", "strategi_risiko", "realisasi_anggaran"):
+            _publish_change(db, table)
         db.commit()
         
         print("Database diinisialisasi dengan data penjualan karet")
@@ -629,7 +1480,7 @@ def fix_all_realisasi_anggaran_saldo():
     Memperbaiki semua saldo pada realisasi anggaran untuk memastikan
     kalkulasi berjalan dengan benar
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Dapatkan semua perusahaan
     companies = db.query(Perusahaan).all()
@@ -653,7 +1504,7 @@ def simpan_harga_sicom_sir(perusahaan_id, tanggal, harga_rupiah, harga_rupiah_10
     """
     Menyimpan data harga SICOM x SIR 20
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     
     # Cek apakah data sudah ada
     existing_data = db.query(HargaSicomSir).filter(
@@ -681,8 +1532,10 @@ def simpan_harga_sicom_sir(perusahaan_id, tanggal, harga_rupiah, harga_rupiah_10
         )
         db.add(new_data)
     
+    _publish_change(db, "harga_sicom_sir", perusahaan_id)
     db.commit()
 
+@cached_read("harga_sicom_sir")
 def get_harga_sicom_sir(perusahaan_id=None, tipe_data=None):
     """
     Mendapatkan data harga SICOM x SIR 20
@@ -721,7 +1574,7 @@ def hapus_harga_sicom_sir(id, perusahaan_id):
     """
     Menghapus data harga SICOM x SIR 20 berdasarkan ID
     """
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     try:
         harga_sicom_sir = db.query(HargaSicomSir).filter(
             HargaSicomSir.id == id, 
@@ -732,6 +1585,339 @@ def hapus_harga_sicom_sir(id, perusahaan_id):
             raise Exception("Data harga SICOM x SIR 20 tidak ditemukan")
         
         db.delete(harga_sicom_sir)
+        _publish_change(db, "harga_sicom_sir", perusahaan_id)
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+# Function untuk harga SICOM harian dan view Tertinggi/Terendah di atasnya
+def _minggu_harga(kolom_tanggal):
+    """
+    Ekspresi SQL minggu perdagangan sesuai dialek database
+    
+    Minggu Senin-Minggu diberi label tanggal hari Minggu (seperti data SICOM
+    yang diinput manual). Minggu dianggap milik bulan hari Kamisnya, yaitu
+    bulan yang memuat sebagian besar harinya.
+    
+    Returns:
+        tuple: (ekspresi tanggal Minggu, ekspresi tanggal Kamis)
+    """
+    if engine.dialect.name == "postgresql":
+        senin = func.date_trunc('week', kolom_tanggal)
+        minggu = cast(senin + literal_column("INTERVAL '6 days'"), Date)
+        kamis = cast(senin + literal_column("INTERVAL '3 days'"), Date)
+    else:
+        minggu = type_coerce(func.date(kolom_tanggal, 'weekday 0'), Date)
+        kamis = type_coerce(func.date(kolom_tanggal, 'weekday 0', '-3 days'), Date)
+    return minggu, kamis
+
+def _harga_mingguan(perusahaan_id=None):
+    """
+    CTE rata-rata harga per minggu perdagangan dari tabel harga_sicom_harian
+    """
+    minggu, kamis = _minggu_harga(HargaSicomHarian.tanggal)
+    query = select(
+        HargaSicomHarian.perusahaan_id.label("perusahaan_id"),
+        minggu.label("tanggal"),
+        cast(extract('year', kamis), Integer).label("tahun"),
+        cast(extract('month', kamis), Integer).label("bulan"),
+        func.max(HargaSicomHarian.id).label("id"),
+        func.count(HargaSicomHarian.id).label("jumlah_hari"),
+        *[func.avg(getattr(HargaSicomHarian, kolom)).label(kolom) for kolom in KOLOM_HARGA_SICOM]
+    ).group_by(HargaSicomHarian.perusahaan_id, minggu, cast(extract('year', kamis), Integer), cast(extract('month', kamis), Integer))
+    
+    if perusahaan_id:
+        query = query.where(HargaSicomHarian.perusahaan_id == perusahaan_id)
+    
+    return query.cte("harga_mingguan")
+
+def _validasi_kolom_harga(kolom):
+    if kolom not in KOLOM_HARGA_SICOM:
+        raise ValueError(f"Kolom harga tidak dikenal: {kolom}")
+    return kolom
+
+def simpan_harga_sicom_harian(perusahaan_id, tanggal, harga_rupiah=None, harga_rupiah_100=None, harga_sir_sgd=0, harga_sir_rupiah=None):
+    """
+    Menyimpan harga SICOM x SIR 20 satu tanggal perdagangan (menimpa jika tanggal sudah ada)
+    
+    Harga Rupiah diturunkan dari harga SIR SGD dan kurs SGD/IDR. Jika
+    harga_rupiah (kurs) diisi, kurs itu juga disimpan untuk tanggal ini; jika
+    kosong dipakai kurs terakhir yang berlaku. harga_rupiah_100 dan
+    harga_sir_rupiah yang diberikan hanya dipakai jika belum ada kurs sama sekali.
+    
+    Returns:
+        dict: Harga yang disimpan (harga_rupiah, harga_rupiah_100, harga_sir_sgd, harga_sir_rupiah)
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        if harga_rupiah:
+            _simpan_kurs(db, tanggal, harga_rupiah)
+            kurs_berlaku = harga_rupiah
+        else:
+            kurs_berlaku = _kurs_pada(db, tanggal)
+        
+        if kurs_berlaku:
+            turunan = turunkan_harga(harga_sir_sgd or 0, kurs_berlaku)
+            harga_rupiah, harga_rupiah_100, harga_sir_rupiah = (
+                float(turunan[kolom]) for kolom in ("harga_rupiah", "harga_rupiah_100", "harga_sir_rupiah")
+            )
+        
+        existing_data = db.query(HargaSicomHarian).filter(
+            HargaSicomHarian.perusahaan_id == perusahaan_id,
+            HargaSicomHarian.tanggal == tanggal
+        ).first()
+        
+        if existing_data:
+            existing_data.harga_rupiah = harga_rupiah
+            existing_data.harga_rupiah_100 = harga_rupiah_100
+            existing_data.harga_sir_sgd = harga_sir_sgd
+            existing_data.harga_sir_rupiah = harga_sir_rupiah
+        else:
+            db.add(HargaSicomHarian(
+                perusahaan_id=perusahaan_id,
+                tanggal=tanggal,
+                harga_rupiah=harga_rupiah,
+                harga_rupiah_100=harga_rupiah_100,
+                harga_sir_sgd=harga_sir_sgd,
+                harga_sir_rupiah=harga_sir_rupiah
+            ))
+        
+        _publish_change(db, "harga_sicom_harian", perusahaan_id)
+        db.commit()
+        return {
+            "harga_rupiah": harga_rupiah,
+            "harga_rupiah_100": harga_rupiah_100,
+            "harga_sir_sgd": harga_sir_sgd,
+            "harga_sir_rupiah": harga_sir_rupiah
+        }
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+@cached_read("harga_sicom_harian")
+def get_harga_sicom_harian(perusahaan_id=None, tanggal_awal=None, tanggal_akhir=None):
+    """
+    Mendapatkan harga SICOM x SIR 20 harian diurutkan berdasarkan tanggal
+    """
+    db = get_db_session()
+    try:
+        query = db.query(HargaSicomHarian)
+        
+        if perusahaan_id:
+            query = query.filter(HargaSicomHarian.perusahaan_id == perusahaan_id)
+        if tanggal_awal:
+            query = query.filter(HargaSicomHarian.tanggal >= tanggal_awal)
+        if tanggal_akhir:
+            query = query.filter(HargaSicomHarian.tanggal <= tanggal_akhir)
+        
+        return query.order_by(HargaSicomHarian.tanggal).all()
+    finally:
+        db.close()
+
+@cached_read("harga_sicom_harian", per_perusahaan=False)
+def get_harga_pasar_harian():
+    """
+    Harga pasar SIR 20 (Rp/kg) per tanggal untuk as-of join dengan penjualan
+    
+    Returns:
+        list: Tuple (tanggal, harga_sir_rupiah) terurut; tanggal ganda dirata-rata
+    """
+    query = (
+        select(HargaSicomHarian.tanggal, func.avg(HargaSicomHarian.harga_sir_rupiah))
+        .where(HargaSicomHarian.harga_sir_rupiah > 0)
+        .group_by(HargaSicomHarian.tanggal)
+        .order_by(HargaSicomHarian.tanggal)
+    )
+    db = get_db_session()
+    try:
+        return [tuple(row) for row in db.execute(query).all()]
+    finally:
+        db.close()
+
+def _simpan_kurs(db, tanggal, kurs):
+    """
+    Upsert kurs SGD/IDR satu tanggal di dalam transaksi session db
+    """
+    existing_data = db.query(KursSgdIdr).filter(KursSgdIdr.tanggal == tanggal).first()
+    if existing_data:
+        existing_data.kurs = kurs
+    else:
+        db.add(KursSgdIdr(tanggal=tanggal, kurs=kurs))
+    _publish_change(db, "kurs_sgd_idr")
+
+def _kurs_pada(db, tanggal):
+    """
+    Kurs yang berlaku pada tanggal (as-of): kurs terakhir dengan tanggal <= tanggal tersebut
+    """
+    return db.execute(
+        select(KursSgdIdr.kurs).where(KursSgdIdr.tanggal <= tanggal).order_by(KursSgdIdr.tanggal.desc()).limit(1)
+    ).scalar()
+
+def simpan_kurs_sgd_idr(tanggal, kurs):
+    """
+    Menyimpan kurs SGD/IDR yang berlaku mulai tanggal (menimpa jika tanggal sudah ada)
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        _simpan_kurs(db, tanggal, kurs)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+@cached_read("kurs_sgd_idr", per_perusahaan=False)
+def get_kurs_sgd_idr(tanggal_awal=None, tanggal_akhir=None):
+    """
+    Mendapatkan kurs SGD/IDR diurutkan berdasarkan tanggal
+    
+    Jika tanggal_awal diberikan, kurs terakhir sebelum tanggal_awal ikut
+    dikembalikan karena kurs itulah yang berlaku pada awal rentang.
+    """
+    db = get_db_session()
+    try:
+        query = db.query(KursSgdIdr)
+        
+        if tanggal_awal:
+            awal_berlaku = select(func.max(KursSgdIdr.tanggal)).where(KursSgdIdr.tanggal <= tanggal_awal).scalar_subquery()
+            query = query.filter(KursSgdIdr.tanggal >= func.coalesce(awal_berlaku, tanggal_awal))
+        if tanggal_akhir:
+            query = query.filter(KursSgdIdr.tanggal <= tanggal_akhir)
+        
+        return query.order_by(KursSgdIdr.tanggal).all()
+    finally:
+        db.close()
+
+def hapus_kurs_sgd_idr(id):
+    """
+    Menghapus kurs SGD/IDR berdasarkan ID
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        kurs = db.query(KursSgdIdr).filter(KursSgdIdr.id == id).first()
+        if not kurs:
+            raise Exception("Data kurs SGD/IDR tidak ditemukan")
+        
+        db.delete(kurs)
+        _publish_change(db, "kurs_sgd_idr")
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def _kurs_dataframe(kurs_data):
+    return pd.DataFrame([(k.tanggal, k.kurs) for k in kurs_data], columns=["tanggal", "kurs"])
+
+def get_harga_rupiah_turunan(perusahaan_id=None, tanggal_awal=None, tanggal_akhir=None):
+    """
+    Harga Rupiah harian yang diturunkan dari harga SIR SGD dan kurs yang berlaku (vektor)
+    
+    Returns:
+        DataFrame: tanggal, harga_sir_sgd, kurs, harga_rupiah_100, harga_sir_rupiah
+    """
+    harga_data = get_harga_sicom_harian(perusahaan_id, tanggal_awal, tanggal_akhir)
+    kurs = _kurs_dataframe(get_kurs_sgd_idr(tanggal_awal, tanggal_akhir))
+    hasil = pd.DataFrame({
+        "tanggal": [h.tanggal for h in harga_data],
+        "harga_sir_sgd": pd.array([h.harga_sir_sgd for h in harga_data], dtype="Float64").astype(float),
+    })
+    hasil["kurs"] = kurs_asof(hasil["tanggal"], kurs["tanggal"], kurs["kurs"])
+    turunan = turunkan_harga(hasil["harga_sir_sgd"], hasil["kurs"])
+    hasil["harga_rupiah_100"] = turunan["harga_rupiah_100"]
+    hasil["harga_sir_rupiah"] = turunan["harga_sir_rupiah"]
+    return hasil
+
+def validasi_harga_sicom_harian(perusahaan_id=None, perbaiki=False):
+    """
+    Menghitung ulang harga Rupiah semua harga harian dari kurs dan menandai yang tidak cocok
+    
+    Data harga dan kurs dibaca dengan dua query, dibandingkan secara vektor
+    (kurs.validasi_harga), lalu jika perbaiki=True semua baris yang tidak
+    cocok diperbarui dengan satu UPDATE executemany.
+    
+    Args:
+        perusahaan_id (int): Batasi ke satu perusahaan; None = semua
+        perbaiki (bool): Timpa harga Rupiah yang tidak cocok dengan nilai turunan
+    
+    Returns:
+        DataFrame: Baris berstatus "tidak_cocok" atau "tanpa_kurs" (lihat kurs.validasi_harga)
+    """
+    kolom = ["id", "perusahaan_id", "tanggal", *KOLOM_HARGA_SICOM]
+    query = select(*[getattr(HargaSicomHarian, k) for k in kolom])
+    if perusahaan_id:
+        query = query.where(HargaSicomHarian.perusahaan_id == perusahaan_id)
+    
+    db = get_db_session(idempotent=not perbaiki)
+    try:
+        harga = pd.DataFrame(db.execute(query).all(), columns=kolom)
+        kurs = pd.DataFrame(db.execute(select(KursSgdIdr.tanggal, KursSgdIdr.kurs)).all(), columns=["tanggal", "kurs"])
+        for k in KOLOM_HARGA_SICOM:
+            harga[k] = pd.to_numeric(harga[k], errors="coerce")
+        
+        hasil = validasi_harga(harga, kurs)
+        bermasalah = hasil[hasil["status"] != "cocok"].reset_index(drop=True)
+        tidak_cocok = bermasalah[bermasalah["status"] == "tidak_cocok"]
+        print(f"Validasi harga SICOM: {len(hasil)} baris, {len(tidak_cocok)} tidak cocok, "
+              f"{int((bermasalah['status'] == 'tanpa_kurs').sum())} tanpa kurs")
+        
+        if perbaiki and not tidak_cocok.empty:
+            db.execute(
+                HargaSicomHarian.__table__.update().where(HargaSicomHarian.id == bindparam("b_id")),
+                [
+                    {
+                        "b_id": int(row.id),
+                        "harga_rupiah": float(row.harga_rupiah_turunan),
+                        "harga_rupiah_100": float(row.harga_rupiah_100_turunan),
+                        "harga_sir_rupiah": float(row.harga_sir_rupiah_turunan)
+                    } for row in tidak_cocok.itertuples()
+                ]
+            )
+            for pid in tidak_cocok["perusahaan_id"].unique():
+                _publish_change(db, "harga_sicom_harian", int(pid))
+            db.commit()
+            print(f"{len(tidak_cocok)} harga SICOM diperbaiki dari kurs SGD/IDR")
+        return bermasalah
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def hapus_harga_sicom_minggu(id, perusahaan_id):
+    """
+    Menghapus semua harga harian pada minggu perdagangan yang sama dengan baris ID ini
+    
+    Dipakai oleh tabel view mingguan, yang ID barisnya adalah ID harga harian terakhir minggu itu.
+    """
+    db = get_db_session(idempotent=False)
+    try:
+        harga = db.query(HargaSicomHarian).filter(
+            HargaSicomHarian.id == id,
+            HargaSicomHarian.perusahaan_id == perusahaan_id
+        ).first()
+        
+        if not harga:
+            raise Exception("Data harga SICOM x SIR 20 tidak ditemukan")
+        
+        # Minggu Senin-Minggu yang memuat tanggal ini
+        senin = harga.tanggal - datetime.timedelta(days=harga.tanggal.weekday())
+        db.query(HargaSicomHarian).filter(
+            HargaSicomHarian.perusahaan_id == perusahaan_id,
+            HargaSicomHarian.tanggal >= senin,
+            HargaSicomHarian.tanggal <= senin + datetime.timedelta(days=6)
+        ).delete(synchronize_session=False)
+        
+        _publish_change(db, "harga_sicom_harian", perusahaan_id)
         db.commit()
         return True
     except Exception as e:
@@ -740,12 +1926,225 @@ def hapus_harga_sicom_sir(id, perusahaan_id):
     finally:
         db.close()
 
+@cached_read("harga_sicom_harian")
+def get_bulan_ekstrem(perusahaan_id=None, tipe_data="Tertinggi", jumlah_tahun=3, kolom="harga_sir_rupiah"):
+    """
+    Mencari bulan kalender dengan rata-rata harga tertinggi/terendah selama beberapa tahun terakhir
+    
+    Returns:
+        int: Bulan (1-12), atau None jika belum ada data
+    """
+    kolom = _validasi_kolom_harga(kolom)
+    mingguan = _harga_mingguan(perusahaan_id)
+    tahun_awal = select(func.max(mingguan.c.tahun) - (jumlah_tahun - 1)).scalar_subquery()
+    
+    # Rata-rata per tahun-bulan; bulan yang hanya memuat satu minggu data diabaikan
+    bulanan = (
+        select(mingguan.c.tahun, mingguan.c.bulan, func.avg(mingguan.c[kolom]).label("rata_rata"))
+        .where(mingguan.c.tahun >= tahun_awal)
+        .group_by(mingguan.c.tahun, mingguan.c.bulan)
+        .having(func.count() >= MIN_MINGGU_PER_BULAN)
+        .subquery()
+    )
+    
+    rata_rata = func.avg(bulanan.c.rata_rata)
+    urutan = rata_rata.desc() if tipe_data == "Tertinggi" else rata_rata.asc()
+    query = (
+        select(
+            bulanan.c.bulan,
+            func.row_number().over(order_by=(urutan, bulanan.c.bulan)).label("peringkat")
+        )
+        .group_by(bulanan.c.bulan)
+        .subquery()
+    )
+    
+    db = get_db_session()
+    try:
+        bulan = db.execute(select(query.c.bulan).where(query.c.peringkat == 1)).scalar()
+        return int(bulan) if bulan is not None else None
+    finally:
+        db.close()
+
+@cached_read("harga_sicom_harian")
+def get_harga_sicom_view(perusahaan_id=None, tipe_data="Tertinggi", bulan=None, jumlah_tahun=3, kolom="harga_sir_rupiah"):
+    """
+    View mingguan "bulan yang sama selama beberapa tahun terakhir" dari harga harian
+    
+    Menggantikan baris Tertinggi/Terendah yang dulu dipilih manual: bulan
+    dengan rata-rata harga tertinggi (atau terendah) selama jumlah_tahun
+    terakhir dipilih otomatis kecuali bulan diberikan, lalu harga mingguan
+    bulan itu untuk setiap tahun dikembalikan.
+    
+    Returns:
+        list: Objek dengan atribut seperti HargaSicomSir (id, perusahaan_id, tanggal,
+            harga_*, tipe_data) ditambah tahun, bulan dan jumlah_hari
+    """
+    if bulan is None:
+        bulan = get_bulan_ekstrem(perusahaan_id, tipe_data, jumlah_tahun, kolom)
+        if bulan is None:
+            return []
+    
+    mingguan = _harga_mingguan(perusahaan_id)
+    tahun_awal = select(func.max(mingguan.c.tahun) - (jumlah_tahun - 1)).scalar_subquery()
+    query = (
+        select(mingguan)
+        .where(mingguan.c.bulan == bulan, mingguan.c.tahun >= tahun_awal)
+        .order_by(mingguan.c.tanggal)
+    )
+    
+    db = get_db_session()
+    try:
+        return [
+            types.SimpleNamespace(**dict(row), tipe_data=tipe_data)
+            for row in db.execute(query).mappings()
+        ]
+    finally:
+        db.close()
+
+@cached_read("harga_sicom_harian")
+def get_minggu_ekstrem(perusahaan_id=None, tahun=None, kolom="harga_sir_rupiah"):
+    """
+    Minggu dengan harga tertinggi dan terendah di setiap bulan (ROW_NUMBER per tahun-bulan)
+    
+    Returns:
+        list: dict per bulan dengan tahun, bulan, minggu_tertinggi, harga_tertinggi,
+            minggu_terendah, harga_terendah
+    """
+    kolom = _validasi_kolom_harga(kolom)
+    mingguan = _harga_mingguan(perusahaan_id)
+    partisi = (mingguan.c.perusahaan_id, mingguan.c.tahun, mingguan.c.bulan)
+    peringkat = select(
+        mingguan.c.tahun,
+        mingguan.c.bulan,
+        mingguan.c.tanggal,
+        mingguan.c[kolom].label("harga"),
+        func.row_number().over(partition_by=partisi, order_by=(mingguan.c[kolom].desc(), mingguan.c.tanggal)).label("urutan_tinggi"),
+        func.row_number().over(partition_by=partisi, order_by=(mingguan.c[kolom].asc(), mingguan.c.tanggal)).label("urutan_rendah"),
+    )
+    if tahun:
+        peringkat = peringkat.where(mingguan.c.tahun == tahun)
+    peringkat = peringkat.subquery()
+    
+    tinggi = select(peringkat).where(peringkat.c.urutan_tinggi == 1).subquery()
+    rendah = select(peringkat).where(peringkat.c.urutan_rendah == 1).subquery()
+    query = (
+        select(
+            tinggi.c.tahun,
+            tinggi.c.bulan,
+            tinggi.c.tanggal.label("minggu_tertinggi"),
+            tinggi.c.harga.label("harga_tertinggi"),
+            rendah.c.tanggal.label("minggu_terendah"),
+            rendah.c.harga.label("harga_terendah"),
+        )
+        .join(rendah, (rendah.c.tahun == tinggi.c.tahun) & (rendah.c.bulan == tinggi.c.bulan))
+        .order_by(tinggi.c.tahun, tinggi.c.bulan)
+    )
+    
+    db = get_db_session()
+    try:
+        return [dict(row) for row in db.execute(query).mappings()]
+    finally:
+        db.close()
+
+def init_harga_sicom_harian():
+    """
+    Backfill harga harian dari baris harga_sicom_sir lama jika tabel harian masih kosong
+    """
+    db = get_db_session()
+    try:
+        kosong = db.query(HargaSicomHarian.id).first() is None
+        ada_lama = db.query(HargaSicomSir.id).first() is not None
+    finally:
+        db.close()
+    
+    if not (kosong and ada_lama):
+        return
+    
+    # Satu baris per perusahaan dan tanggal; tanggal ganda (Tertinggi dan Terendah) dirata-rata
+    query = select(
+        HargaSicomSir.perusahaan_id,
+        HargaSicomSir.tanggal,
+        *[func.avg(getattr(HargaSicomSir, kolom)) for kolom in KOLOM_HARGA_SICOM]
+    ).where(HargaSicomSir.tanggal.isnot(None)).group_by(HargaSicomSir.perusahaan_id, HargaSicomSir.tanggal)
+    
+    db = get_db_session(idempotent=False)
+    try:
+        db.execute(HargaSicomHarian.__table__.insert().from_select(
+            ["perusahaan_id", "tanggal", *KOLOM_HARGA_SICOM], query
+        ))
+        _publish_change(db, "harga_sicom_harian")
+        db.commit()
+        print("Harga SICOM harian diisi dari data harga SICOM x SIR 20")
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def init_kurs_sgd_idr():
+    """
+    Backfill kurs SGD/IDR dari kolom harga_rupiah harga harian jika tabel kurs masih kosong
+    """
+    db = get_db_session()
+    try:
+        kosong = db.query(KursSgdIdr.id).first() is None
+    finally:
+        db.close()
+    
+    if not kosong:
+        return
+    
+    # Satu kurs per tanggal; perusahaan berbeda pada tanggal sama dirata-rata
+    query = select(
+        HargaSicomHarian.tanggal,
+        func.avg(HargaSicomHarian.harga_rupiah)
+    ).where(HargaSicomHarian.harga_rupiah > 0).group_by(HargaSicomHarian.tanggal)
+    
+    db = get_db_session(idempotent=False)
+    try:
+        jumlah = db.execute(KursSgdIdr.__table__.insert().from_select(["tanggal", "kurs"], query)).rowcount
+        if jumlah:
+            _publish_change(db, "kurs_sgd_idr")
+        db.commit()
+        if jumlah:
+            print(f"Kurs SGD/IDR diisi dari {jumlah} tanggal harga SICOM harian")
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def cek_backfill_startup():
+    """
+    Memeriksa dalam satu query backfill startup mana yang masih diperlukan
+    
+    Pada database yang sudah terisi semuanya bernilai False, sehingga start
+    biasa cukup satu round trip, bukan satu session per fungsi init_*.
+    
+    Returns:
+        dict: ringkasan_penjualan, ringkasan_anggaran, volume_realisasi_anggaran,
+            harga_sicom_harian, kurs_sgd_idr -> bool
+    """
+    ada = lambda kolom, *kondisi: select(kolom).where(*kondisi).exists()
+    query = select(
+        and_(not_(ada(RingkasanPenjualanBulanan.id)), ada(PenjualanKaret.id)).label("ringkasan_penjualan"),
+        and_(not_(ada(RingkasanAnggaranBulanan.id)), ada(RealisasiAnggaran.id)).label("ringkasan_anggaran"),
+        ada(RealisasiAnggaran.id, RealisasiAnggaran.volume_satuan.is_(None), RealisasiAnggaran.volume.isnot(None)).label("volume_realisasi_anggaran"),
+        and_(not_(ada(HargaSicomHarian.id)), ada(HargaSicomSir.id)).label("harga_sicom_harian"),
+        not_(ada(KursSgdIdr.id)).label("kurs_sgd_idr"),
+    )
+    db = get_db_session()
+    try:
+        return {nama: bool(nilai) for nama, nilai in db.execute(query).mappings().one().items()}
+    finally:
+        db.close()
+
 def init_harga_sicom_sir_data():
     """
     Inisialisasi data harga SICOM x SIR 20 dari contoh
     """
     # ID perusahaan default (SICOM)
-    db = get_db_session()
+    db = get_db_session(idempotent=False)
     sicom_perusahaan = db.query(Perusahaan).filter(Perusahaan.nama == "SICOM").first()
     
     if not sicom_perusahaan:
@@ -854,6 +2253,8 @@ def init_harga_sicom_sir_data():
     # Simpan data
     db.add_all(harga_tertinggi_data)
     db.add_all(harga_terendah_data)
+    _publish_change(db, "perusahaan")
+    _publish_change(db, "harga_sicom_sir")
     db.commit()
     
     return sicom_perusahaan.id
@@ -866,6 +2267,22 @@ try:
     # Jalankan inisialisasi data SICOM SIR
     sicom_id = init_harga_sicom_sir_data()
     print(f"Inisialisasi data SICOM SIR berhasil dengan ID: {sicom_id}")
+    # Backfill untuk database lama; hanya yang masih diperlukan yang dijalankan
+    backfill = cek_backfill_startup()
+    if backfill["ringkasan_penjualan"]:
+        init_ringkasan_penjualan()
+    if backfill["ringkasan_anggaran"]:
+        init_ringkasan_anggaran()
+    if backfill["volume_realisasi_anggaran"]:
+        init_volume_realisasi_anggaran()
+    # Backfill harga SICOM harian dari baris Tertinggi/Terendah lama; kurs diturunkan dari harga harian
+    if backfill["harga_sicom_harian"]:
+        init_harga_sicom_harian()
+    if backfill["kurs_sgd_idr"] or backfill["harga_sicom_harian"]:
+        init_kurs_sgd_idr()
 except Exception as e:
     print(f"Error saat inisialisasi database: {e}")
-    default_perusahaan_id = None
\ No newline at end of file
+    default_perusahaan_id = None
+
+# Listener event perubahan: menginvalidasi cache worker ini saat worker lain menulis
+change_listener = start_change_listener(engine, ChangeLog.__table__)
\ No newline at end of file
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+
+class DatabaseUnavailableError(Exception):
+    """
+    Dilempar ketika circuit breaker sedang terbuka sehingga database
+    dianggap tidak tersedia dan permintaan langsung digagalkan.
+    """
+    pass
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker bersama untuk engine database.
+
+    Status:
+        closed    - koneksi normal, semua permintaan diteruskan
+        open      - database dianggap mati, permintaan langsung gagal
+        half_open - probe latar belakang sedang menguji koneksi
+
+    Saat breaker terbuka, sebuah thread latar belakang menjalankan probe
+    dengan exponential backoff dan jitter sampai database kembali tersedia,
+    sehingga thread script Streamlit tidak pernah menunggu (time.sleep).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, probe, failure_threshold=3, base_delay=1.0, max_delay=60.0):
+        """
+        Args:
+            probe (callable): Fungsi tanpa argumen yang melempar exception jika database belum bisa diakses
+            failure_threshold (int): Jumlah kegagalan berturut-turut sebelum breaker terbuka
+            base_delay (float): Jeda awal (detik) antara probe
+            max_delay (float): Jeda maksimal (detik) antara probe
+        """
+        self._probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._last_error = None
+        self._opened_at = None
+        self._next_probe_at = None
+        self._outage_id = 0
+        self._probe_thread = None
+
+    def allow(self):
+        """
+        Mengembalikan True jika permintaan boleh diteruskan ke database
+        """
+        with self._lock:
+            return self._state == self.CLOSED
+
+    def record_success(self):
+        """
+        Mencatat koneksi yang berhasil dan mereset hitungan kegagalan
+        """
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state != self.CLOSED:
+                self._close()
+
+    def record_failure(self, error):
+        """
+        Mencatat koneksi yang gagal dan membuka breaker bila ambang terlampaui
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def health(self):
+        """
+        Mendapatkan status kesehatan database untuk ditampilkan di UI
+
+        Returns:
+            dict: state, outage_id, last_error, opened_at, next_probe_at, consecutive_failures
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "outage_id": self._outage_id,
+                "last_error": self._last_error,
+                "opened_at": self._opened_at,
+                "next_probe_at": self._next_probe_at,
+                "consecutive_failures": self._consecutive_failures,
+            }
+
+    def _open(self):
+        # Dipanggil dengan self._lock sudah dipegang
+        self._state = self.OPEN
+        self._opened_at = time.time()
+        self._outage_id += 1
+        print(f"Circuit breaker database terbuka setelah {self._consecutive_failures} kegagalan: {self._last_error}")
+
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop,
+                name="db-circuit-breaker-probe",
+                daemon=True
+            )
+            self._probe_thread.start()
+
+    def _close(self):
+        # Dipanggil dengan self._lock sudah dipegang
+        if self._opened_at is not None:
+            print(f"Koneksi database pulih setelah {time.time() - self._opened_at:.1f} detik")
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._next_probe_at = None
+
+    def _backoff_delay(self, attempt):
+        # Exponential backoff dengan "equal jitter": setengah tetap, setengah acak
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _probe_loop(self):
+        attempt = 0
+        while True:
+            delay = self._backoff_delay(attempt)
+            with self._lock:
+                if self._state == self.CLOSED:
+                    return
+                self._next_probe_at = time.time() + delay
+            time.sleep(delay)
+
+            with self._lock:
+                self._state = self.HALF_OPEN
+            try:
+                self._probe()
+            except Exception as e:
+                with self._lock:
+                    self._state = self.OPEN
+                    self._last_error = str(e)
+                attempt += 1
+                continue
+
+            with self._lock:
+                self._close()
+            return
@@ -0,0 +1,398 @@
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+from sqlalchemy import event
+
+# Bucket histogram default (detik), mengikuti bucket standar klien Prometheus
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """
+    Counter monoton sederhana yang aman dipakai dari banyak thread
+    """
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self._value}",
+        ]
+
+
+class Gauge(Counter):
+    """
+    Gauge yang bisa naik dan turun
+    """
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self._value}",
+        ]
+
+
+class Histogram:
+    """
+    Histogram kumulatif dengan bucket tetap, kompatibel dengan format Prometheus
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # bucket terakhir = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._sum / self._count if self._count else 0.0
+
+    def quantile(self, q):
+        """
+        Perkiraan kuantil dari batas atas bucket (cukup untuk panel diagnostik)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        if total == 0:
+            return 0.0
+        target = q * total
+        cumulative = 0
+        for upper, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            if cumulative >= target:
+                return upper
+        return float("inf")
+
+    def render(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for upper, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{upper}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{self.name}_sum {total_sum}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+# Registry metrik untuk proses ini (setiap worker Streamlit punya registry sendiri)
+pool_checkout_seconds = Histogram(
+    "karet_db_pool_checkout_seconds",
+    "Waktu tunggu checkout koneksi dari pool, termasuk pre-ping"
+)
+pool_connections_in_use = Gauge(
+    "karet_db_pool_connections_in_use",
+    "Jumlah koneksi yang sedang dipinjam dari pool"
+)
+pool_checkouts_total = Counter(
+    "karet_db_pool_checkouts_total",
+    "Jumlah total checkout koneksi dari pool"
+)
+pool_connects_total = Counter(
+    "karet_db_pool_connects_total",
+    "Jumlah koneksi DBAPI baru yang dibuka oleh pool"
+)
+pool_invalidations_total = Counter(
+    "karet_db_pool_invalidations_total",
+    "Jumlah koneksi yang diinvalidasi (misalnya karena putus atau gagal pre-ping)"
+)
+pool_reconnects_total = Counter(
+    "karet_db_pool_reconnects_total",
+    "Jumlah koneksi baru yang dibuka untuk menggantikan koneksi yang diinvalidasi"
+)
+
+METRICS = [
+    pool_checkout_seconds,
+    pool_connections_in_use,
+    pool_checkouts_total,
+    pool_connects_total,
+    pool_invalidations_total,
+    pool_reconnects_total,
+]
+
+_pending_reconnects = Gauge("_karet_pending_reconnects", "internal")
+
+
+def instrument_pool(engine):
+    """
+    Memasang listener event pool SQLAlchemy yang mengisi metrik di modul ini
+
+    Args:
+        engine: SQLAlchemy Engine yang akan diinstrumentasi
+    """
+    pool = engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_connects_total.inc()
+        if _pending_reconnects.value > 0:
+            _pending_reconnects.dec()
+            pool_reconnects_total.inc()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts_total.inc()
+        pool_connections_in_use.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_connections_in_use.dec()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_invalidations_total.inc()
+        _pending_reconnects.inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        pool_invalidations_total.inc()
+        _pending_reconnects.inc()
+
+
+query_seconds = Histogram(
+    "karet_db_query_seconds",
+    "Durasi eksekusi statement SQL"
+)
+slow_queries_total = Counter(
+    "karet_db_slow_queries_total",
+    "Jumlah statement SQL yang melewati ambang slow query"
+)
+
+METRICS.extend([query_seconds, slow_queries_total])
+
+# Ambang slow query dalam milidetik
+SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "500"))
+
+# Log slow query terakhir untuk proses ini
+slow_query_log = collections.deque(maxlen=int(os.environ.get("DB_SLOW_QUERY_LOG_SIZE", "50")))
+
+_DATABASE_MODULE = "database.py"
+_local = threading.local()
+
+
+class QueryLog:
+    """
+    Kumpulan statistik query untuk satu kali rerun script Streamlit
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.queries = []
+
+    def record(self, caller, statement, duration, rowcount):
+        self.queries.append({
+            "caller": caller,
+            "statement": statement,
+            "duration_ms": duration * 1000,
+            "rowcount": rowcount,
+        })
+
+    @property
+    def total_ms(self):
+        return sum(q["duration_ms"] for q in self.queries)
+
+    def summary(self):
+        """
+        Mengagregasi query per fungsi pemanggil di database.py
+
+        Returns:
+            list: dict per fungsi, diurutkan dari total durasi terbesar
+        """
+        per_caller = {}
+        for q in self.queries:
+            item = per_caller.setdefault(q["caller"], {
+                "Fungsi": q["caller"],
+                "Jumlah Query": 0,
+                "Total (ms)": 0.0,
+                "Maks (ms)": 0.0,
+                "Baris": 0,
+            })
+            item["Jumlah Query"] += 1
+            item["Total (ms)"] += q["duration_ms"]
+            item["Maks (ms)"] = max(item["Maks (ms)"], q["duration_ms"])
+            if q["rowcount"] is not None:
+                item["Baris"] += q["rowcount"]
+        return sorted(per_caller.values(), key=lambda x: x["Total (ms)"], reverse=True)
+
+
+def start_query_log():
+    """
+    Memulai pencatatan query untuk rerun yang sedang berjalan di thread ini
+
+    Returns:
+        QueryLog: Log baru yang akan diisi oleh hook cursor
+    """
+    _local.query_log = QueryLog()
+    return _local.query_log
+
+
+def _find_caller():
+    # Cari frame terluar di database.py agar query dikaitkan ke fungsi publiknya
+    frame = sys._getframe(2)
+    caller = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.endswith(_DATABASE_MODULE) and code.co_name != "<module>":
+            caller = code.co_name
+        frame = frame.f_back
+    return caller or "(luar database.py)"
+
+
+def _explain(conn, cursor, statement, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters or ())
+        return "\n".join(" ".join(str(col) for col in row) for row in explain_cursor.fetchall())
+    except Exception as e:
+        return f"(EXPLAIN gagal: {e})"
+    finally:
+        explain_cursor.close()
+
+
+def instrument_queries(engine):
+    """
+    Memasang hook before/after_cursor_execute untuk mencatat durasi setiap statement,
+    jumlah baris, fungsi pemanggil di database.py, serta log slow query dengan EXPLAIN
+
+    Statement yang gagal tidak memanggil after_cursor_execute, sehingga waktu
+    mulainya dibuang di hook handle_error agar conn.info tidak terus bertambah.
+
+    Args:
+        engine: SQLAlchemy Engine yang akan diinstrumentasi
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append((cursor, time.perf_counter()))
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        cursor = getattr(exception_context.execution_context, "cursor", None)
+        if conn is None or cursor is None:
+            return
+        query_start = conn.info.get("query_start")
+        # Hanya dibuang jika entri teratas milik cursor yang gagal (belum dipop oleh after_cursor_execute)
+        if query_start and query_start[-1][0] is cursor:
+            query_start.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()[1]
+        query_seconds.observe(duration)
+
+        rowcount = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        caller = _find_caller()
+
+        query_log = getattr(_local, "query_log", None)
+        if query_log is not None:
+            query_log.record(caller, statement, duration, rowcount)
+
+        if duration * 1000 >= SLOW_QUERY_MS:
+            slow_queries_total.inc()
+            plan = None
+            if not executemany and statement.lstrip().upper().startswith("SELECT"):
+                plan = _explain(conn, cursor, statement, parameters)
+            slow_query_log.append({
+                "waktu": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "fungsi": caller,
+                "durasi_ms": round(duration * 1000, 2),
+                "statement": statement,
+                "plan": plan,
+            })
+            print(f"Slow query ({duration * 1000:.1f} ms) di {caller}: {statement}")
+            if plan:
+                print(f"Rencana eksekusi:\n{plan}")
+
+
+class checkout_timer:
+    """
+    Context manager untuk mengukur waktu checkout koneksi dari pool
+    """
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pool_checkout_seconds.observe(time.perf_counter() - self._start)
+        return False
+
+
+def get_pool_summary():
+    """
+    Mendapatkan ringkasan metrik pool untuk panel diagnostik
+
+    Returns:
+        dict: Nama metrik dan nilainya
+    """
+    return {
+        "Checkout (total)": pool_checkouts_total.value,
+        "Koneksi dipakai": pool_connections_in_use.value,
+        "Koneksi baru": pool_connects_total.value,
+        "Invalidasi": pool_invalidations_total.value,
+        "Reconnect": pool_reconnects_total.value,
+        "Checkout rata-rata (ms)": round(pool_checkout_seconds.mean * 1000, 2),
+        "Checkout p95 (ms, batas bucket)": pool_checkout_seconds.quantile(0.95) * 1000,
+    }
+
+
+def render_prometheus():
+    """
+    Mendapatkan semua metrik dalam format teks eksposisi Prometheus
+
+    Returns:
+        str: Teks metrik
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,101 +1,183 @@
+import numpy as np
+import pandas as pd
+
+def _as_array(value):
+    """
+    Convert a scalar, list, ndarray or Series to a float ndarray
+    """
+    return np.asarray(value, dtype=float)
+
+def _wrap(result, *inputs):
+    """
+    Return the result in the shape of the inputs
+
+    A float for scalar inputs, a Series (index of the first Series input) when
+    any input is a Series, otherwise an ndarray.
+    """
+    for value in inputs:
+        if isinstance(value, pd.Series):
+            return pd.Series(np.broadcast_to(result, value.shape), index=value.index, copy=True)
+    if np.ndim(result) == 0:
+        return float(result)
+    return result
+
+def _divide(numerator, denominator, when_zero):
+    """
+    numerator / denominator, with when_zero (broadcast) where denominator == 0
+    """
+    numerator, denominator = np.broadcast_arrays(_as_array(numerator), _as_array(denominator))
+    zero = denominator == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / np.where(zero, 1.0, denominator)
+    return np.where(zero, when_zero, ratio)
+
 def calculate_gross_margin(revenue, cogs):
     """
     Calculate gross margin percentage
-    
+
     Gross Margin = (Revenue - COGS) / Revenue
     """
-    if revenue == 0:
-        return 0
-    
-    return (revenue - cogs) / revenue
+    revenue_arr = _as_array(revenue)
+    return _wrap(_divide(revenue_arr - _as_array(cogs), revenue_arr, 0.0), revenue, cogs)
 
 def calculate_net_profit_margin(net_profit, revenue):
     """
     Calculate net profit margin percentage
-    
+
     Net Profit Margin = Net Profit / Revenue
     """
-    if revenue == 0:
-        return 0
-    
-    return net_profit / revenue
+    return _wrap(_divide(net_profit, revenue, 0.0), net_profit, revenue)
 
 def calculate_current_ratio(current_assets, current_liabilities):
     """
     Calculate current ratio
-    
+
     Current Ratio = Current Assets / Current Liabilities
+    (0 if both are zero, inf if only liabilities are zero)
     """
-    if current_liabilities == 0:
-        return 0 if current_assets == 0 else float('inf')
-    
-    return current_assets / current_liabilities
+    assets = _as_array(current_assets)
+    when_zero = np.where(assets == 0, 0.0, np.inf)
+    return _wrap(_divide(assets, current_liabilities, when_zero), current_assets, current_liabilities)
 
 def calculate_debt_to_equity(total_debt, total_equity):
     """
     Calculate debt-to-equity ratio
-    
+
     Debt-to-Equity Ratio = Total Debt / Total Equity
+    (inf if equity is zero and there is debt, otherwise 0)
     """
-    if total_equity == 0:
-        return float('inf') if total_debt > 0 else 0
-    
-    return total_debt / total_equity
+    debt = _as_array(total_debt)
+    when_zero = np.where(debt > 0, np.inf, 0.0)
+    return _wrap(_divide(debt, total_equity, when_zero), total_debt, total_equity)
 
 def calculate_burn_rate(cash_balance, monthly_expenses, monthly_revenue):
     """
     Calculate burn rate (negative cash flow rate)
-    
+
     Burn Rate = (Cash Balance) / (Monthly Expenses - Monthly Revenue)
-    Returns the number of months until cash runs out
-    """
-    net_burn = monthly_expenses - monthly_revenue
-    
-    if net_burn <= 0:  # Company is profitable, no burn
-        return 0
-    
-    if cash_balance <= 0:
-        return 0  # Already out of cash
-    
-    return cash_balance / net_burn
+    Returns the number of months until cash runs out; 0 when the company is
+    not burning cash or is already out of cash
+    """
+    cash, net_burn = np.broadcast_arrays(
+        _as_array(cash_balance), _as_array(monthly_expenses) - _as_array(monthly_revenue)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months = cash / np.where(net_burn == 0, 1.0, net_burn)
+    # Not burning (profitable) or already out of cash -> 0, checked in the same order as before
+    result = np.where(net_burn <= 0, 0.0, np.where(cash <= 0, 0.0, months))
+    return _wrap(result, cash_balance, monthly_expenses, monthly_revenue)
 
 def calculate_ltv_cac_ratio(ltv, cac):
     """
     Calculate LTV to CAC ratio
-    
+
     LTV:CAC Ratio = LTV / CAC
     """
-    if cac == 0:
-        return 0
-    
-    return ltv / cac
+    return _wrap(_divide(ltv, cac, 0.0), ltv, cac)
 
 def calculate_break_even_point(fixed_costs, contribution_margin_ratio):
     """
     Calculate break-even point in revenue
-    
+
     Break-even Revenue = Fixed Costs / Contribution Margin Ratio
     """
-    if contribution_margin_ratio == 0:
-        return float('inf')
-    
-    return fixed_costs / contribution_margin_ratio
+    return _wrap(_divide(fixed_costs, contribution_margin_ratio, np.inf), fixed_costs, contribution_margin_ratio)
 
 def calculate_working_capital(current_assets, current_liabilities):
     """
     Calculate working capital
-    
+
     Working Capital = Current Assets - Current Liabilities
     """
-    return current_assets - current_liabilities
+    return _wrap(_as_array(current_assets) - _as_array(current_liabilities), current_assets, current_liabilities)
 
 def calculate_roi(net_profit, investment):
     """
     Calculate Return on Investment (ROI)
-    
+
     ROI = Net Profit / Investment
     """
-    if investment == 0:
-        return 0
-    
-    return net_profit / investment
+    return _wrap(_divide(net_profit, investment, 0.0), net_profit, investment)
+
+# Ratio name -> (function, input names); calculate_ratios computes every ratio whose inputs are available
+RATIOS = {
+    "gross_margin": (calculate_gross_margin, ("revenue", "cogs")),
+    "net_profit_margin": (calculate_net_profit_margin, ("net_profit", "revenue")),
+    "current_ratio": (calculate_current_ratio, ("current_assets", "current_liabilities")),
+    "debt_to_equity": (calculate_debt_to_equity, ("total_debt", "total_equity")),
+    "burn_rate": (calculate_burn_rate, ("cash_balance", "monthly_expenses", "monthly_revenue")),
+    "ltv_cac_ratio": (calculate_ltv_cac_ratio, ("ltv", "cac")),
+    "break_even_point": (calculate_break_even_point, ("fixed_costs", "contribution_margin_ratio")),
+    "working_capital": (calculate_working_capital, ("current_assets", "current_liabilities")),
+    "roi": (calculate_roi, ("net_profit", "investment")),
+}
+
+# Input names -> columns of a penjualan DataFrame (database.PenjualanKaret columns)
+PENJUALAN_COLUMNS = {
+    "revenue": "total_harga_jual",
+    "cogs": "total_harga_beli",
+    "net_profit": "keuntungan_bersih",
+    "investment": "total_biaya",
+}
+
+def calculate_ratios(df, columns=None):
+    """
+    Calculate all applicable ratios for every row of a DataFrame in one pass
+
+    Args:
+        df (DataFrame): One row per sale, month, company, ...
+        columns (dict): Input name (see RATIOS) -> column in df; inputs that
+            are not mapped are looked up by their own name
+
+    Returns:
+        DataFrame: One column per ratio whose inputs are all present, same index as df
+    """
+    columns = columns or {}
+    result = {}
+    for name, (function, inputs) in RATIOS.items():
+        source = [columns.get(i, i) for i in inputs]
+        if all(c in df.columns for c in source):
+            result[name] = function(*(pd.to_numeric(df[c], errors="coerce") for c in source))
+    return pd.DataFrame(result, index=df.index)
+
+def calculate_penjualan_ratios(penjualan):
+    """
+    Gross margin, net profit margin and ROI for every sale
+
+    Args:
+        penjualan (DataFrame | list): DataFrame with PenjualanKaret columns, or PenjualanKaret objects
+
+    Returns:
+        DataFrame: gross_margin, net_profit_margin and roi; ROI uses
+            total_harga_beli + ongkos_kirim as the investment
+    """
+    if not isinstance(penjualan, pd.DataFrame):
+        penjualan = pd.DataFrame(
+            [(p.total_harga_jual, p.total_harga_beli, p.ongkos_kirim, p.keuntungan_bersih) for p in penjualan],
+            columns=["total_harga_jual", "total_harga_beli", "ongkos_kirim", "keuntungan_bersih"]
+        )
+    df = penjualan.assign(total_biaya=(
+        pd.to_numeric(penjualan["total_harga_beli"], errors="coerce").fillna(0)
+        + pd.to_numeric(penjualan["ongkos_kirim"], errors="coerce").fillna(0)
+    ))
+    return calculate_ratios(df, PENJUALAN_COLUMNS)
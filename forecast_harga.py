@@ -0,0 +1,280 @@
+import hashlib
+import statistics
+import threading
+
+import numpy as np
+import pandas as pd
+
+from resampling import periode, resample_ohlc
+from shared_cache import get_cache
+
+# Seri harga SICOM yang diramalkan, dengan label tampilannya
+SERI_HARGA = {
+    "harga_sir_sgd": "Harga SIR SGD",
+    "harga_sir_rupiah": "Harga SIR (Rp)",
+}
+
+# Grid parameter Holt yang dicoba saat optimasi penuh; beta = 0 adalah EWMA (tanpa tren)
+GRID_ALPHA = np.array([0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+GRID_BETA = np.array([0.0, 0.01, 0.03, 0.05, 0.1, 0.2])
+
+# Redaman tren per minggu agar ramalan 12 minggu tidak mengekstrapolasi tren berlebihan
+PHI = 0.98
+
+# Parameter dioptimasi ulang setelah sekian observasi baru ditambahkan secara inkremental
+REOPTIMASI_SETIAP = 26
+
+# State terakhir per seri di proses ini, titik awal pembaruan inkremental
+_state_terakhir = {}
+_state_lock = threading.Lock()
+
+
+def _jumlah_redaman(langkah):
+    """
+    Faktor tren untuk maju sejumlah langkah (minggu): phi + phi^2 + ... + phi^langkah
+    """
+    return PHI * (1 - PHI ** langkah) / (1 - PHI)
+
+
+def observasi_dataframe(harga_data, kolom):
+    """
+    Mengubah objek harga SICOM menjadi observasi mingguan (harga penutupan per minggu)
+
+    Harga harian dirata-rata per tanggal lalu diambil nilai terakhir setiap
+    minggu, karena model dan intervalnya dihitung per langkah mingguan.
+    Tanggal observasi adalah tanggal harga terakhir di minggu tersebut.
+
+    Returns:
+        DataFrame: kolom tanggal dan nilai, terurut dan hanya nilai positif
+    """
+    df = pd.DataFrame(
+        [(h.tanggal, getattr(h, kolom)) for h in harga_data if h.tanggal is not None],
+        columns=["tanggal", "nilai"]
+    )
+    df["nilai"] = pd.to_numeric(df["nilai"], errors="coerce")
+    df = df[df["nilai"] > 0]
+    harian = df.groupby("tanggal", as_index=False)["nilai"].mean().sort_values("tanggal", ignore_index=True)
+    if harian.empty:
+        return harian
+
+    mingguan = resample_ohlc(harian["tanggal"], harian["nilai"], "mingguan")
+    tanggal_close = harian.groupby(periode(harian["tanggal"], "mingguan").to_numpy())["tanggal"].last()
+    return pd.DataFrame({
+        "tanggal": tanggal_close.loc[mingguan["periode"]].to_numpy(),
+        "nilai": mingguan["close"].to_numpy(),
+    })
+
+
+def _waktu_minggu(tanggal):
+    """
+    Tanggal -> waktu dalam minggu (float) sejak epoch, untuk jarak observasi tidak beraturan
+    """
+    return pd.to_datetime(pd.Series(tanggal)).to_numpy().astype("datetime64[D]").astype(np.int64) / 7.0
+
+
+def _jejak(t, y):
+    """
+    Sidik jari observasi yang sudah diproses, untuk mendeteksi apakah data baru hanya berupa tambahan
+    """
+    return hashlib.sha1(np.ascontiguousarray(t).tobytes() + np.ascontiguousarray(y).tobytes()).hexdigest()
+
+
+def _rekursi(t, y, alpha, beta, level, tren, t_terakhir):
+    """
+    Menjalankan rekursi Holt (log harga, jarak waktu tidak beraturan) untuk satu
+    atau banyak pasangan parameter sekaligus
+
+    Args:
+        t, y (ndarray): Waktu (minggu) dan log harga observasi baru
+        alpha, beta (ndarray): Parameter, bentuk sama dengan level dan tren
+        level, tren (ndarray): State awal
+        t_terakhir (float): Waktu observasi terakhir yang sudah diproses
+
+    Returns:
+        tuple: (level, tren, sse, jumlah_error) setelah semua observasi;
+            sse adalah jumlah kuadrat error satu langkah yang dinormalisasi per minggu
+    """
+    level, tren = level.copy(), tren.copy()
+    sse = np.zeros_like(level)
+    jumlah = 0
+    for t_i, y_i in zip(t, y):
+        langkah = max(t_i - t_terakhir, 1e-6)
+        prediksi = level + tren * _jumlah_redaman(langkah)
+        error = y_i - prediksi
+        sse += error ** 2 / max(langkah, 1.0)
+        jumlah += 1
+        level_baru = prediksi + alpha * error
+        tren = beta * (level_baru - level) / langkah + (1 - beta) * tren * PHI ** langkah
+        level = level_baru
+        t_terakhir = t_i
+    return level, tren, sse, jumlah
+
+
+def latih_state(tanggal, nilai):
+    """
+    Melatih model Holt dari awal: semua pasangan (alpha, beta) di grid dijalankan
+    bersamaan sebagai array NumPy lalu dipilih yang error satu langkahnya terkecil
+
+    Returns:
+        dict: State model (alpha, beta, level, tren, t_terakhir, sse, n, ...) atau None jika data < 3
+    """
+    t = _waktu_minggu(tanggal)
+    y = np.log(np.asarray(nilai, dtype=float))
+    if len(y) < 3:
+        return None
+
+    alpha, beta = (g.ravel() for g in np.meshgrid(GRID_ALPHA, GRID_BETA))
+    level = np.full(alpha.shape, y[0])
+    tren = np.full(alpha.shape, (y[1] - y[0]) / max(t[1] - t[0], 1.0))
+    level, tren, sse, jumlah = _rekursi(t[1:], y[1:], alpha, beta, level, tren, t[0])
+
+    terbaik = int(np.argmin(sse))
+    return {
+        "alpha": float(alpha[terbaik]),
+        "beta": float(beta[terbaik]),
+        "level": float(level[terbaik]),
+        "tren": float(tren[terbaik]),
+        "t_terakhir": float(t[-1]),
+        "tanggal_terakhir": pd.Timestamp(tanggal.iloc[-1] if hasattr(tanggal, "iloc") else tanggal[-1]),
+        "sse": float(sse[terbaik]),
+        "jumlah_error": jumlah,
+        "n": len(y),
+        "sejak_optimasi": 0,
+        "jejak": _jejak(t, y),
+    }
+
+
+def perbarui_state(state, tanggal, nilai):
+    """
+    Menambahkan observasi baru ke state tanpa melatih ulang dari awal
+
+    Parameter (alpha, beta) tetap; hanya level, tren dan error yang diperbarui.
+
+    Args:
+        state (dict): State dari latih_state/perbarui_state
+        tanggal, nilai (array-like): Observasi setelah tanggal_terakhir state, terurut
+
+    Returns:
+        dict: State baru
+    """
+    t = _waktu_minggu(tanggal)
+    y = np.log(np.asarray(nilai, dtype=float))
+    if len(y) == 0:
+        return state
+
+    level, tren, sse, jumlah = _rekursi(
+        t, y, np.array([state["alpha"]]), np.array([state["beta"]]),
+        np.array([state["level"]]), np.array([state["tren"]]), state["t_terakhir"]
+    )
+    baru = dict(state)
+    baru.update({
+        "level": float(level[0]),
+        "tren": float(tren[0]),
+        "t_terakhir": float(t[-1]),
+        "tanggal_terakhir": pd.Timestamp(tanggal.iloc[-1] if hasattr(tanggal, "iloc") else tanggal[-1]),
+        "sse": state["sse"] + float(sse[0]),
+        "jumlah_error": state["jumlah_error"] + jumlah,
+        "n": state["n"] + len(y),
+        "sejak_optimasi": state["sejak_optimasi"] + len(y),
+    })
+    return baru
+
+
+def sinkronkan_state(state, observasi):
+    """
+    Menyesuaikan state dengan observasi terkini
+
+    Jika observasi lama tidak berubah dan hanya ada tambahan setelah
+    tanggal_terakhir, state diperbarui secara inkremental. Jika ada perubahan
+    atau penghapusan data lama, atau sudah REOPTIMASI_SETIAP observasi sejak
+    optimasi terakhir, model dilatih ulang dari awal.
+
+    Returns:
+        tuple: (state, mode) dengan mode "tetap", "inkremental" atau "latih_ulang"
+    """
+    if state is not None and len(observasi) >= state["n"]:
+        lama = observasi.iloc[:state["n"]]
+        t_lama = _waktu_minggu(lama["tanggal"])
+        y_lama = np.log(lama["nilai"].to_numpy(dtype=float))
+        if _jejak(t_lama, y_lama) == state["jejak"]:
+            baru = observasi.iloc[state["n"]:]
+            if baru.empty:
+                return state, "tetap"
+            if state["sejak_optimasi"] + len(baru) < REOPTIMASI_SETIAP:
+                state = perbarui_state(state, baru["tanggal"], baru["nilai"])
+                t = _waktu_minggu(observasi["tanggal"])
+                y = np.log(observasi["nilai"].to_numpy(dtype=float))
+                state["jejak"] = _jejak(t, y)
+                return state, "inkremental"
+
+    return latih_state(observasi["tanggal"], observasi["nilai"]), "latih_ulang"
+
+
+def ramalan(state, horizon=12, tingkat=0.9):
+    """
+    Ramalan mingguan beserta interval prediksi
+
+    Varians error h langkah mengikuti rumus Holt:
+    sigma^2 * (1 + sum_{j=1}^{h-1} (alpha + alpha*beta*j)^2), pada skala log.
+
+    Args:
+        state (dict): State model
+        horizon (int): Jumlah minggu ke depan
+        tingkat (float): Tingkat kepercayaan interval
+
+    Returns:
+        DataFrame: tanggal, prediksi, bawah, atas
+    """
+    h = np.arange(1, horizon + 1)
+    log_prediksi = state["level"] + state["tren"] * _jumlah_redaman(h)
+
+    sigma2 = state["sse"] / max(state["jumlah_error"], 1)
+    koef = (state["alpha"] + state["alpha"] * state["beta"] * np.arange(horizon)) ** 2
+    koef[0] = 0.0
+    varians = sigma2 * (1 + np.cumsum(koef))
+    z = statistics.NormalDist().inv_cdf(0.5 + tingkat / 2)
+    lebar = z * np.sqrt(varians)
+
+    return pd.DataFrame({
+        "tanggal": state["tanggal_terakhir"] + pd.to_timedelta(7 * h, unit="D"),
+        "prediksi": np.exp(log_prediksi),
+        "bawah": np.exp(log_prediksi - lebar),
+        "atas": np.exp(log_prediksi + lebar),
+    })
+
+
+def get_state_ramalan(perusahaan_id, kolom, harga_data):
+    """
+    Mendapatkan state model untuk satu seri harga dari cache bersama
+
+    Kunci cache memuat sidik jari data, sehingga render berikutnya dengan data
+    yang sama langsung memakai state tersimpan. Saat data bertambah, state
+    terakhir di proses ini diperbarui secara inkremental.
+
+    Args:
+        perusahaan_id (int): ID perusahaan SICOM
+        kolom (str): Nama seri (kunci SERI_HARGA)
+        harga_data (list): Objek HargaSicomSir
+
+    Returns:
+        tuple: (state atau None, observasi DataFrame)
+    """
+    observasi = observasi_dataframe(harga_data, kolom)
+    if len(observasi) < 3:
+        return None, observasi
+
+    jejak_data = _jejak(_waktu_minggu(observasi["tanggal"]), observasi["nilai"].to_numpy(dtype=float))
+
+    def _hitung():
+        kunci = (perusahaan_id, kolom)
+        with _state_lock:
+            state_lama = _state_terakhir.get(kunci)
+        state, mode = sinkronkan_state(state_lama, observasi)
+        if mode != "tetap":
+            print(f"Model ramalan {kolom}: {mode} ({len(observasi)} observasi)")
+        with _state_lock:
+            _state_terakhir[kunci] = state
+        return state
+
+    state = get_cache().get_or_compute("state_ramalan_harga", (perusahaan_id, kolom, jejak_data), _hitung)
+    return state, observasi
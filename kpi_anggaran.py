@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from financial_utils import calculate_burn_rate, calculate_working_capital
+from shared_cache import get_cache, table_namespaces
+
+# Jumlah bulan rata-rata bergulir untuk pendapatan dan pengeluaran
+JENDELA_BULAN = 3
+
+
+def kpi_bulanan(ringkasan, jendela=JENDELA_BULAN):
+    """
+    Seri KPI kas bulanan dari ringkasan anggaran bulanan
+
+    Bulan tanpa transaksi diisi nol agar rata-rata bergulir dihitung per
+    bulan kalender. Saldo akhir bulan adalah jumlah kumulatif debet - kredit,
+    sama dengan cara saldo dihitung di realisasi_anggaran.
+
+    - burn_rate: rata-rata pengeluaran - rata-rata pendapatan per bulan
+      (negatif berarti kas bertambah)
+    - runway_bulan: calculate_burn_rate(saldo_akhir, pengeluaran_rata, pendapatan_rata),
+      bulan sampai kas habis; 0 jika tidak membakar kas atau kas sudah habis
+    - modal_kerja: calculate_working_capital dengan saldo kas sebagai aset
+      lancar dan rata-rata pengeluaran sebulan sebagai kewajiban lancar,
+      karena buku kas tidak mencatat piutang atau utang
+
+    Args:
+        ringkasan (DataFrame): tahun, bulan, total_debet, total_kredit, jumlah_transaksi
+        jendela (int): Jumlah bulan rata-rata bergulir
+
+    Returns:
+        DataFrame: periode (awal bulan), pendapatan, pengeluaran, arus_kas_bersih,
+            saldo_akhir, jumlah_transaksi, pendapatan_rata, pengeluaran_rata,
+            burn_rate, runway_bulan, modal_kerja
+    """
+    kolom = ["periode", "pendapatan", "pengeluaran", "arus_kas_bersih", "saldo_akhir", "jumlah_transaksi",
+             "pendapatan_rata", "pengeluaran_rata", "burn_rate", "runway_bulan", "modal_kerja"]
+    if ringkasan.empty:
+        return pd.DataFrame(columns=kolom)
+
+    periode = pd.PeriodIndex.from_fields(year=ringkasan["tahun"], month=ringkasan["bulan"], freq="M")
+    bulanan = pd.DataFrame({
+        "pendapatan": ringkasan["total_debet"].fillna(0).to_numpy(dtype=float),
+        "pengeluaran": ringkasan["total_kredit"].fillna(0).to_numpy(dtype=float),
+        "jumlah_transaksi": ringkasan["jumlah_transaksi"].fillna(0).to_numpy(dtype=np.int64),
+    }, index=periode).groupby(level=0).sum()
+    bulanan = bulanan.reindex(pd.period_range(bulanan.index.min(), bulanan.index.max(), freq="M"), fill_value=0)
+
+    bulanan["arus_kas_bersih"] = bulanan["pendapatan"] - bulanan["pengeluaran"]
+    bulanan["saldo_akhir"] = bulanan["arus_kas_bersih"].cumsum()
+    bulanan["pendapatan_rata"] = bulanan["pendapatan"].rolling(jendela, min_periods=1).mean()
+    bulanan["pengeluaran_rata"] = bulanan["pengeluaran"].rolling(jendela, min_periods=1).mean()
+    bulanan["burn_rate"] = bulanan["pengeluaran_rata"] - bulanan["pendapatan_rata"]
+    bulanan["runway_bulan"] = calculate_burn_rate(
+        bulanan["saldo_akhir"], bulanan["pengeluaran_rata"], bulanan["pendapatan_rata"]
+    )
+    bulanan["modal_kerja"] = calculate_working_capital(bulanan["saldo_akhir"], bulanan["pengeluaran_rata"])
+
+    bulanan.index = bulanan.index.to_timestamp()
+    return bulanan.rename_axis("periode").reset_index()[kolom]
+
+
+def kpi_terkini(kpi):
+    """
+    KPI bulan terakhir beserta total seluruh periode
+
+    Returns:
+        dict: Kolom kpi_bulanan bulan terakhir ditambah total_pendapatan,
+            total_pengeluaran dan jumlah_bulan; None jika belum ada data
+    """
+    if kpi.empty:
+        return None
+    terkini = kpi.iloc[-1].to_dict()
+    terkini.update({
+        "total_pendapatan": float(kpi["pendapatan"].sum()),
+        "total_pengeluaran": float(kpi["pengeluaran"].sum()),
+        "jumlah_bulan": len(kpi),
+    })
+    return terkini
+
+
+def format_runway(kpi):
+    """
+    Teks runway untuk tampilan: jumlah bulan, atau keterangan jika kas tidak sedang berkurang/sudah habis
+    """
+    if kpi["burn_rate"] <= 0:
+        return "Kas tidak berkurang"
+    if kpi["saldo_akhir"] <= 0:
+        return "Kas habis"
+    return f"{kpi['runway_bulan']:.1f} bulan"
+
+
+def get_kpi_anggaran(perusahaan_id, jendela, load_ringkasan):
+    """
+    KPI kas bulanan satu perusahaan dari cache bersama
+
+    Dihitung dari ringkasan_anggaran_bulanan (satu baris per bulan, dipelihara
+    inkremental saat transaksi disimpan/dihapus), bukan dari seluruh buku kas.
+
+    Args:
+        perusahaan_id (int): ID perusahaan
+        jendela (int): Jumlah bulan rata-rata bergulir
+        load_ringkasan (callable): Mengembalikan list objek RingkasanAnggaranBulanan
+
+    Returns:
+        DataFrame: Hasil kpi_bulanan
+    """
+    def _hitung():
+        ringkasan = pd.DataFrame(
+            [(r.tahun, r.bulan, r.total_debet, r.total_kredit, r.jumlah_transaksi) for r in load_ringkasan()],
+            columns=["tahun", "bulan", "total_debet", "total_kredit", "jumlah_transaksi"]
+        )
+        return kpi_bulanan(ringkasan, jendela)
+
+    return get_cache().get_or_compute(
+        "kpi_anggaran", (perusahaan_id, jendela), _hitung,
+        table_namespaces("realisasi_anggaran", perusahaan_id)
+    )
@@ -0,0 +1,76 @@
+import numpy as np
+
+from resampling import nilai_asof
+
+# Selisih maksimum (Rupiah) antara harga tersimpan dan turunan; data contoh dibulatkan ke Rupiah terdekat
+TOLERANSI_RUPIAH = 1.0
+
+# Selisih maksimum harga Rp/100 (dua desimal)
+TOLERANSI_RUPIAH_100 = 0.01
+
+
+def kurs_asof(tanggal, kurs_tanggal, kurs_nilai):
+    """
+    Kurs SGD/IDR yang berlaku pada setiap tanggal (kurs terakhir dengan tanggal <= tanggal tersebut)
+
+    Args:
+        tanggal (array-like): Tanggal yang dicari
+        kurs_tanggal, kurs_nilai (array-like): Tabel kurs; tidak harus terurut
+
+    Returns:
+        ndarray: Kurs per tanggal, NaN jika belum ada kurs sebelum tanggal itu
+    """
+    return nilai_asof(tanggal, kurs_tanggal, kurs_nilai)[0]
+
+
+def turunkan_harga(harga_sir_sgd, kurs):
+    """
+    Menurunkan harga Rupiah dari harga SIR 20 dalam SGD dan kurs
+
+    harga_sir_rupiah = harga_sir_sgd x kurs / 100, dibulatkan ke Rupiah
+    (contoh: 206.10 x 16.580 / 100 = 34.171).
+
+    Args:
+        harga_sir_sgd (float | array-like): Harga SIR 20 dalam SGD
+        kurs (float | array-like): Rupiah per 1 SGD
+
+    Returns:
+        dict: harga_rupiah, harga_rupiah_100, harga_sir_rupiah
+    """
+    kurs = np.asarray(kurs, dtype=float)
+    harga_sir_sgd = np.asarray(harga_sir_sgd, dtype=float)
+    return {
+        "harga_rupiah": kurs,
+        "harga_rupiah_100": np.round(kurs / 100, 2),
+        "harga_sir_rupiah": np.round(harga_sir_sgd * kurs / 100),
+    }
+
+
+def validasi_harga(harga, kurs):
+    """
+    Membandingkan harga Rupiah tersimpan dengan turunan dari kurs yang berlaku
+
+    Args:
+        harga (DataFrame): id, perusahaan_id, tanggal, harga_rupiah, harga_rupiah_100,
+            harga_sir_sgd, harga_sir_rupiah
+        kurs (DataFrame): tanggal, kurs
+
+    Returns:
+        DataFrame: harga ditambah kurs, kolom *_turunan, selisih_sir_rupiah dan
+            status ("cocok", "tidak_cocok" atau "tanpa_kurs")
+    """
+    hasil = harga.copy()
+    hasil["kurs"] = kurs_asof(hasil["tanggal"], kurs["tanggal"], kurs["kurs"])
+    turunan = turunkan_harga(hasil["harga_sir_sgd"].fillna(0), hasil["kurs"])
+    for kolom, nilai in turunan.items():
+        hasil[f"{kolom}_turunan"] = nilai
+    hasil["selisih_sir_rupiah"] = hasil["harga_sir_rupiah"] - hasil["harga_sir_rupiah_turunan"]
+
+    tidak_cocok = (
+        ((hasil["harga_rupiah"] - hasil["harga_rupiah_turunan"]).abs() > TOLERANSI_RUPIAH)
+        | ((hasil["harga_rupiah_100"] - hasil["harga_rupiah_100_turunan"]).abs() > TOLERANSI_RUPIAH_100)
+        | (hasil["selisih_sir_rupiah"].abs() > TOLERANSI_RUPIAH)
+        | hasil[["harga_rupiah", "harga_rupiah_100", "harga_sir_rupiah"]].isna().any(axis=1)
+    )
+    hasil["status"] = np.where(hasil["kurs"].isna(), "tanpa_kurs", np.where(tidak_cocok, "tidak_cocok", "cocok"))
+    return hasil
@@ -0,0 +1,269 @@
+import statistics
+import threading
+
+import numpy as np
+import pandas as pd
+
+from shared_cache import get_cache, table_namespaces
+
+# Batas pita jarak (km) untuk lebar interval prediksi; residu susut makin lebar untuk jarak jauh
+PITA_JARAK = (0.0, 50.0, 100.0, 150.0, 250.0, np.inf)
+
+# Konstanta Huber (dalam satuan skala robust residu); 1.345 memberi efisiensi ~95% untuk data normal
+HUBER_DELTA = 1.345
+
+# Jumlah penjualan minimum agar perusahaan mendapat lereng (susut per km) sendiri
+MIN_SAMPEL_LERENG = 5
+
+# Kekuatan penyusutan intersep perusahaan kecil ke intersep global (setara jumlah sampel)
+BOBOT_PRIOR = 3.0
+
+# Jumlah residu minimum agar pita jarak memakai skala sendiri
+MIN_SAMPEL_PITA = 5
+
+# Skala residu minimum (poin persen) agar interval tidak terlalu sempit saat data sedikit
+SKALA_MIN = 0.5
+
+_MAKS_ITERASI = 50
+_TOLERANSI = 1e-6
+
+# Koefisien hasil latih terakhir di proses ini, dipakai sebagai titik awal (warm start)
+# saat model dilatih ulang setelah ada penjualan baru
+_koefisien_terakhir = {}
+_koefisien_lock = threading.Lock()
+
+
+def _skala_robust(residu):
+    """
+    Skala robust (MAD x 1.4826); 1.0 jika residu kosong atau seluruhnya sama
+    """
+    if len(residu) == 0:
+        return 1.0
+    skala = 1.4826 * np.median(np.abs(residu - np.median(residu)))
+    return float(skala) if skala > 1e-9 else 1.0
+
+
+def _regresi_grup(grup, x, y, w, n_grup, lereng_tetap=None):
+    """
+    Regresi linear berbobot y = a + b*x untuk semua grup sekaligus (np.bincount)
+
+    Grup dengan lereng_tetap bukan NaN hanya diestimasi intersepnya.
+
+    Returns:
+        tuple: (intersep, lereng, jumlah_bobot) masing-masing array sepanjang n_grup
+    """
+    s_w = np.bincount(grup, w, n_grup)
+    s_wx = np.bincount(grup, w * x, n_grup)
+    s_wy = np.bincount(grup, w * y, n_grup)
+    s_wxx = np.bincount(grup, w * x * x, n_grup)
+    s_wxy = np.bincount(grup, w * x * y, n_grup)
+
+    penyebut = s_w * s_wxx - s_wx ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lereng = np.where(penyebut > 1e-9 * np.maximum(s_w * s_wxx, 1.0), (s_w * s_wxy - s_wx * s_wy) / penyebut, np.nan)
+        if lereng_tetap is not None:
+            lereng = np.where(np.isnan(lereng_tetap), lereng, lereng_tetap)
+        lereng = np.nan_to_num(lereng)
+        intersep = np.where(s_w > 0, (s_wy - lereng * s_wx) / s_w, 0.0)
+    return intersep, lereng, s_w
+
+
+def fit_huber(grup, x, y, n_grup, koef_awal=None, lereng_tetap=None, prior=None):
+    """
+    Regresi robust Huber y = a_g + b_g*x per grup dengan IRLS tervektorisasi
+
+    Setiap iterasi menghitung ulang bobot Huber dari residu terhadap skala robust
+    gabungan lalu menyelesaikan regresi berbobot semua grup sekaligus.
+
+    Args:
+        grup (ndarray): Indeks grup 0..n_grup-1 untuk setiap observasi
+        x, y (ndarray): Jarak dan susut
+        n_grup (int): Jumlah grup
+        koef_awal (tuple): (intersep, lereng) awal per grup untuk warm start; None = OLS
+        lereng_tetap (ndarray): Lereng tetap per grup (NaN = diestimasi)
+        prior (tuple): (intersep_prior, bobot_prior) untuk menyusutkan intersep grup
+            yang lerengnya tetap ke arah intersep prior
+
+    Returns:
+        dict: intersep, lereng, jumlah (bobot observasi per grup), skala, iterasi
+    """
+    if koef_awal is None:
+        intersep, lereng, _ = _regresi_grup(grup, x, y, np.ones_like(x), n_grup, lereng_tetap)
+    else:
+        intersep, lereng = (np.asarray(k, dtype=float).copy() for k in koef_awal)
+
+    jumlah = np.bincount(grup, minlength=n_grup).astype(float)
+    iterasi = 0
+    for iterasi in range(1, _MAKS_ITERASI + 1):
+        residu = y - intersep[grup] - lereng[grup] * x
+        batas = HUBER_DELTA * _skala_robust(residu)
+        abs_residu = np.abs(residu)
+        w = np.where(abs_residu <= batas, 1.0, batas / np.maximum(abs_residu, 1e-12))
+
+        intersep_baru, lereng_baru, s_w = _regresi_grup(grup, x, y, w, n_grup, lereng_tetap)
+        if prior is not None and lereng_tetap is not None:
+            intersep_prior, bobot_prior = prior
+            disusutkan = ~np.isnan(lereng_tetap)
+            intersep_baru = np.where(
+                disusutkan, (s_w * intersep_baru + bobot_prior * intersep_prior) / (s_w + bobot_prior), intersep_baru
+            )
+
+        perubahan = max(np.max(np.abs(intersep_baru - intersep), initial=0.0),
+                        np.max(np.abs(lereng_baru - lereng), initial=0.0))
+        intersep, lereng = intersep_baru, lereng_baru
+        if perubahan < _TOLERANSI:
+            break
+
+    residu = y - intersep[grup] - lereng[grup] * x
+    return {
+        "intersep": intersep,
+        "lereng": lereng,
+        "jumlah": jumlah,
+        "skala": _skala_robust(residu),
+        "iterasi": iterasi,
+    }
+
+
+def latih_model(perusahaan_id, jarak, susut, koef_awal=None):
+    """
+    Melatih model susut dari histori penjualan
+
+    Model global (semua perusahaan) dilatih lebih dulu. Perusahaan dengan
+    minimal MIN_SAMPEL_LERENG penjualan pada jarak yang bervariasi mendapat
+    lereng sendiri; perusahaan lain memakai lereng global dengan intersep yang
+    disusutkan ke intersep global. Lebar interval dihitung per pita jarak dari
+    residu robust.
+
+    Args:
+        perusahaan_id, jarak, susut (array-like): Data penjualan
+        koef_awal (dict): Koefisien latih sebelumnya ({perusahaan_id: (a, b)} dan
+            kunci "global") untuk warm start
+
+    Returns:
+        dict: Model susut (array numpy, bisa disimpan di cache), atau None jika tidak ada data
+    """
+    perusahaan_id = np.asarray(perusahaan_id, dtype=np.int64)
+    x = np.asarray(jarak, dtype=float)
+    y = np.asarray(susut, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    perusahaan_id, x, y = perusahaan_id[valid], x[valid], y[valid]
+    if len(y) == 0:
+        return None
+    koef_awal = koef_awal or {}
+
+    # Model global
+    nol = np.zeros(len(y), dtype=np.int64)
+    awal_global = koef_awal.get("global")
+    model_global = fit_huber(
+        nol, x, y, 1,
+        koef_awal=None if awal_global is None else ([awal_global[0]], [awal_global[1]])
+    )
+    a_global, b_global = float(model_global["intersep"][0]), float(model_global["lereng"][0])
+
+    # Model per perusahaan
+    ids, grup = np.unique(perusahaan_id, return_inverse=True)
+    n_grup = len(ids)
+    jumlah = np.bincount(grup, minlength=n_grup)
+    per_grup = pd.Series(x).groupby(grup)
+    rentang_x = (per_grup.max() - per_grup.min()).to_numpy()
+    lereng_sendiri = (jumlah >= MIN_SAMPEL_LERENG) & (rentang_x > 0)
+    lereng_tetap = np.where(lereng_sendiri, np.nan, b_global)
+
+    awal = None
+    if koef_awal:
+        awal = (
+            np.array([koef_awal.get(int(i), (a_global, b_global))[0] for i in ids]),
+            np.array([koef_awal.get(int(i), (a_global, b_global))[1] for i in ids]),
+        )
+    model_grup = fit_huber(grup, x, y, n_grup, koef_awal=awal, lereng_tetap=lereng_tetap,
+                           prior=(a_global, BOBOT_PRIOR))
+
+    # Skala residu per pita jarak
+    residu = y - model_grup["intersep"][grup] - model_grup["lereng"][grup] * x
+    pita = np.digitize(x, PITA_JARAK[1:-1])
+    skala_pita = np.full(len(PITA_JARAK) - 1, model_grup["skala"])
+    for i in range(len(skala_pita)):
+        residu_pita = residu[pita == i]
+        if len(residu_pita) >= MIN_SAMPEL_PITA:
+            skala_pita[i] = _skala_robust(residu_pita)
+    skala_pita = np.maximum(skala_pita, SKALA_MIN)
+
+    return {
+        "perusahaan_id": ids,
+        "intersep": model_grup["intersep"],
+        "lereng": model_grup["lereng"],
+        "jumlah": jumlah,
+        "lereng_sendiri": lereng_sendiri,
+        "global": {"intersep": a_global, "lereng": b_global, "skala": model_global["skala"]},
+        "pita_skala": skala_pita,
+        "jumlah_data": int(len(y)),
+        "iterasi": int(model_global["iterasi"] + model_grup["iterasi"]),
+    }
+
+
+def prediksi_susut(model, perusahaan_id, jarak, tingkat=0.9):
+    """
+    Prediksi susut (persen) beserta interval untuk satu atau banyak penjualan
+
+    Perusahaan yang tidak ada di model memakai koefisien global. Semua input
+    di-broadcast, sehingga bisa dipanggil untuk ratusan kandidat atau satu grid jarak.
+
+    Args:
+        model (dict): Hasil latih_model
+        perusahaan_id (int | array-like): ID perusahaan tujuan
+        jarak (float | array-like): Jarak dalam km
+        tingkat (float): Tingkat kepercayaan interval (misalnya 0.9)
+
+    Returns:
+        dict: susut, bawah, atas (ndarray, dibatasi 0-100)
+    """
+    perusahaan_id, jarak = np.broadcast_arrays(np.asarray(perusahaan_id, dtype=np.int64), np.asarray(jarak, dtype=float))
+
+    ids = model["perusahaan_id"]
+    posisi = np.clip(np.searchsorted(ids, perusahaan_id), 0, max(len(ids) - 1, 0))
+    dikenal = (ids[posisi] == perusahaan_id) if len(ids) else np.zeros(perusahaan_id.shape, dtype=bool)
+    intersep = np.where(dikenal, model["intersep"][posisi] if len(ids) else 0.0, model["global"]["intersep"])
+    lereng = np.where(dikenal, model["lereng"][posisi] if len(ids) else 0.0, model["global"]["lereng"])
+
+    susut = intersep + lereng * jarak
+    z = statistics.NormalDist().inv_cdf(0.5 + tingkat / 2)
+    lebar = z * model["pita_skala"][np.digitize(jarak, PITA_JARAK[1:-1])]
+    return {
+        "susut": np.clip(susut, 0, 100),
+        "bawah": np.clip(susut - lebar, 0, 100),
+        "atas": np.clip(susut + lebar, 0, 100),
+    }
+
+
+def get_model_susut(load_data):
+    """
+    Mendapatkan model susut dari cache bersama, melatih ulang jika histori berubah
+
+    Entri cache diinvalidasi setiap ada penulisan penjualan_karet; pelatihan
+    ulang dimulai dari koefisien terakhir proses ini sehingga IRLS biasanya
+    konvergen dalam beberapa iterasi.
+
+    Args:
+        load_data (callable): Mengembalikan list (perusahaan_id, jarak, susut)
+
+    Returns:
+        dict: Model susut, atau None jika belum ada data penjualan
+    """
+    def _latih():
+        data = load_data()
+        if not data:
+            return None
+        perusahaan_id, jarak, susut = (np.asarray(kolom) for kolom in zip(*data))
+        with _koefisien_lock:
+            koef_awal = dict(_koefisien_terakhir)
+        model = latih_model(perusahaan_id, jarak, susut, koef_awal=koef_awal)
+        if model is not None:
+            with _koefisien_lock:
+                _koefisien_terakhir["global"] = (model["global"]["intersep"], model["global"]["lereng"])
+                _koefisien_terakhir.update({
+                    int(i): (float(a), float(b))
+                    for i, a, b in zip(model["perusahaan_id"], model["intersep"], model["lereng"])
+                })
+        return model
+
+    return get_cache().get_or_compute("model_susut", (), _latih, table_namespaces("penjualan_karet", None))
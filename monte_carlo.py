@@ -0,0 +1,224 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from shared_cache import get_cache
+
+# Metode pembangkitan jalur harga SIR 20, dengan label tampilannya
+METODE_SIMULASI = {
+    "bootstrap": "Bootstrap Return Historis",
+    "gbm": "Geometric Brownian Motion",
+}
+
+JUMLAH_JALUR = 100_000
+
+# Pasangan observasi yang berjarak lebih dari ini (minggu) tidak dipakai sebagai return,
+# karena celah panjang di data contoh (mis. Februari -> Oktober) bukan pergerakan mingguan
+MAKS_CELAH_MINGGU = 8
+
+# Minimal return mingguan agar simulasi dianggap bermakna
+MIN_RETURN = 5
+
+# Kuantil yang disimpan untuk grafik kipas harga per minggu
+KUANTIL_KIPAS = (5, 25, 50, 75, 95)
+
+
+def return_mingguan(tanggal, harga):
+    """
+    Log return harga SIR 20 yang dinormalisasi ke satu minggu
+
+    Observasi tidak berjarak tepat seminggu, sehingga setiap log return dibagi
+    akar jarak (minggu): variansnya setara return satu minggu. Drift dihitung
+    dari total log return dibagi total jarak.
+
+    Args:
+        tanggal, harga (array-like): Observasi harga, terurut menurut tanggal
+
+    Returns:
+        tuple: (return ndarray, drift per minggu, volatilitas per minggu)
+    """
+    t = pd.to_datetime(pd.Series(tanggal)).to_numpy().astype("datetime64[D]").astype(np.int64) / 7.0
+    log_harga = np.log(np.asarray(harga, dtype=float))
+    jarak = np.diff(t)
+    r = np.diff(log_harga)
+    pakai = (jarak > 0) & (jarak <= MAKS_CELAH_MINGGU)
+    jarak, r = jarak[pakai], r[pakai]
+    if len(r) == 0:
+        return r, 0.0, 0.0
+
+    r_normal = r / np.sqrt(jarak)
+    drift = float(r.sum() / jarak.sum())
+    volatilitas = float(np.std(r_normal - drift * np.sqrt(jarak), ddof=1)) if len(r) > 1 else 0.0
+    return r_normal, drift, volatilitas
+
+
+def simulasi_faktor_harga(returns, drift, volatilitas, horizon, jumlah_jalur=JUMLAH_JALUR, metode="bootstrap", seed=0):
+    """
+    Membangkitkan jalur log harga mingguan sekaligus sebagai matriks NumPy
+
+    Args:
+        returns (ndarray): Return mingguan historis (untuk bootstrap)
+        drift, volatilitas (float): Rata-rata dan simpangan baku log return per minggu (GBM)
+        horizon (int): Jumlah minggu
+        jumlah_jalur (int): Jumlah jalur
+        metode (str): Kunci METODE_SIMULASI
+        seed (int): Seed generator, agar hasil dapat diulang
+
+    Returns:
+        ndarray: Log faktor harga kumulatif, bentuk (jumlah_jalur, horizon) float32;
+            harga minggu ke-h = harga_awal * exp(kolom h-1)
+    """
+    rng = np.random.default_rng(seed)
+    if metode == "bootstrap":
+        langkah = rng.choice(np.asarray(returns, dtype=np.float32), size=(jumlah_jalur, horizon))
+    elif metode == "gbm":
+        langkah = rng.standard_normal((jumlah_jalur, horizon), dtype=np.float32)
+        langkah *= np.float32(volatilitas)
+        langkah += np.float32(drift)
+    else:
+        raise ValueError(f"Metode simulasi tidak dikenal: {metode}")
+    return np.cumsum(langkah, axis=1, out=langkah)
+
+
+def jalankan_simulasi(tanggal, harga, horizon=12, jumlah_jalur=JUMLAH_JALUR, metode="bootstrap", seed=0):
+    """
+    Simulasi harga SIR 20 dari histori, diringkas agar murah disimpan di cache
+
+    Returns:
+        dict: faktor (harga akhir / harga awal, terurut naik, float32), kipas
+            (DataFrame minggu dan kuantil harga), harga_awal, tanggal_awal,
+            drift, volatilitas, jumlah_return dan parameter simulasi;
+            None jika return historis kurang dari MIN_RETURN
+    """
+    returns, drift, volatilitas = return_mingguan(tanggal, harga)
+    if len(returns) < MIN_RETURN:
+        return None
+
+    log_faktor = simulasi_faktor_harga(returns, drift, volatilitas, horizon, jumlah_jalur, metode, seed)
+    harga_awal = float(np.asarray(harga, dtype=float)[-1])
+    kuantil = np.percentile(log_faktor, KUANTIL_KIPAS, axis=0)
+    kipas = pd.DataFrame(harga_awal * np.exp(kuantil.T), columns=[f"p{q}" for q in KUANTIL_KIPAS])
+    kipas.insert(0, "minggu", np.arange(1, horizon + 1))
+
+    faktor = np.exp(log_faktor[:, -1])
+    faktor.sort()
+    return {
+        "faktor": faktor,
+        "kipas": kipas,
+        "harga_awal": harga_awal,
+        "tanggal_awal": pd.Timestamp(pd.Series(tanggal).iloc[-1]),
+        "drift": drift,
+        "volatilitas": volatilitas,
+        "jumlah_return": len(returns),
+        "horizon": horizon,
+        "jumlah_jalur": jumlah_jalur,
+        "metode": metode,
+    }
+
+
+def risiko_keuntungan(hasil, total_harga_jual, keuntungan, tingkat=0.95):
+    """
+    Distribusi keuntungan dan ukuran risiko untuk banyak perusahaan sekaligus
+
+    Harga jual diasumsikan bergerak sebanding dengan harga SIR 20, sehingga
+    keuntungan jalur = keuntungan + total_harga_jual * (faktor - 1). Karena
+    keuntungan naik monoton terhadap faktor, kuantil dan ekor distribusi
+    cukup dihitung sekali dari faktor yang sudah terurut lalu dipetakan ke
+    setiap perusahaan, tanpa matriks jalur x perusahaan.
+
+    Args:
+        hasil (dict): Hasil jalankan_simulasi
+        total_harga_jual, keuntungan (array-like): Pendapatan dan keuntungan bersih rencana per perusahaan
+        tingkat (float): Tingkat keyakinan VaR/CVaR
+
+    Returns:
+        DataFrame: ekspektasi_keuntungan, keuntungan_p5, keuntungan_p95, var, cvar
+            (kerugian pada tingkat keyakinan; negatif berarti masih untung) dan
+            probabilitas_rugi per perusahaan, urutan sama dengan input
+    """
+    faktor = hasil["faktor"].astype(float)
+    n = len(faktor)
+    a = np.asarray(total_harga_jual, dtype=float)
+    k = np.asarray(keuntungan, dtype=float)
+
+    ekor = max(int(np.floor(n * (1 - tingkat))), 1)
+    q_bawah = faktor[ekor - 1]
+    rata_ekor = faktor[:ekor].mean()
+    p5, p95 = np.percentile(faktor, [5, 95])
+
+    # Keuntungan < 0  <=>  faktor < 1 - keuntungan / total_harga_jual (untuk total_harga_jual > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        batas_rugi = np.where(a > 0, 1 - k / a, np.nan)
+    probabilitas = np.where(
+        a > 0,
+        np.searchsorted(faktor, np.nan_to_num(batas_rugi), side="left") / n,
+        (k < 0).astype(float)
+    )
+
+    return pd.DataFrame({
+        "ekspektasi_keuntungan": k + a * (faktor.mean() - 1),
+        "keuntungan_p5": k + a * (p5 - 1),
+        "keuntungan_p95": k + a * (p95 - 1),
+        "var": -(k + a * (q_bawah - 1)),
+        "cvar": -(k + a * (rata_ekor - 1)),
+        "probabilitas_rugi": probabilitas,
+    })
+
+
+def ringkasan_risiko(hasil, total_harga_jual, keuntungan, tingkat=0.95):
+    """
+    Ukuran risiko satu perusahaan beserta parameter simulasinya, untuk laporan
+
+    Returns:
+        dict: Kolom risiko_keuntungan ditambah metode, label_metode, horizon,
+            jumlah_jalur, jumlah_return, volatilitas, harga_awal, tanggal_awal dan tingkat
+    """
+    ringkasan = risiko_keuntungan(hasil, [total_harga_jual], [keuntungan], tingkat).iloc[0].to_dict()
+    ringkasan.update({kunci: nilai for kunci, nilai in hasil.items() if kunci not in ("faktor", "kipas")})
+    ringkasan["label_metode"] = METODE_SIMULASI[hasil["metode"]]
+    ringkasan["tingkat"] = tingkat
+    return ringkasan
+
+
+def histogram_keuntungan(hasil, total_harga_jual, keuntungan, jumlah_bin=60):
+    """
+    Histogram keuntungan satu perusahaan dari faktor simulasi
+
+    Returns:
+        DataFrame: tengah (nilai tengah bin), lebar dan jumlah jalur
+    """
+    nilai = keuntungan + total_harga_jual * (hasil["faktor"].astype(float) - 1)
+    jumlah, tepi = np.histogram(nilai, bins=jumlah_bin)
+    return pd.DataFrame({"tengah": (tepi[:-1] + tepi[1:]) / 2, "lebar": np.diff(tepi), "jumlah": jumlah})
+
+
+def get_simulasi_harga(horizon, jumlah_jalur, metode, load_harga_pasar, seed=0):
+    """
+    Hasil jalankan_simulasi dari cache bersama
+
+    Kunci cache memuat sidik jari histori harga dan parameter simulasi, sehingga
+    input yang sama tidak disimulasikan ulang dan data harga baru otomatis
+    menghasilkan kunci baru.
+
+    Args:
+        horizon (int): Jumlah minggu
+        jumlah_jalur (int): Jumlah jalur
+        metode (str): Kunci METODE_SIMULASI
+        load_harga_pasar (callable): Mengembalikan list (tanggal, harga_sir_rupiah)
+        seed (int): Seed generator
+
+    Returns:
+        dict: Hasil jalankan_simulasi atau None
+    """
+    harga_pasar = pd.DataFrame(load_harga_pasar(), columns=["tanggal", "harga_sir_rupiah"])
+    tanggal = pd.to_datetime(harga_pasar["tanggal"]).to_numpy().astype("datetime64[D]")
+    harga = harga_pasar["harga_sir_rupiah"].to_numpy(dtype=float)
+    jejak = hashlib.sha1(
+        tanggal.tobytes() + harga.tobytes() + repr((horizon, jumlah_jalur, metode, seed)).encode()
+    ).hexdigest()
+
+    return get_cache().get_or_compute(
+        "simulasi_harga", (jejak,),
+        lambda: jalankan_simulasi(harga_pasar["tanggal"], harga, horizon, jumlah_jalur, metode, seed)
+    )
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from model_susut import prediksi_susut
+from simulasi import hitung_penjualan
+
+
+def kandidat_dataframe(kandidat_data):
+    """
+    Membuat DataFrame kandidat tujuan dari hasil get_kandidat_tujuan
+
+    Tarif ongkos kirim yang tidak diketahui (jarak atau berat historis nol)
+    diisi median tarif seluruh kandidat, atau 0 jika tidak ada sama sekali.
+    """
+    df = pd.DataFrame(kandidat_data, columns=[
+        "perusahaan_id", "nama", "jenis", "tanggal_terakhir", "harga_jual", "jarak",
+        "susut_historis", "tarif_kirim", "jumlah_penjualan"
+    ])
+    for kolom in ("harga_jual", "jarak", "susut_historis", "tarif_kirim"):
+        df[kolom] = pd.to_numeric(df[kolom], errors="coerce")
+
+    median_tarif = df["tarif_kirim"].median()
+    df["tarif_kirim"] = df["tarif_kirim"].fillna(0.0 if pd.isna(median_tarif) else median_tarif)
+    df["jarak"] = df["jarak"].fillna(0.0)
+    df["susut_historis"] = df["susut_historis"].fillna(0.0).clip(0, 100)
+    return df
+
+
+def peringkat_tujuan(kandidat, berat_awal, harga_beli, model_susut=None):
+    """
+    Memberi peringkat semua tujuan untuk satu batch bokar
+
+    Semua kandidat dihitung sekaligus dengan hitung_penjualan (array NumPy):
+    berat jual dari susut (prediksi model susut jika diberikan, selain itu
+    susut historis), pendapatan dari harga jual terakhir dan
+    ongkos kirim = tarif (Rp/kg/km) x jarak x berat awal.
+
+    Args:
+        kandidat (DataFrame): Hasil kandidat_dataframe
+        berat_awal (float): Berat awal batch dalam kg
+        harga_beli (float): Harga beli batch per kg
+        model_susut (dict): Model dari model_susut.latih_model (opsional)
+
+    Returns:
+        DataFrame: kandidat ditambah susut (yang dipakai), berat_jual, total_harga_jual,
+            ongkos_kirim, keuntungan_bersih, keuntungan_per_kg dan peringkat (1 = terbaik),
+            diurutkan dari keuntungan bersih tertinggi
+    """
+    if model_susut is not None and not kandidat.empty:
+        prediksi = prediksi_susut(model_susut, kandidat["perusahaan_id"].to_numpy(), kandidat["jarak"].to_numpy())
+        kandidat = kandidat.assign(susut=prediksi["susut"], susut_bawah=prediksi["bawah"], susut_atas=prediksi["atas"])
+    else:
+        kandidat = kandidat.assign(susut=kandidat["susut_historis"])
+
+    ongkos_kirim = kandidat["tarif_kirim"].to_numpy() * kandidat["jarak"].to_numpy() * berat_awal
+    hasil = hitung_penjualan(
+        berat_awal,
+        kandidat["harga_jual"].to_numpy(),
+        harga_beli,
+        kandidat["susut"].to_numpy(),
+        ongkos_kirim
+    )
+
+    peringkat = kandidat.assign(
+        berat_jual=hasil["berat_jual"],
+        total_harga_jual=hasil["total_harga_jual"],
+        ongkos_kirim=ongkos_kirim,
+        keuntungan_bersih=hasil["keuntungan_bersih"],
+        keuntungan_per_kg=hasil["keuntungan_bersih"] / berat_awal if berat_awal else np.nan,
+    )
+    peringkat = peringkat.sort_values("keuntungan_bersih", ascending=False, kind="stable").reset_index(drop=True)
+    peringkat["peringkat"] = np.arange(1, len(peringkat) + 1)
+    return peringkat
+
+
+def rekomendasi_teks(peringkat, berat_awal, format_currency=lambda v: f"Rp{v:,.0f}"):
+    """
+    Menyusun teks rekomendasi dari tujuan peringkat teratas
+
+    Args:
+        peringkat (DataFrame): Hasil peringkat_tujuan
+        berat_awal (float): Berat awal batch dalam kg
+        format_currency (callable): Format nilai Rupiah
+
+    Returns:
+        str: Teks rekomendasi, atau string kosong jika tidak ada kandidat
+    """
+    if peringkat.empty:
+        return ""
+
+    terbaik = peringkat.iloc[0]
+    teks = (
+        f"Kirim {berat_awal:,.0f} kg ke {terbaik['nama']} ({terbaik['jarak']:.0f} km, "
+        f"harga {format_currency(terbaik['harga_jual'])}/kg, perkiraan susut {terbaik['susut']:.1f}%) "
+        f"dengan perkiraan keuntungan bersih {format_currency(terbaik['keuntungan_bersih'])}."
+    )
+    if len(peringkat) > 1:
+        kedua = peringkat.iloc[1]
+        selisih = terbaik["keuntungan_bersih"] - kedua["keuntungan_bersih"]
+        teks += f" Alternatif: {kedua['nama']} (selisih {format_currency(selisih)})."
+    if terbaik["keuntungan_bersih"] <= 0:
+        teks += " Semua tujuan diperkirakan rugi pada harga beli ini."
+    return teks
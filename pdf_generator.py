@@ -13,6 +13,13 @@ import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
 from utils import format_currency
+from shared_cache import cached_png
+from resampling import LABEL_GRANULARITAS, pilih_granularitas, resample_arus_kas, label_periode
+from volume import parse_volume, ringkas_volume
+
+# Grafik arus kas PDF: 10 inci x 150 dpi, dengan ruang minimum per pasangan batang debet/kredit
+LEBAR_GRAFIK_PDF = 1500
+PIKSEL_PER_BATANG_PDF = 40
 
 def wrap_text(text, max_width=40, add_spacing=False):
     """
@@ -126,6 +133,10 @@ def create_cash_flow_chart(anggaran_data):
     Returns:
         Image: ReportLab Image object
     """
+    png = cached_png("pdf_cash_flow_chart", anggaran_data, lambda: _render_cash_flow_chart(anggaran_data))
+    return Image(BytesIO(png), width=700, height=350)
+
+def _render_cash_flow_chart(anggaran_data):
     # Convert data to right format
     dates = []
     debets = []
@@ -150,6 +161,15 @@ def create_cash_flow_chart(anggaran_data):
         kredits.append(kredit_val)
         saldos.append(saldo_val)
     
+    # Satu batang per transaksi hanya jika jumlahnya muat di lebar gambar; selain itu diringkas per periode
+    judul = 'Arus Kas dan Saldo'
+    if len(dates) > LEBAR_GRAFIK_PDF // PIKSEL_PER_BATANG_PDF:
+        granularitas = pilih_granularitas(min(dates), max(dates), LEBAR_GRAFIK_PDF, PIKSEL_PER_BATANG_PDF)
+        arus_kas = resample_arus_kas(dates, debets, kredits, saldos, granularitas)
+        dates = label_periode(arus_kas["periode"], granularitas)
+        debets, kredits, saldos = (arus_kas[kolom].tolist() for kolom in ("debet", "kredit", "saldo"))
+        judul = f'Arus Kas dan Saldo Akhir ({LABEL_GRANULARITAS[granularitas]})'
+    
     # Create figure
     plt.figure(figsize=(10, 5))
     
@@ -165,7 +185,7 @@ def create_cash_flow_chart(anggaran_data):
     # Format the chart
     plt.xlabel('Tanggal')
     plt.ylabel('Rupiah')
-    plt.title('Arus Kas dan Saldo')
+    plt.title(judul)
     plt.xticks(x, [d.strftime('%d/%m/%Y') if isinstance(d, datetime.datetime) else d for d in dates], rotation=45)
     plt.legend()
     plt.grid(True, linestyle='--', alpha=0.7)
@@ -174,24 +194,27 @@ def create_cash_flow_chart(anggaran_data):
     # Save to BytesIO
     img_data = BytesIO()
     plt.savefig(img_data, format='png', dpi=150)
-    img_data.seek(0)
     plt.close()
     
-    # Return as ReportLab Image
-    return Image(img_data, width=700, height=350)
+    return img_data.getvalue()
 
 def create_distribution_chart(anggaran_data):
     """
-    Create a pie chart showing distribution of kredit (expenses) with volume and total
+    Create a pie chart showing distribution of kredit (expenses) with total volume per unit and total
     
     Args:
         anggaran_data (list): List of dictionaries with realisasi anggaran data
         
     Returns:
-        Image: ReportLab Image object
+        Image: ReportLab Image object, or None if there are no expenses
     """
+    png = cached_png("pdf_distribution_chart", anggaran_data, lambda: _render_distribution_chart(anggaran_data))
+    return Image(BytesIO(png), width=500, height=375) if png else None
+
+def _render_distribution_chart(anggaran_data):
     # Create a DataFrame from the data
     expense_data = {}
+    # Pasangan (jumlah, satuan) per keterangan; dijumlahkan per satuan saat label dibuat
     volume_data = {}
     
     for item in anggaran_data:
@@ -201,12 +224,12 @@ def create_distribution_chart(anggaran_data):
         kredit_val = parse_currency_id(item.get('kredit', 0))
         
         if kredit_val > 0:  # Only include expenses
-            if keterangan in expense_data:
-                expense_data[keterangan] += kredit_val
-                volume_data[keterangan] += f", {item.get('volume', '')}"
+            expense_data[keterangan] = expense_data.get(keterangan, 0) + kredit_val
+            if item.get('volume_jumlah') is not None:
+                volume = (item['volume_jumlah'], item.get('volume_satuan'))
             else:
-                expense_data[keterangan] = kredit_val
-                volume_data[keterangan] = item.get('volume', '')
+                volume = parse_volume(item.get('volume'))
+            volume_data.setdefault(keterangan, []).append(volume)
     
     # Create figure
     if expense_data:
@@ -218,7 +241,10 @@ def create_distribution_chart(anggaran_data):
         
         # Add percentage, value and volume to labels
         total = sum(sizes)
-        labels_with_info = [f"{l}\n{s/total*100:.1f}%\n{format_currency(s)}\nVol: {volume_data[l]}" for l, s in zip(labels, sizes)]
+        labels_with_info = [
+            f"{l}\n{s/total*100:.1f}%\n{format_currency(s)}\nVol: {ringkas_volume(*zip(*volume_data[l])) or '-'}"
+            for l, s in zip(labels, sizes)
+        ]
         
         plt.pie(sizes, labels=labels_with_info, autopct='', startangle=90, shadow=False, 
                 wedgeprops={'edgecolor': 'white', 'linewidth': 1})
@@ -230,13 +256,11 @@ def create_distribution_chart(anggaran_data):
         # Save to BytesIO
         img_data = BytesIO()
         plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
         plt.close()
         
-        # Return as ReportLab Image
-        return Image(img_data, width=500, height=375)
+        return img_data.getvalue()
     
-    return None
+    return b""
 
 def create_price_comparison_chart(harga_tertinggi_data, harga_terendah_data):
     """
@@ -247,8 +271,15 @@ def create_price_comparison_chart(harga_tertinggi_data, harga_terendah_data):
         harga_terendah_data (list): List of dictionaries with lowest price data
         
     Returns:
-        Image: ReportLab Image object
+        Image: ReportLab Image object, or None if there is no data
     """
+    png = cached_png(
+        "pdf_price_comparison_chart", (harga_tertinggi_data, harga_terendah_data),
+        lambda: _render_price_comparison_chart(harga_tertinggi_data, harga_terendah_data)
+    )
+    return Image(BytesIO(png), width=500, height=300) if png else None
+
+def _render_price_comparison_chart(harga_tertinggi_data, harga_terendah_data):
     try:
         # Convert data to right format for plotting
         df_tertinggi = pd.DataFrame([
@@ -306,16 +337,14 @@ def create_price_comparison_chart(harga_tertinggi_data, harga_terendah_data):
             # Save to BytesIO
             img_data = BytesIO()
             plt.savefig(img_data, format='png', dpi=150)
-            img_data.seek(0)
             plt.close()
             
-            # Return as ReportLab Image
-            return Image(img_data, width=500, height=300)
+            return img_data.getvalue()
             
     except Exception as e:
         print(f"Error creating price comparison chart: {e}")
     
-    return None
+    return b""
 
 def generate_pdf_penjualan_karet(data, title="Laporan Penjualan Karet"):
     """
@@ -451,6 +480,20 @@ def generate_pdf_penjualan_karet(data, title="Laporan Penjualan Karet"):
         
         content.append(ongkos_table)
         content.append(Spacer(1, 24))
+        
+        # Selisih harga jual terhadap harga SIR 20 yang berlaku pada tanggal penjualan
+        if data.get('selisih_harga_pasar'):
+            content.append(Paragraph("Harga Jual terhadap Harga Pasar SIR 20", subtitle_style))
+            selisih_table = Table(data['selisih_harga_pasar'], colWidths=[doc.width * 0.35, doc.width * 0.35])
+            selisih_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+            ]))
+            content.append(selisih_table)
+            content.append(Spacer(1, 24))
     
     # Strategi dan Risiko
     if 'strategi_risiko' in data and data['strategi_risiko']:
@@ -644,6 +687,24 @@ def generate_pdf_penjualan_karet(data, title="Laporan Penjualan Karet"):
         content.append(strategi_table)
         content.append(Spacer(1, 24))
     
+    # Risiko harga SIR 20 dari simulasi Monte Carlo
+    if data.get('risiko_harga'):
+        content.append(Paragraph("Risiko Harga SIR 20 (Simulasi Monte Carlo)", subtitle_style))
+        risiko_table = Table(data['risiko_harga'], colWidths=[doc.width * 0.3, doc.width * 0.5])
+        risiko_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (1, 3), (1, -1), 'RIGHT')
+        ]))
+        content.append(risiko_table)
+        content.append(Paragraph(
+            "VaR dan CVaR adalah kerugian pada tingkat keyakinan tersebut; nilai negatif berarti keuntungan masih positif. "
+            "Harga jual diasumsikan bergerak sebanding dengan harga SIR 20.", normal_style
+        ))
+        content.append(Spacer(1, 24))
+    
     # Realisasi Anggaran
     if 'realisasi_anggaran' in data and data['realisasi_anggaran']:
         content.append(Paragraph("Realisasi Anggaran", header_style))
@@ -682,6 +743,34 @@ def generate_pdf_penjualan_karet(data, title="Laporan Penjualan Karet"):
         content.append(anggaran_table)
         content.append(Spacer(1, 24))
         
+        # KPI kas bulanan (burn rate, runway, modal kerja) dari ringkasan anggaran
+        kpi_anggaran = data.get('kpi_anggaran') or {}
+        if kpi_anggaran.get('ringkasan'):
+            content.append(Paragraph("Indikator Kas", subtitle_style))
+            kpi_table = Table(kpi_anggaran['ringkasan'], colWidths=[doc.width * 0.35, doc.width * 0.35])
+            kpi_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+            ]))
+            content.append(kpi_table)
+            content.append(Spacer(1, 12))
+            
+            kpi_header = ['Bulan', 'Dana Masuk', 'Pengeluaran', 'Saldo Akhir', 'Burn Rate Bersih', 'Modal Kerja']
+            kpi_bulanan_table = Table([kpi_header] + kpi_anggaran['bulanan'], colWidths=[doc.width * w for w in [0.1, 0.18, 0.18, 0.18, 0.18, 0.18]])
+            kpi_bulanan_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (1, 1), (-1, -1), 'RIGHT')
+            ]))
+            content.append(kpi_bulanan_table)
+            content.append(Spacer(1, 24))
+        
         # Add cash flow chart to the report
         try:
             content.append(Paragraph("Visualisasi Arus Kas", subtitle_style))
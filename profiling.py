@@ -0,0 +1,128 @@
+import contextlib
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import threading
+import time
+
+# Mode profiling bisa diaktifkan untuk semua sesi melalui environment variable
+PROFILE_ENV_ENABLED = os.environ.get("KARET_PROFILE", "").lower() in ("1", "true", "yes")
+
+_local = threading.local()
+
+
+class RerunProfiler:
+    """
+    Profiler untuk satu kali rerun app.py
+
+    Waktu setiap fase (sidebar, tab, bagian PDF) selalu dicatat karena murah.
+    Jika enabled, seluruh rerun juga dibungkus cProfile (deterministik) sehingga
+    hot spot dan profil mentah bisa ditampilkan dan diunduh.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases = []
+        self._profile = cProfile.Profile() if enabled else None
+        self._open_phases = {}
+        self._stopped = False
+
+    def start(self):
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        """
+        Menghentikan profiler; aman dipanggil lebih dari sekali
+        """
+        if self._profile is not None and not self._stopped:
+            self._profile.disable()
+        self._stopped = True
+
+    def start_phase(self, name):
+        self._open_phases[name] = time.perf_counter()
+
+    def stop_phase(self, name):
+        started = self._open_phases.pop(name, None)
+        if started is not None:
+            self.phases.append((name, (time.perf_counter() - started) * 1000))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager untuk mencatat durasi satu fase rerun
+        """
+        self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.stop_phase(name)
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def hotspots(self, limit=25, sort_by="cumulative"):
+        """
+        Mendapatkan fungsi dengan waktu terbesar dari profil cProfile
+
+        Args:
+            limit (int): Jumlah fungsi yang dikembalikan
+            sort_by (str): "cumulative" atau "tottime"
+
+        Returns:
+            list: dict per fungsi (fungsi, panggilan, tottime_ms, cumtime_ms)
+        """
+        if self._profile is None:
+            return []
+
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = []
+        for (filename, lineno, funcname), (cc, nc, tt, ct, callers) in stats.stats.items():
+            rows.append({
+                "Fungsi": f"{funcname} ({os.path.basename(filename)}:{lineno})",
+                "Panggilan": nc,
+                "Tottime (ms)": tt * 1000,
+                "Cumtime (ms)": ct * 1000,
+            })
+        key = "Cumtime (ms)" if sort_by == "cumulative" else "Tottime (ms)"
+        rows.sort(key=lambda r: r[key], reverse=True)
+        return rows[:limit]
+
+    def raw_profile(self):
+        """
+        Mendapatkan profil mentah dalam format pstats (bisa dibuka dengan
+        pstats.Stats, snakeviz, atau flameprof)
+
+        Returns:
+            bytes: Isi file .prof, atau None jika profiling tidak aktif
+        """
+        if self._profile is None:
+            return None
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+def start_rerun_profiler(enabled=False):
+    """
+    Memulai profiler untuk rerun yang sedang berjalan di thread ini
+
+    Profiler rerun sebelumnya yang belum dihentikan (misalnya karena st.rerun()
+    melempar exception di tengah script) dihentikan terlebih dahulu.
+
+    Args:
+        enabled (bool): True untuk mengaktifkan cProfile pada rerun ini
+
+    Returns:
+        RerunProfiler: Profiler yang sudah berjalan
+    """
+    previous = getattr(_local, "profiler", None)
+    if previous is not None:
+        previous.stop()
+
+    _local.profiler = RerunProfiler(enabled or PROFILE_ENV_ENABLED).start()
+    return _local.profiler
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+from shared_cache import get_cache, table_namespaces
+
+# Granularitas dari yang paling halus: (frekuensi periode pandas, perkiraan panjang dalam hari)
+GRANULARITAS = {
+    "harian": ("D", 1.0),
+    "mingguan": ("W-SUN", 7.0),
+    "bulanan": ("M", 30.44),
+    "tahunan": ("Y", 365.25),
+}
+
+LABEL_GRANULARITAS = {
+    "harian": "Harian",
+    "mingguan": "Mingguan",
+    "bulanan": "Bulanan",
+    "tahunan": "Tahunan",
+}
+
+# Lebar grafik (piksel) yang diasumsikan jika tidak diketahui; Streamlit tidak memberi tahu lebar kontainer
+LEBAR_GRAFIK = 1000
+
+# Ruang minimum per titik agar batang/candlestick masih terbaca
+PIKSEL_PER_TITIK = 8
+
+
+def pilih_granularitas(tanggal_awal, tanggal_akhir, lebar_piksel=LEBAR_GRAFIK, piksel_per_titik=PIKSEL_PER_TITIK):
+    """
+    Memilih granularitas paling halus yang jumlah titiknya muat di lebar grafik
+
+    Args:
+        tanggal_awal, tanggal_akhir (date): Rentang data
+        lebar_piksel (int): Lebar grafik dalam piksel
+        piksel_per_titik (int): Ruang minimum per titik
+
+    Returns:
+        str: Kunci GRANULARITAS
+    """
+    maks_titik = max(1, int(lebar_piksel // piksel_per_titik))
+    rentang_hari = (pd.Timestamp(tanggal_akhir) - pd.Timestamp(tanggal_awal)).days + 1
+    for granularitas, (_, hari) in GRANULARITAS.items():
+        if rentang_hari / hari <= maks_titik:
+            return granularitas
+    return "tahunan"
+
+
+def periode(tanggal, granularitas):
+    """
+    Tanggal awal bucket (Senin untuk mingguan, tanggal 1 untuk bulanan) setiap tanggal
+    """
+    frekuensi = GRANULARITAS[granularitas][0]
+    return pd.to_datetime(pd.Series(tanggal)).dt.to_period(frekuensi).dt.start_time
+
+
+def nilai_asof(tanggal, ref_tanggal, ref_nilai, maks_umur_hari=None):
+    """
+    As-of join: nilai referensi terakhir dengan tanggal <= setiap tanggal
+
+    Referensi diurutkan sekali lalu setiap tanggal dicari dengan
+    np.searchsorted, sehingga jutaan tanggal terhadap harga harian cukup
+    O(n log m) tanpa join baris per baris.
+
+    Args:
+        tanggal (array-like): Tanggal yang dicari; tidak harus terurut
+        ref_tanggal, ref_nilai (array-like): Seri referensi; tidak harus terurut
+        maks_umur_hari (int): Nilai referensi yang lebih tua dari ini dianggap tidak berlaku
+
+    Returns:
+        tuple: (nilai, tanggal_ref) ndarray; NaN/NaT jika tidak ada referensi yang berlaku
+    """
+    t = pd.to_datetime(pd.Series(tanggal)).to_numpy().astype("datetime64[D]")
+    rt = pd.to_datetime(pd.Series(ref_tanggal)).to_numpy().astype("datetime64[D]")
+    rv = np.asarray(ref_nilai, dtype=float)
+    if len(rt) == 0:
+        return np.full(len(t), np.nan), np.full(len(t), np.datetime64("NaT"), dtype="datetime64[D]")
+
+    urutan = np.argsort(rt, kind="stable")
+    rt, rv = rt[urutan], rv[urutan]
+    posisi = np.searchsorted(rt, t, side="right") - 1
+    berlaku = posisi >= 0
+    posisi = np.maximum(posisi, 0)
+    if maks_umur_hari is not None:
+        berlaku &= (t - rt[posisi]) <= np.timedelta64(int(maks_umur_hari), "D")
+    return (
+        np.where(berlaku, rv[posisi], np.nan),
+        np.where(berlaku, rt[posisi], np.datetime64("NaT")),
+    )
+
+
+def resample_ohlc(tanggal, nilai, granularitas):
+    """
+    Meringkas seri harga menjadi OHLC per bucket
+
+    Args:
+        tanggal, nilai (array-like): Observasi harga; tidak harus terurut
+        granularitas (str): Kunci GRANULARITAS
+
+    Returns:
+        DataFrame: periode, open, high, low, close, rata_rata, jumlah (terurut per periode)
+    """
+    df = pd.DataFrame({"tanggal": pd.to_datetime(pd.Series(tanggal)).to_numpy(),
+                       "nilai": pd.to_numeric(pd.Series(nilai), errors="coerce").to_numpy()})
+    df = df.dropna().sort_values("tanggal", kind="stable")
+    df["periode"] = periode(df["tanggal"], granularitas).to_numpy()
+
+    hasil = df.groupby("periode")["nilai"].agg(
+        open="first", high="max", low="min", close="last", rata_rata="mean", jumlah="size"
+    )
+    return hasil.reset_index()
+
+
+def resample_arus_kas(tanggal, debet, kredit, saldo, granularitas):
+    """
+    Meringkas transaksi kas per bucket: total debet dan kredit, saldo akhir bucket
+
+    Args:
+        tanggal, debet, kredit, saldo (array-like): Transaksi, urutan input dipakai
+            sebagai urutan transaksi pada tanggal yang sama
+        granularitas (str): Kunci GRANULARITAS
+
+    Returns:
+        DataFrame: periode, debet, kredit, saldo, jumlah (terurut per periode)
+    """
+    df = pd.DataFrame({
+        "tanggal": pd.to_datetime(pd.Series(tanggal)).to_numpy(),
+        "debet": np.asarray(debet, dtype=float),
+        "kredit": np.asarray(kredit, dtype=float),
+        "saldo": np.asarray(saldo, dtype=float),
+    }).sort_values("tanggal", kind="stable")
+    df["periode"] = periode(df["tanggal"], granularitas).to_numpy()
+
+    hasil = df.groupby("periode").agg(
+        debet=("debet", "sum"), kredit=("kredit", "sum"), saldo=("saldo", "last"), jumlah=("debet", "size")
+    )
+    return hasil.reset_index()
+
+
+def label_periode(periode_awal, granularitas):
+    """
+    Label sumbu x untuk awal bucket
+    """
+    format_label = {"harian": "%d/%m/%Y", "mingguan": "%d/%m/%Y", "bulanan": "%m/%Y", "tahunan": "%Y"}[granularitas]
+    return [pd.Timestamp(p).strftime(format_label) for p in periode_awal]
+
+
+def get_ohlc_harga(perusahaan_id, kolom, granularitas, load_data):
+    """
+    OHLC harga SICOM dari cache bersama, per (seri, granularitas)
+
+    Args:
+        perusahaan_id (int): ID perusahaan SICOM
+        kolom (str): Kolom harga
+        granularitas (str): Kunci GRANULARITAS
+        load_data (callable): Mengembalikan list objek HargaSicomHarian
+
+    Returns:
+        DataFrame: Hasil resample_ohlc
+    """
+    def _hitung():
+        data = load_data()
+        return resample_ohlc([h.tanggal for h in data], [getattr(h, kolom) for h in data], granularitas)
+
+    return get_cache().get_or_compute(
+        "ohlc_harga", (perusahaan_id, kolom, granularitas), _hitung,
+        table_namespaces("harga_sicom_harian", perusahaan_id)
+    )
+
+
+def get_arus_kas(perusahaan_id, granularitas, load_data):
+    """
+    Arus kas realisasi anggaran per bucket dari cache bersama
+
+    Args:
+        perusahaan_id (int): ID perusahaan
+        granularitas (str): Kunci GRANULARITAS
+        load_data (callable): Mengembalikan list objek RealisasiAnggaran
+
+    Returns:
+        DataFrame: Hasil resample_arus_kas
+    """
+    def _hitung():
+        data = load_data()
+        return resample_arus_kas(
+            [a.tanggal for a in data], [a.debet or 0 for a in data],
+            [a.kredit or 0 for a in data], [a.saldo or 0 for a in data], granularitas
+        )
+
+    return get_cache().get_or_compute(
+        "arus_kas", (perusahaan_id, granularitas), _hitung,
+        table_namespaces("realisasi_anggaran", perusahaan_id)
+    )
@@ -0,0 +1,510 @@
+import collections
+import hashlib
+import os
+import pickle
+import sqlite3
+import stat
+import threading
+import time
+import uuid
+
+# Konfigurasi cache bersama, dapat diatur melalui environment variable
+CACHE_BACKEND = os.environ.get("KARET_CACHE_BACKEND", "sqlite").lower()  # sqlite, memory, none
+# Default di direktori cache milik pengguna (bukan direktori temp yang bisa ditulis semua pengguna),
+# karena nilai cache di-unpickle saat dibaca
+CACHE_DIR = os.environ.get(
+    "KARET_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "karet")
+)
+CACHE_PATH = os.environ.get("KARET_CACHE_PATH", os.path.join(CACHE_DIR, "karet_cache.sqlite3"))
+CACHE_MAX_BYTES = int(float(os.environ.get("KARET_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# TTL bisa panjang karena penulisan menginvalidasi entri lewat change_events
+CACHE_DEFAULT_TTL = float(os.environ.get("KARET_CACHE_TTL", "3600"))
+CACHE_L1_ENTRIES = int(os.environ.get("KARET_CACHE_L1_ENTRIES", "256"))
+
+# Waktu akses entri hanya diperbarui jika lebih lama dari ini, agar pembacaan
+# tidak selalu menjadi penulisan ke file cache (LRU menjadi sedikit kasar)
+_TOUCH_INTERVAL = 30.0
+
+# Setelah eviksi, ukuran cache diturunkan sampai fraksi ini dari batas maksimum
+_EVICT_TARGET = 0.9
+
+
+class MemoryCacheBackend:
+    """
+    Backend cache di memori proses ini saja (untuk satu worker atau pengujian)
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                self._delete(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._delete(key)
+            self._entries[key] = (value, time.time() + ttl if ttl else None)
+            self._size += len(value)
+            while self._size > self.max_bytes and self._entries:
+                self._delete(next(iter(self._entries)))
+
+    def _delete(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    def versions(self, namespaces):
+        with self._lock:
+            return {ns: "%s:%d" % self._versions.get(ns, ("0", 0)) for ns in namespaces}
+
+    def set_versions(self, namespaces, token):
+        with self._lock:
+            for ns in namespaces:
+                self._versions[ns] = (token, self._versions.get(ns, ("0", 0))[1])
+
+    def advance_versions(self, namespaces, change_id):
+        with self._lock:
+            for ns in namespaces:
+                token, current = self._versions.get(ns, ("0", 0))
+                self._versions[ns] = (token, max(current, change_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._size = 0
+
+    def stats(self):
+        return {"backend": "memory", "entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+def siapkan_file_cache(path):
+    """
+    Memastikan file cache SQLite aman dipakai sebelum dibuka
+
+    Nilai cache di-unpickle saat dibaca, sehingga siapa pun yang bisa menulis
+    file ini bisa menjalankan kode di proses aplikasi. Direktori dibuat dengan
+    mode 0700 dan file dengan mode 0600 tanpa mengikuti symlink; file atau
+    direktori milik pengguna lain, atau yang bisa ditulis pengguna lain, ditolak.
+
+    Args:
+        path (str): Lokasi file cache
+
+    Raises:
+        PermissionError: Jika file atau direktorinya tidak aman
+    """
+    direktori = os.path.dirname(os.path.abspath(path))
+    os.makedirs(direktori, mode=0o700, exist_ok=True)
+    uid = os.getuid() if hasattr(os, "getuid") else None
+
+    info = os.stat(direktori)
+    if uid is not None and (info.st_uid != uid or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        raise PermissionError(f"Direktori cache {direktori} harus milik uid {uid} dan tidak bisa ditulis pengguna lain")
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        info = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if uid is not None and (info.st_uid != uid or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        raise PermissionError(f"File cache {path} harus milik uid {uid} dan tidak bisa ditulis pengguna lain")
+
+
+class SQLiteCacheBackend:
+    """
+    Backend cache berbasis file SQLite yang dibagi oleh semua worker Streamlit
+    di host yang sama
+
+    Entri disimpan sebagai BLOB dengan waktu kedaluwarsa dan waktu akses terakhir
+    untuk eviksi LRU ketika total ukuran melebihi max_bytes. Versi namespace
+    disimpan di tabel terpisah sehingga invalidasi dari satu worker langsung
+    terlihat oleh worker lain.
+
+    Versi namespace terdiri dari token acak (invalidasi biasa) dan ID event
+    perubahan terbesar yang sudah diterapkan; ID hanya pernah naik.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        siapkan_file_cache(path)
+        self._init_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)")
+        kolom = [row[1] for row in conn.execute("PRAGMA table_info(cache_versions)")]
+        if kolom and "change_id" not in kolom:
+            # File cache dari skema lama (versi berupa satu token): entri lama tidak bisa
+            # dipetakan ke versi baru dengan aman, jadi dibuang bersama tabel versinya
+            conn.execute("DROP TABLE cache_versions")
+            conn.execute("DELETE FROM cache_entries")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_versions ("
+            "namespace TEXT PRIMARY KEY, token TEXT NOT NULL DEFAULT '0', change_id INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at < now:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return None
+        if now - accessed_at > _TOUCH_INTERVAL:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key, value, ttl=None):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, sqlite3.Binary(value), len(value), now + ttl if ttl else None, now)
+        )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total > self.max_bytes:
+            self._evict(conn, total, now)
+
+    def _evict(self, conn, total, now):
+        # Buang entri kedaluwarsa dulu, lalu entri yang paling lama tidak diakses
+        conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        target = self.max_bytes * _EVICT_TARGET
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+
+    def versions(self, namespaces):
+        namespaces = list(namespaces)
+        if not namespaces:
+            return {}
+        placeholders = ", ".join("?" for _ in namespaces)
+        rows = self._conn().execute(
+            f"SELECT namespace, token, change_id FROM cache_versions WHERE namespace IN ({placeholders})", namespaces
+        ).fetchall()
+        found = {ns: (token, change_id) for ns, token, change_id in rows}
+        return {ns: "%s:%d" % found.get(ns, ("0", 0)) for ns in namespaces}
+
+    def set_versions(self, namespaces, token):
+        self._conn().executemany(
+            "INSERT INTO cache_versions (namespace, token) VALUES (?, ?) "
+            "ON CONFLICT (namespace) DO UPDATE SET token = excluded.token",
+            [(ns, token) for ns in namespaces]
+        )
+
+    def advance_versions(self, namespaces, change_id):
+        # MAX di dalam satu statement, sehingga event lama yang datang terlambat dari worker lain tidak menurunkan versi
+        self._conn().executemany(
+            "INSERT INTO cache_versions (namespace, change_id) VALUES (?, ?) "
+            "ON CONFLICT (namespace) DO UPDATE SET change_id = MAX(change_id, excluded.change_id)",
+            [(ns, change_id) for ns in namespaces]
+        )
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_versions")
+
+    def stats(self):
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+class SharedCache:
+    """
+    Cache bersama dengan invalidasi berbasis versi namespace
+
+    Setiap entri bergantung pada satu atau lebih namespace (misalnya
+    "penjualan_karet:3"). Versi namespace-namespace tersebut ikut menjadi bagian
+    kunci, sehingga mengganti versi (invalidate) membuat entri lama tidak pernah
+    terbaca lagi tanpa perlu menghapusnya; entri lama akhirnya dibuang oleh
+    eviksi LRU atau TTL.
+
+    Event perubahan menaikkan versi ke ID event-nya, dan hanya jika lebih
+    besar dari ID yang sudah diterapkan: event yang sama yang diterapkan
+    berkali-kali (oleh penulis dan listener setiap worker) tidak menambah cache
+    miss, dan event lama yang datang terlambat tidak mengembalikan versi ke
+    token lama sehingga entri basi tidak pernah valid lagi.
+
+    Di atas backend bersama ada cache L1 kecil per proses yang menyimpan objek
+    hasil decode, agar hit berulang di worker yang sama tidak perlu unpickle.
+    Objek yang dikembalikan bisa dipakai bersama oleh beberapa sesi, jadi
+    jangan diubah oleh pemanggil.
+    """
+
+    def __init__(self, backend, prefix="", default_ttl=CACHE_DEFAULT_TTL, l1_entries=CACHE_L1_ENTRIES):
+        self.backend = backend
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.l1_entries = l1_entries
+        self._l1 = collections.OrderedDict()
+        self._l1_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _scoped(self, namespaces):
+        # Namespace diberi prefix database agar versi antar database tidak bercampur
+        return [f"{self.prefix}/{ns}" for ns in namespaces]
+
+    def _versioned_key(self, name, key_parts, namespaces):
+        versions = self.backend.versions(self._scoped(namespaces))
+        raw = repr((self.prefix, name, key_parts, sorted(versions.items())))
+        return f"{name}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _l1_get(self, key):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] < time.time():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry
+
+    def _l1_set(self, key, value, ttl):
+        if not self.l1_entries:
+            return
+        with self._l1_lock:
+            self._l1[key] = (value, time.time() + ttl if ttl else None)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_entries:
+                self._l1.popitem(last=False)
+
+    def get_or_compute(self, name, key_parts, compute, namespaces=(), ttl=None,
+                       encode=pickle.dumps, decode=pickle.loads):
+        """
+        Mengambil nilai dari cache atau menghitungnya lalu menyimpannya
+
+        Kesalahan backend cache tidak pernah menggagalkan pemanggil; nilai
+        langsung dihitung ulang.
+
+        Args:
+            name (str): Nama jenis data (misalnya nama fungsi)
+            key_parts (tuple): Argumen yang membedakan entri
+            compute (callable): Fungsi tanpa argumen untuk menghitung nilai
+            namespaces (list): Namespace yang jika diinvalidasi membuat entri ini basi
+            ttl (float): Umur maksimum entri dalam detik (default: KARET_CACHE_TTL)
+            encode (callable): Mengubah nilai menjadi bytes
+            decode (callable): Mengubah bytes kembali menjadi nilai
+
+        Returns:
+            object: Nilai dari cache atau hasil compute()
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            key = self._versioned_key(name, key_parts, namespaces)
+            entry = self._l1_get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            data = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error saat membaca cache {name}: {e}")
+            return compute()
+
+        if data is not None:
+            try:
+                value = decode(data)
+                self.hits += 1
+                self._l1_set(key, value, ttl)
+                return value
+            except Exception as e:
+                self.errors += 1
+                print(f"Entri cache {name} tidak bisa dibaca, dihitung ulang: {e}")
+
+        self.misses += 1
+        value = compute()
+        try:
+            self.backend.set(key, encode(value), ttl)
+            self._l1_set(key, value, ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error saat menulis cache {name}: {e}")
+        return value
+
+    def invalidate(self, *namespaces, change_id=None):
+        """
+        Mengganti versi namespace sehingga semua entri yang bergantung padanya
+        basi di semua worker yang memakai backend ini
+
+        Args:
+            namespaces (str): Namespace yang diinvalidasi
+            change_id (int): ID event perubahan; versi hanya dinaikkan jika ID
+                ini lebih besar dari yang sudah diterapkan. Tanpa ID, versi
+                diganti dengan token acak yang unik
+        """
+        try:
+            if change_id is not None:
+                self.backend.advance_versions(self._scoped(namespaces), int(change_id))
+            else:
+                self.backend.set_versions(self._scoped(namespaces), uuid.uuid4().hex)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error saat invalidasi cache {namespaces}: {e}")
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self.backend.clear()
+
+    def stats(self):
+        stats = dict(self.backend.stats())
+        stats.update({"l1_entries": len(self._l1), "hits": self.hits, "misses": self.misses, "errors": self.errors})
+        return stats
+
+
+class NullCache(SharedCache):
+    """
+    Cache nonaktif (KARET_CACHE_BACKEND=none): semua nilai selalu dihitung
+    """
+
+    def __init__(self):
+        super().__init__(MemoryCacheBackend(0), l1_entries=0)
+
+    def get_or_compute(self, name, key_parts, compute, namespaces=(), ttl=None,
+                       encode=pickle.dumps, decode=pickle.loads):
+        self.misses += 1
+        return compute()
+
+    def invalidate(self, *namespaces, change_id=None):
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Mendapatkan cache bersama untuk proses ini sesuai KARET_CACHE_BACKEND
+
+    Kunci diberi prefix hash DATABASE_URL agar database yang berbeda (misalnya
+    produksi dan benchmark) tidak pernah berbagi entri.
+
+    Returns:
+        SharedCache: Instance cache bersama
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                prefix = hashlib.sha256(os.environ.get("DATABASE_URL", "").encode("utf-8")).hexdigest()[:16]
+                if CACHE_BACKEND == "none":
+                    _cache = NullCache()
+                elif CACHE_BACKEND == "memory":
+                    _cache = SharedCache(MemoryCacheBackend(), prefix)
+                else:
+                    try:
+                        _cache = SharedCache(SQLiteCacheBackend(), prefix)
+                    except (sqlite3.Error, OSError) as e:
+                        print(f"Cache SQLite di {CACHE_PATH} tidak tersedia, memakai cache memori: {e}")
+                        _cache = SharedCache(MemoryCacheBackend(), prefix)
+    return _cache
+
+
+def table_namespaces(table, perusahaan_id=None):
+    """
+    Namespace yang menjadi dependensi hasil query suatu tabel
+
+    Query per perusahaan bergantung pada "tabel" dan "tabel:<id>"; query semua
+    perusahaan bergantung pada "tabel" dan "tabel:semua".
+
+    Returns:
+        list: Nama namespace
+    """
+    return [table, f"{table}:{perusahaan_id}" if perusahaan_id else f"{table}:semua"]
+
+
+def invalidate_table(table, perusahaan_id=None, change_id=None):
+    """
+    Menginvalidasi hasil query suatu tabel setelah penulisan
+
+    Args:
+        table (str): Nama tabel
+        perusahaan_id (int): Perusahaan yang datanya berubah; None untuk seluruh tabel
+        change_id (int): ID event perubahan; None untuk invalidasi dengan token acak
+    """
+    if perusahaan_id:
+        get_cache().invalidate(f"{table}:{perusahaan_id}", f"{table}:semua", change_id=change_id)
+    else:
+        get_cache().invalidate(table, change_id=change_id)
+
+
+def cached_figure(name, key_parts, namespaces, build):
+    """
+    Mengambil figure Plotly dari cache (disimpan sebagai JSON) atau membuatnya
+
+    Args:
+        name (str): Nama grafik
+        key_parts (tuple): Argumen yang membedakan grafik
+        namespaces (list): Namespace data sumber grafik
+        build (callable): Fungsi tanpa argumen yang mengembalikan figure Plotly
+
+    Returns:
+        Figure: Figure Plotly
+    """
+    import plotly.io as pio
+
+    figure_json = get_cache().get_or_compute(
+        name, key_parts, lambda: build().to_json(), namespaces,
+        encode=lambda s: s.encode("utf-8"), decode=lambda b: b.decode("utf-8")
+    )
+    return pio.from_json(figure_json)
+
+
+def cached_png(name, content, render):
+    """
+    Mengambil gambar PNG dari cache berdasarkan hash isi data sumbernya
+
+    Kunci dihitung dari isi data, sehingga tidak perlu invalidasi eksplisit.
+
+    Args:
+        name (str): Nama grafik
+        content (object): Data sumber grafik (harus bisa di-repr secara deterministik)
+        render (callable): Fungsi tanpa argumen yang mengembalikan bytes PNG
+
+    Returns:
+        bytes: Isi file PNG
+    """
+    digest = hashlib.sha256(repr(content).encode("utf-8")).hexdigest()
+    return get_cache().get_or_compute(name, (digest,), render, encode=bytes, decode=bytes)
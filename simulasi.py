@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+# Parameter skenario yang divariasikan pada grid, dengan label tampilannya
+PARAMETER_GRID = {
+    "harga_jual": "Harga Jual (Rp/kg)",
+    "harga_beli": "Harga Beli (Rp/kg)",
+    "susut": "Susut (%)",
+    "jarak": "Jarak (km)",
+    "ongkos_per_km": "Ongkos Kirim (Rp/km)",
+}
+
+# Batas jumlah kombinasi agar satu evaluasi grid tetap di bawah ~1 detik dan ~100 MB
+MAKS_KOMBINASI = 5_000_000
+
+
+def hitung_penjualan(berat_awal, harga_jual, harga_beli, susut, ongkos_kirim):
+    """
+    Menghitung nilai turunan satu penjualan karet
+
+    Rumus yang sama dipakai form penjualan (nilai skalar) dan simulasi
+    (array NumPy yang di-broadcast), sehingga hanya ada satu sumber kebenaran.
+
+    Args:
+        berat_awal (float | ndarray): Berat awal dalam kg
+        harga_jual (float | ndarray): Harga jual per kg
+        harga_beli (float | ndarray): Harga beli per kg
+        susut (float | ndarray): Susut dalam persen
+        ongkos_kirim (float | ndarray): Total ongkos kirim dalam Rupiah
+
+    Returns:
+        dict: berat_jual, total_harga_jual, total_harga_beli, keuntungan_kotor, keuntungan_bersih
+    """
+    berat_jual = berat_awal * (1 - susut / 100)
+    total_harga_jual = harga_jual * berat_jual
+    total_harga_beli = harga_beli * berat_awal
+    keuntungan_kotor = total_harga_jual - total_harga_beli
+    return {
+        "berat_jual": berat_jual,
+        "total_harga_jual": total_harga_jual,
+        "total_harga_beli": total_harga_beli,
+        "keuntungan_kotor": keuntungan_kotor,
+        "keuntungan_bersih": keuntungan_kotor - ongkos_kirim,
+    }
+
+
+def harga_jual_impas(berat_awal, harga_beli, susut, ongkos_kirim):
+    """
+    Harga jual per kg yang membuat keuntungan bersih tepat nol
+
+    Kebalikan dari hitung_penjualan; NaN jika susut 100% (berat jual nol).
+    """
+    berat_jual = np.asarray(berat_awal * (1 - susut / 100), dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(berat_jual > 0, (harga_beli * berat_awal + ongkos_kirim) / berat_jual, np.nan)
+
+
+def rentang(minimum, maksimum, jumlah):
+    """
+    Nilai-nilai parameter berjarak sama dari minimum sampai maksimum (inklusif)
+    """
+    if jumlah <= 1 or minimum == maksimum:
+        return np.array([float(minimum)])
+    return np.linspace(minimum, maksimum, int(jumlah))
+
+
+def simulasi_grid(berat_awal, harga_jual, harga_beli, susut, jarak, ongkos_per_km):
+    """
+    Mengevaluasi keuntungan bersih untuk semua kombinasi parameter
+
+    Setiap parameter diberi sumbu sendiri lalu di-broadcast, sehingga seluruh
+    grid dihitung dalam beberapa operasi NumPy tanpa loop Python. Ongkos kirim
+    total = jarak x ongkos_per_km, sehingga jarak ikut memengaruhi keuntungan.
+
+    Args:
+        berat_awal (float): Berat awal dalam kg (tetap untuk semua skenario)
+        harga_jual, harga_beli, susut, jarak, ongkos_per_km (array-like): Nilai
+            tiap parameter, urutan sumbu grid mengikuti PARAMETER_GRID
+
+    Returns:
+        dict: "sumbu" (nama parameter -> ndarray nilai) dan "keuntungan_bersih"
+            (ndarray 5 dimensi)
+
+    Raises:
+        ValueError: Jika jumlah kombinasi melebihi MAKS_KOMBINASI
+    """
+    sumbu = {
+        "harga_jual": np.asarray(harga_jual, dtype=float),
+        "harga_beli": np.asarray(harga_beli, dtype=float),
+        "susut": np.asarray(susut, dtype=float),
+        "jarak": np.asarray(jarak, dtype=float),
+        "ongkos_per_km": np.asarray(ongkos_per_km, dtype=float),
+    }
+    jumlah = int(np.prod([len(v) for v in sumbu.values()]))
+    if jumlah > MAKS_KOMBINASI:
+        raise ValueError(f"Jumlah kombinasi {jumlah:,} melebihi batas {MAKS_KOMBINASI:,}")
+
+    # Bentuk (n, 1, 1, 1, 1), (1, n, 1, 1, 1), ... agar di-broadcast menjadi grid penuh
+    n_sumbu = len(sumbu)
+    terbentuk = {}
+    for i, (nama, nilai) in enumerate(sumbu.items()):
+        bentuk = [1] * n_sumbu
+        bentuk[i] = len(nilai)
+        terbentuk[nama] = nilai.reshape(bentuk)
+
+    ongkos_kirim = terbentuk["jarak"] * terbentuk["ongkos_per_km"]
+    hasil = hitung_penjualan(
+        float(berat_awal), terbentuk["harga_jual"], terbentuk["harga_beli"], terbentuk["susut"], ongkos_kirim
+    )
+    keuntungan = np.broadcast_to(hasil["keuntungan_bersih"], tuple(len(v) for v in sumbu.values()))
+
+    return {"sumbu": sumbu, "keuntungan_bersih": keuntungan}
+
+
+def ringkasan_grid(grid):
+    """
+    Statistik keseluruhan grid simulasi
+
+    Returns:
+        dict: jumlah_kombinasi, persen_untung, keuntungan_min/rata_rata/maks,
+            serta skenario_terbaik dan skenario_terburuk (nilai parameter)
+    """
+    keuntungan = grid["keuntungan_bersih"]
+    nama = list(grid["sumbu"])
+
+    def _skenario(flat_index):
+        posisi = np.unravel_index(flat_index, keuntungan.shape)
+        return {n: float(grid["sumbu"][n][i]) for n, i in zip(nama, posisi)}
+
+    return {
+        "jumlah_kombinasi": int(keuntungan.size),
+        "persen_untung": float((keuntungan > 0).mean() * 100),
+        "keuntungan_min": float(keuntungan.min()),
+        "keuntungan_rata_rata": float(keuntungan.mean()),
+        "keuntungan_maks": float(keuntungan.max()),
+        "skenario_terbaik": _skenario(int(keuntungan.argmax())),
+        "skenario_terburuk": _skenario(int(keuntungan.argmin())),
+    }
+
+
+def heatmap_grid(grid, sumbu_x, sumbu_y, agregasi="mean"):
+    """
+    Memproyeksikan grid ke dua parameter untuk heatmap
+
+    Parameter lainnya direduksi dengan agregasi ("mean", "min", "max", atau
+    "persen_untung" untuk persentase kombinasi yang menguntungkan).
+
+    Returns:
+        DataFrame: indeks nilai sumbu_y, kolom nilai sumbu_x
+    """
+    nama = list(grid["sumbu"])
+    ix, iy = nama.index(sumbu_x), nama.index(sumbu_y)
+    lainnya = tuple(i for i in range(len(nama)) if i not in (ix, iy))
+
+    keuntungan = grid["keuntungan_bersih"]
+    if agregasi == "persen_untung":
+        nilai = (keuntungan > 0).mean(axis=lainnya) * 100
+    else:
+        nilai = getattr(np, agregasi)(keuntungan, axis=lainnya)
+
+    # Setelah reduksi sumbu tersisa berurutan sesuai indeksnya; jadikan (y, x)
+    if ix < iy:
+        nilai = nilai.T
+
+    return pd.DataFrame(nilai, index=grid["sumbu"][sumbu_y], columns=grid["sumbu"][sumbu_x])
+
+
+def frontier_impas(heatmap):
+    """
+    Garis impas (keuntungan = 0) pada heatmap
+
+    Untuk setiap nilai sumbu x dicari nilai sumbu y tempat nilai heatmap
+    berganti tanda, dengan interpolasi linear di antara dua titik grid.
+
+    Args:
+        heatmap (DataFrame): Hasil heatmap_grid dengan agregasi keuntungan
+
+    Returns:
+        DataFrame: kolom x dan y; hanya kolom heatmap yang melewati nol
+    """
+    y = heatmap.index.to_numpy(dtype=float)
+    z = heatmap.to_numpy(dtype=float)
+    if len(y) < 2:
+        return pd.DataFrame(columns=["x", "y"])
+
+    z0, z1 = z[:-1], z[1:]
+    berganti = (np.sign(z0) != np.sign(z1)) | (z0 == 0)
+    # Perpotongan pertama untuk setiap kolom
+    ada = berganti.any(axis=0)
+    baris = berganti.argmax(axis=0)
+    kolom = np.arange(z.shape[1])
+
+    a, b = z0[baris, kolom], z1[baris, kolom]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(a != b, a / (a - b), 0.0)
+    y_impas = y[baris] + t * (y[baris + 1] - y[baris])
+
+    return pd.DataFrame({
+        "x": heatmap.columns.to_numpy(dtype=float)[ada],
+        "y": y_impas[ada],
+    })
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from resampling import nilai_asof
+from shared_cache import get_cache, table_namespaces
+
+# Harga SICOM lebih tua dari ini (hari) tidak lagi dianggap harga pasar yang berlaku untuk suatu penjualan
+MAKS_UMUR_HARGA_HARI = 14
+
+
+def gabung_harga_pasar(penjualan, harga_pasar, maks_umur_hari=MAKS_UMUR_HARGA_HARI):
+    """
+    Menempelkan harga SIR 20 yang berlaku (as-of) ke setiap penjualan
+
+    Args:
+        penjualan (DataFrame): tanggal, harga_jual, berat_jual
+        harga_pasar (DataFrame): tanggal, harga_sir_rupiah
+        maks_umur_hari (int): Umur maksimum harga pasar yang dipakai
+
+    Returns:
+        DataFrame: penjualan ditambah harga_pasar, tanggal_harga_pasar,
+            spread (Rp/kg) dan spread_persen (terhadap harga pasar)
+    """
+    hasil = penjualan.copy()
+    hasil["harga_jual"] = pd.to_numeric(hasil["harga_jual"], errors="coerce")
+    harga, tanggal_harga = nilai_asof(
+        hasil["tanggal"], harga_pasar["tanggal"], harga_pasar["harga_sir_rupiah"], maks_umur_hari
+    )
+    hasil["harga_pasar"] = harga
+    hasil["tanggal_harga_pasar"] = tanggal_harga
+    hasil["spread"] = hasil["harga_jual"] - hasil["harga_pasar"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hasil["spread_persen"] = np.where(hasil["harga_pasar"] > 0, hasil["spread"] / hasil["harga_pasar"] * 100, np.nan)
+    return hasil
+
+
+def ringkasan_spread(gabungan):
+    """
+    Statistik spread harga jual terhadap harga pasar
+
+    Returns:
+        dict: jumlah_penjualan, jumlah_tanpa_harga, spread_rata_rata, spread_tertimbang
+            (rata-rata tertimbang berat jual), spread_persen_median, spread_persen_p10,
+            spread_persen_p90, spread_persen_min dan spread_persen_maks; nilai None jika
+            tidak ada penjualan yang punya harga pasar
+    """
+    cocok = gabungan.dropna(subset=["spread"])
+    ringkasan = {
+        "jumlah_penjualan": int(len(cocok)),
+        "jumlah_tanpa_harga": int(len(gabungan) - len(cocok)),
+    }
+    if cocok.empty:
+        for kunci in ("spread_rata_rata", "spread_tertimbang", "spread_persen_median", "spread_persen_p10",
+                      "spread_persen_p90", "spread_persen_min", "spread_persen_maks"):
+            ringkasan[kunci] = None
+        return ringkasan
+
+    berat = pd.to_numeric(cocok["berat_jual"], errors="coerce").fillna(0).to_numpy()
+    spread = cocok["spread"].to_numpy()
+    persen = cocok["spread_persen"].dropna().to_numpy()
+    p10, median, p90 = np.percentile(persen, [10, 50, 90]) if len(persen) else (np.nan,) * 3
+    ringkasan.update({
+        "spread_rata_rata": float(spread.mean()),
+        "spread_tertimbang": float(np.average(spread, weights=berat)) if berat.sum() > 0 else float(spread.mean()),
+        "spread_persen_median": float(median),
+        "spread_persen_p10": float(p10),
+        "spread_persen_p90": float(p90),
+        "spread_persen_min": float(persen.min()) if len(persen) else None,
+        "spread_persen_maks": float(persen.max()) if len(persen) else None,
+    })
+    return ringkasan
+
+
+def get_spread_penjualan(perusahaan_id, load_penjualan, load_harga_pasar):
+    """
+    Penjualan suatu perusahaan yang sudah digabung dengan harga pasar, dari cache bersama
+
+    Args:
+        perusahaan_id (int): ID perusahaan
+        load_penjualan (callable): Mengembalikan list objek PenjualanKaret
+        load_harga_pasar (callable): Mengembalikan list (tanggal, harga_sir_rupiah)
+
+    Returns:
+        DataFrame: Hasil gabung_harga_pasar, terurut menurut tanggal
+    """
+    def _hitung():
+        penjualan = pd.DataFrame(
+            [(p.tanggal, p.harga_jual, p.berat_jual) for p in load_penjualan() if p.tanggal is not None],
+            columns=["tanggal", "harga_jual", "berat_jual"]
+        )
+        harga_pasar = pd.DataFrame(load_harga_pasar(), columns=["tanggal", "harga_sir_rupiah"])
+        return gabung_harga_pasar(penjualan, harga_pasar).sort_values("tanggal", kind="stable", ignore_index=True)
+
+    return get_cache().get_or_compute(
+        "spread_penjualan", (perusahaan_id,), _hitung,
+        table_namespaces("penjualan_karet", perusahaan_id) + table_namespaces("harga_sicom_harian", None)
+    )
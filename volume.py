@@ -0,0 +1,138 @@
+import enum
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class SatuanVolume(str, enum.Enum):
+    """
+    Satuan volume realisasi anggaran (nilai yang disimpan di kolom volume_satuan)
+    """
+    KG = "kg"
+    LOT = "lot"
+    PCS = "pcs"
+    LITER = "liter"
+    LAINNYA = "lainnya"
+
+
+# Penulisan satuan di teks volume lama -> (satuan, faktor pengali jumlah)
+ALIAS_SATUAN = {
+    "kg": (SatuanVolume.KG, 1.0),
+    "kgs": (SatuanVolume.KG, 1.0),
+    "kilo": (SatuanVolume.KG, 1.0),
+    "kilogram": (SatuanVolume.KG, 1.0),
+    "ton": (SatuanVolume.KG, 1000.0),
+    "lot": (SatuanVolume.LOT, 1.0),
+    "pcs": (SatuanVolume.PCS, 1.0),
+    "pc": (SatuanVolume.PCS, 1.0),
+    "buah": (SatuanVolume.PCS, 1.0),
+    "unit": (SatuanVolume.PCS, 1.0),
+    "liter": (SatuanVolume.LITER, 1.0),
+    "ltr": (SatuanVolume.LITER, 1.0),
+    "l": (SatuanVolume.LITER, 1.0),
+}
+
+_POLA_VOLUME = r"^\s*(?P<angka>\d[\d.,]*)\s*(?P<satuan>[^\d\s].*?)?\s*$"
+
+# Angka dengan titik sebagai pemisah ribuan (mis. 1.500 atau 12.000.000)
+_POLA_RIBUAN = re.compile(r"^\d{1,3}(\.\d{3})+$")
+
+
+def _angka(teks):
+    """
+    Angka dari teks volume: "1.500" (ribuan), "1,5" dan "1.5" (desimal), "1.500,5"
+    """
+    teks = pd.Series(teks, dtype="string")
+    ribuan = teks.str.fullmatch(_POLA_RIBUAN.pattern).fillna(False)
+    dua_pemisah = teks.str.contains(".", regex=False) & teks.str.contains(",", regex=False)
+    bersih = teks.where(~(ribuan | dua_pemisah), teks.str.replace(".", "", regex=False))
+    return pd.to_numeric(bersih.str.replace(",", ".", regex=False), errors="coerce")
+
+
+def _parse_unik(teks):
+    """
+    Mengurai teks volume yang sudah unik (tanpa nilai kosong)
+    """
+    bagian = teks.str.extract(_POLA_VOLUME)
+    jumlah = _angka(bagian["angka"])
+    alias = bagian["satuan"].str.lower().str.rstrip(".")
+    satuan = alias.map({k: v.value for k, (v, _) in ALIAS_SATUAN.items()}).astype(object)
+    faktor = alias.map({k: f for k, (_, f) in ALIAS_SATUAN.items()}).astype(float).fillna(1.0)
+
+    terbaca = jumlah.notna().to_numpy()
+    satuan = np.where(satuan.isna(), SatuanVolume.LAINNYA.value, satuan)
+    return (jumlah * faktor).to_numpy(dtype=float), np.where(terbaca, satuan, None)
+
+
+def parse_volume_series(volume):
+    """
+    Mengurai teks volume ("1 Lot", "323 kg", "1,5 ton") menjadi jumlah dan satuan sekaligus
+
+    Teks volume sangat berulang, jadi hanya nilai unik yang diurai dengan
+    regex lalu hasilnya disebar kembali ke setiap baris.
+
+    Args:
+        volume (array-like): Teks volume; None/kosong diperbolehkan
+
+    Returns:
+        DataFrame: volume_jumlah (float, NaN jika tidak terbaca) dan
+            volume_satuan (nilai SatuanVolume; "lainnya" untuk satuan tak
+            dikenal, None jika teks tidak terbaca), index sama dengan input
+    """
+    teks = pd.Series(volume, dtype="string")
+    kode, unik = pd.factorize(teks)
+    jumlah_unik, satuan_unik = _parse_unik(pd.Series(unik, dtype="string"))
+
+    # Kode -1 (nilai kosong) diarahkan ke elemen tambahan NaN/None
+    jumlah = np.append(jumlah_unik, np.nan)[kode]
+    satuan = np.append(satuan_unik, None)[kode]
+    return pd.DataFrame({
+        "volume_jumlah": jumlah,
+        "volume_satuan": pd.Series(satuan, index=teks.index, dtype=object),
+    }, index=teks.index)
+
+
+def parse_volume(volume):
+    """
+    Versi skalar parse_volume_series
+
+    Returns:
+        tuple: (jumlah, satuan) atau (None, None) jika teks tidak terbaca
+    """
+    hasil = parse_volume_series([volume]).iloc[0]
+    if pd.isna(hasil["volume_jumlah"]):
+        return None, None
+    return float(hasil["volume_jumlah"]), hasil["volume_satuan"]
+
+
+def format_volume(jumlah, satuan):
+    """
+    Teks volume dengan format angka Indonesia, mis. "1.500 kg" atau "1,5 liter"
+
+    Titik sebagai pemisah ribuan dan koma sebagai desimal, sama dengan yang
+    dibaca _angka, sehingga parse_volume(format_volume(j, s)) == (j, s)
+    untuk jumlah dengan paling banyak dua desimal.
+    """
+    if jumlah is None or pd.isna(jumlah):
+        return ""
+    satuan = getattr(satuan, "value", satuan)
+    angka = f"{float(jumlah):,.2f}".rstrip("0").rstrip(".")
+    angka = angka.translate(str.maketrans(",.", ".,"))
+    return f"{angka} {satuan}" if satuan else angka
+
+
+def ringkas_volume(jumlah, satuan):
+    """
+    Total volume per satuan sebagai satu teks, mis. "3.500 kg, 4 lot"
+
+    Args:
+        jumlah, satuan (array-like): Pasangan volume; yang tidak terbaca diabaikan
+
+    Returns:
+        str: Total per satuan, urut menurut satuan
+    """
+    satuan = [getattr(s, "value", s) for s in satuan]
+    df = pd.DataFrame({"jumlah": np.asarray(jumlah, dtype=float), "satuan": pd.Series(satuan, dtype=object).to_numpy()})
+    total = df.dropna().groupby("satuan")["jumlah"].sum()
+    return ", ".join(format_volume(j, s) for s, j in total.items())